@@ -32,7 +32,14 @@ interface ApiTradeHistoryOverview {
 
 export interface TradeHistory {
   readonly overview: ApiTradeHistoryOverview;
-  readonly all_events: ApiEventEntry[];
+  readonly report_id: number;
+  readonly events_num: number;
+}
+
+export interface ReportEvents {
+  readonly report_id: number;
+  readonly entries: ApiEventEntry[];
+  readonly entries_found: number;
 }
 
 export interface TradeHistoryOverview {
@@ -401,6 +401,17 @@ export default class PyHandler {
         if (Object.prototype.hasOwnProperty.call(jsondata, 'sleep-secs')) {
           args.push('--sleep-secs', jsondata['sleep-secs']);
         }
+        if (
+          Object.prototype.hasOwnProperty.call(
+            jsondata,
+            'historical-prices-file'
+          )
+        ) {
+          args.push(
+            '--historical-prices-file',
+            jsondata['historical-prices-file']
+          );
+        }
       } catch (e) {
         // do nothing, act as if there is no config given
         // TODO: Perhaps in the future warn the user inside
@@ -5,6 +5,7 @@ import {
   DBSettings,
   ExternalServiceKeys
 } from '@/model/action-result';
+import { ReportEvents } from '@/model/trade-history-types';
 import {
   axiosSnakeCaseTransformer,
   setupTransformer
@@ -341,6 +342,23 @@ export class RotkehlchenApi {
       .then(handleResponse);
   }
 
+  queryReportEvents(
+    reportId: number,
+    offset: number,
+    limit: number
+  ): Promise<ReportEvents> {
+    return this.axios
+      .get<ActionResult<ReportEvents>>('/history/events', {
+        params: {
+          report_id: reportId,
+          offset,
+          limit
+        },
+        validateStatus: validStatus
+      })
+      .then(handleResponse);
+  }
+
   getFiatExchangeRates(currencies: string[]): Promise<FiatExchangeRates> {
     return this.axios
       .get<ActionResult<FiatExchangeRates>>('/fiat_exchange_rates', {
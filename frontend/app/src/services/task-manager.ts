@@ -6,6 +6,7 @@ import {
   ApiEventEntry,
   convertEventEntry,
   convertTradeHistoryOverview,
+  EventEntry,
   TradeHistory
 } from '@/model/trade-history-types';
 import { api } from '@/services/rotkehlchen-api';
@@ -14,8 +15,10 @@ import { Severity } from '@/store/notifications/consts';
 import { notify } from '@/store/notifications/utils';
 import store from '@/store/store';
 
+const REPORT_EVENTS_PAGE_SIZE = 1000;
+
 class TaskManager {
-  onTradeHistory(data: ActionResult<TradeHistory>, _meta: TaskMeta) {
+  async onTradeHistory(data: ActionResult<TradeHistory>, _meta: TaskMeta) {
     const { message, result } = data;
 
     if (message) {
@@ -27,13 +30,30 @@ class TaskManager {
       );
     }
 
-    const { overview, all_events } = result;
+    const { overview, report_id, events_num } = result;
+
+    const events: EventEntry[] = [];
+    try {
+      while (events.length < events_num) {
+        const { entries } = await api.queryReportEvents(
+          report_id,
+          events.length,
+          REPORT_EVENTS_PAGE_SIZE
+        );
+        if (entries.length === 0) {
+          break;
+        }
+        events.push(
+          ...map(entries, (event: ApiEventEntry) => convertEventEntry(event))
+        );
+      }
+    } catch (e) {
+      notify(e.message, 'Trade History Report', Severity.ERROR, true);
+    }
 
     const payload = {
       overview: convertTradeHistoryOverview(overview),
-      events: map(all_events, (event: ApiEventEntry) =>
-        convertEventEntry(event)
-      )
+      events
     };
     store.commit('reports/set', payload);
   }
@@ -1,6 +1,8 @@
 import logging
+import time
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
 
 import gevent
 
@@ -27,9 +29,11 @@ from rotkehlchen.exchanges.data_structures import (
     TradeType,
 )
 from rotkehlchen.fval import FVal
+from rotkehlchen.greenlets import set_current_task_progress
 from rotkehlchen.history import PriceHistorian
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.metrics import metrics, timed
 from rotkehlchen.typing import EthereumTransaction, Fee, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.accounting import (
@@ -37,12 +41,16 @@ from rotkehlchen.utils.accounting import (
     action_get_assets,
     action_get_timestamp,
     action_get_type,
+    merge_sorted_actions,
 )
 from rotkehlchen.utils.misc import timestamp_to_date
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Seconds of history processing after which the processing loop yields to other greenlets
+HISTORY_PROCESSING_TIME_SLICE = 0.05
+
 
 class Accountant():
 
@@ -57,7 +65,13 @@ class Accountant():
         self.db = db
         profit_currency = db.get_main_currency()
         self.msg_aggregator = msg_aggregator
-        self.csvexporter = CSVExporter(profit_currency, user_directory, create_csv)
+        self.csvexporter = CSVExporter(
+            database=db,
+            profit_currency=profit_currency,
+            user_directory=user_directory,
+            create_csv=create_csv,
+            msg_aggregator=msg_aggregator,
+        )
         self.events = TaxableEvents(self.csvexporter, profit_currency)
 
         self.asset_movement_fees = FVal(0)
@@ -250,6 +264,7 @@ class Accountant():
                 is_virtual=False,
             )
 
+    @timed('rotki_accounting_process_history_seconds')
     def process_history(
             self,
             start_ts: Timestamp,
@@ -278,37 +293,35 @@ class Accountant():
         self.start_ts = start_ts
         self.eth_transactions_gas_costs = FVal(0)
         self.asset_movement_fees = FVal(0)
-        self.csvexporter.reset_csv_lists()
 
         # Ask the DB for the settings once at the start of processing so we got the
         # same settings through the entire task
         db_settings = self.db.get_settings()
         self._customize(db_settings)
-
-        actions: List[TaxableAction] = list(trade_history)
-        # If we got loans, we need to interleave them with the full history and re-sort
-        if len(loan_history) != 0:
-            actions.extend(loan_history)
-
-        if len(asset_movements) != 0:
-            actions.extend(asset_movements)
-
-        if len(eth_transactions) != 0:
-            actions.extend(eth_transactions)
-
-        if len(defi_events) != 0:
-            actions.extend(defi_events)
-
-        actions.sort(
-            key=lambda action: action_get_timestamp(action),
-        )
+        self.csvexporter.start_report(start_ts, end_ts)
+
+        # All sources come ordered by timestamp so merge them as they are processed
+        sources: List[Sequence[TaxableAction]] = [
+            trade_history,
+            loan_history,
+            asset_movements,
+            eth_transactions,
+            defi_events,
+        ]
+        actions_num = sum(len(x) for x in sources)
+        actions = merge_sorted_actions(sources)
         # The first ts is the ts of the first action we have in history or 0 for empty history
-        first_ts = Timestamp(0) if len(actions) == 0 else action_get_timestamp(actions[0])
+        first_ts = Timestamp(0)
+        first_action = next(actions, None)
+        if first_action is not None:
+            first_ts = action_get_timestamp(first_action)
+            actions = chain([first_action], actions)
         self.currently_processing_timestamp = first_ts
         self.started_processing_timestamp = first_ts
 
         prev_time = Timestamp(0)
         count = 0
+        last_yield_time = time.monotonic()
         for action in actions:
             try:
                 (
@@ -316,6 +329,7 @@ class Accountant():
                     prev_time,
                 ) = self.process_action(action, end_ts, prev_time, db_settings)
             except PriceQueryUnsupportedAsset as e:
+                metrics.inc('rotki_accounting_skipped_actions_total', reason='unsupported_asset')
                 ts = action_get_timestamp(action)
                 self.msg_aggregator.add_error(
                     f'Skipping action at '
@@ -329,6 +343,7 @@ class Accountant():
                 )
                 continue
             except NoPriceForGivenTimestamp as e:
+                metrics.inc('rotki_accounting_skipped_actions_total', reason='no_price')
                 ts = action_get_timestamp(action)
                 self.msg_aggregator.add_error(
                     f'Skipping action at '
@@ -342,6 +357,7 @@ class Accountant():
                 )
                 continue
             except RemoteError as e:
+                metrics.inc('rotki_accounting_skipped_actions_total', reason='remote_error')
                 ts = action_get_timestamp(action)
                 self.msg_aggregator.add_error(
                     f'Skipping action at '
@@ -358,14 +374,18 @@ class Accountant():
             if not should_continue:
                 break
 
-            if count % 500 == 0:
+            count += 1
+            if time.monotonic() - last_yield_time >= HISTORY_PROCESSING_TIME_SLICE:
                 # This loop can take a very long time depending on the amount of actions
                 # to process. We need to yield to other greenlets or else calls to the
-                # API may time out
-                gevent.sleep(0.5)
-            count += 1
+                # API may time out. Yielding only after a slice of processing time has
+                # passed keeps the API responsive without sleeping for no reason.
+                set_current_task_progress(FVal(count * 100) / actions_num)
+                gevent.sleep(0)
+                last_yield_time = time.monotonic()
 
         self.events.calculate_asset_details()
+        self.csvexporter.finish_report()
         Inquirer().save_historical_forex_data()
 
         sum_other_actions = (
@@ -393,9 +413,11 @@ class Accountant():
                     sum_other_actions,
                 ),
             },
-            'all_events': self.csvexporter.all_events,
+            'report_id': self.csvexporter.report_id,
+            'events_num': self.csvexporter.events_num,
         }
 
+    @timed('rotki_accounting_process_action_seconds')
     def process_action(
             self,
             action: TaxableAction,
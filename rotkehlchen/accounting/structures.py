@@ -1,12 +1,12 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, NamedTuple, Tuple
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.errors import InputError
 from rotkehlchen.fval import FVal
-from rotkehlchen.typing import Timestamp
+from rotkehlchen.typing import EventType, Location, Timestamp
 
 
 class DefiEventType(Enum):
@@ -64,6 +64,65 @@ class DefiEvent:
         return self.event_type.is_profitable()
 
 
+class TaxReportEvent(NamedTuple):
+    """A taxable event as processed by a tax report run
+
+    Assets are kept as their identifiers and are empty strings if the event
+    did not pay or receive anything.
+    """
+    event_type: EventType
+    location: Location
+    paid_in_profit_currency: FVal
+    paid_asset: str
+    paid_in_asset: FVal
+    taxable_amount: FVal
+    taxable_bought_cost_in_profit_currency: FVal
+    received_asset: str
+    taxable_received_in_profit_currency: FVal
+    received_in_asset: FVal
+    net_profit_or_loss: FVal
+    timestamp: Timestamp
+    is_virtual: bool
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'type': self.event_type,
+            'location': str(self.location),
+            'paid_in_profit_currency': str(self.paid_in_profit_currency),
+            'paid_asset': self.paid_asset,
+            'paid_in_asset': str(self.paid_in_asset),
+            'taxable_amount': str(self.taxable_amount),
+            'taxable_bought_cost_in_profit_currency': str(
+                self.taxable_bought_cost_in_profit_currency,
+            ),
+            'received_asset': self.received_asset,
+            'taxable_received_in_profit_currency': str(
+                self.taxable_received_in_profit_currency,
+            ),
+            'received_in_asset': str(self.received_in_asset),
+            'net_profit_or_loss': str(self.net_profit_or_loss),
+            'time': self.timestamp,
+            'is_virtual': self.is_virtual,
+        }
+
+    def serialize_for_db(self) -> Tuple[Any, ...]:
+        return (
+            self.event_type,
+            self.location.serialize_for_db(),
+            str(self.paid_in_profit_currency),
+            self.paid_asset,
+            str(self.paid_in_asset),
+            str(self.taxable_amount),
+            str(self.taxable_bought_cost_in_profit_currency),
+            self.received_asset,
+            str(self.taxable_received_in_profit_currency),
+            str(self.received_in_asset),
+            str(self.net_profit_or_loss),
+            self.timestamp,
+            self.is_virtual,
+        )
+
+
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class Balance:
     amount: FVal = ZERO
@@ -0,0 +1,97 @@
+import json
+import logging
+from typing import Any, Iterator, List
+
+from gevent.lock import Semaphore
+from gevent.queue import Empty, Full, Queue
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.serialization.serialize import process_result
+from rotkehlchen.user_messages import NotificationType
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# How many undelivered notifications a subscriber can have before it's dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Seconds of inactivity after which a keepalive comment is sent to subscribers
+KEEPALIVE_INTERVAL = 15
+
+
+def format_server_sent_event(event_type: NotificationType, data: Any) -> str:
+    """Formats the given data as a server sent event message"""
+    payload = json.dumps(process_result(data))
+    return f'event: {str(event_type)}\ndata: {payload}\n\n'
+
+
+class Notifier():
+    """Pushes notifications to all clients subscribed to the server sent events stream
+
+    Each subscriber gets its own bounded queue. If a subscriber does not keep up
+    and its queue is full it gets dropped, so a stuck client can't make the backend
+    accumulate notifications forever.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: List[Queue] = []
+        self.lock = Semaphore()
+
+    def has_subscribers(self) -> bool:
+        return len(self.subscribers) != 0
+
+    def subscribe(self) -> Queue:
+        queue = Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.append(queue)
+        log.debug(f'New notifications subscriber. Now at {len(self.subscribers)}')
+        return queue
+
+    def unsubscribe(self, queue: Queue) -> None:
+        with self.lock:
+            if queue in self.subscribers:
+                self.subscribers.remove(queue)
+        log.debug(f'Notifications subscriber left. Now at {len(self.subscribers)}')
+
+    def broadcast(self, event_type: NotificationType, data: Any) -> bool:
+        """Sends the notification to all subscribers
+
+        Returns True if at least one subscriber received it"""
+        if not self.has_subscribers():
+            return False
+
+        message = format_server_sent_event(event_type, data)
+        delivered = False
+        with self.lock:
+            for queue in list(self.subscribers):
+                try:
+                    queue.put_nowait(message)
+                    delivered = True
+                except Full:
+                    log.warning('Dropping notifications subscriber that does not keep up')
+                    self.subscribers.remove(queue)
+                    # Replace whatever is pending with a sentinel that closes the stream
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+
+        return delivered
+
+    def stream(self, queue: Queue) -> Iterator[str]:
+        """Generator of the server sent events for a subscriber's queue
+
+        Unsubscribes once the client disconnects and the generator is closed"""
+        try:
+            # Make sure headers get flushed to the client immediately
+            yield ': connected\n\n'
+            while True:
+                try:
+                    message = queue.get(timeout=KEEPALIVE_INTERVAL)
+                except Empty:
+                    yield ': keepalive\n\n'
+                    continue
+
+                if message is None:  # we got dropped
+                    return
+                yield message
+        finally:
+            self.unsubscribe(queue)
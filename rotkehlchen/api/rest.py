@@ -10,9 +10,10 @@ from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union, ov
 import gevent
 from flask import Response, make_response
 from gevent.event import Event
-from gevent.lock import Semaphore
 from typing_extensions import Literal
 
+from rotkehlchen.api.notifier import Notifier
+from rotkehlchen.api.tasks import TaskRegistry
 from rotkehlchen.api.v1.encoding import TradeSchema
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.resolver import AssetResolver
@@ -45,6 +46,7 @@ from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.metrics import metrics
 from rotkehlchen.premium.premium import PremiumCredentials
 from rotkehlchen.rotkehlchen import FREE_ASSET_MOVEMENTS_LIMIT, FREE_TRADES_LIMIT, Rotkehlchen
 from rotkehlchen.serialization.serialize import process_result, process_result_list
@@ -68,6 +70,7 @@ from rotkehlchen.typing import (
     TradePair,
     TradeType,
 )
+from rotkehlchen.utils.profiling import SamplingProfiler
 from rotkehlchen.utils.version_check import check_if_version_up_to_date
 
 if TYPE_CHECKING:
@@ -179,71 +182,33 @@ class RestAPI():
         mainloop_greenlet.link_exception(self._handle_killed_greenlets)
         # Greenlets that will be waited for when we shutdown
         self.waited_greenlets = [mainloop_greenlet]
-        # Greenlets that can be killed instead of waited for when we shutdown
-        self.killable_greenlets: List[gevent.Greenlet] = []
-        self.task_lock = Semaphore()
-        self.task_id = 0
-        self.task_results: Dict[int, Any] = {}
+        # Pushes task completions, messages and balance updates to subscribed clients
+        self.notifier = Notifier()
+        self.rotkehlchen.msg_aggregator.notifier = self.notifier
+        # Async tasks spawned by API calls. Can be killed instead of waited for at shutdown
+        self.task_registry = TaskRegistry(notifier=self.notifier)
 
         self.trade_schema = TradeSchema()
+        self.profiler: Optional[SamplingProfiler] = None
 
     # - Private functions not exposed to the API
-    def _new_task_id(self) -> int:
-        with self.task_lock:
-            task_id = self.task_id
-            self.task_id += 1
-        return task_id
-
-    def _write_task_result(self, task_id: int, result: Any) -> None:
-        with self.task_lock:
-            self.task_results[task_id] = result
-
     def _handle_killed_greenlets(self, greenlet: gevent.Greenlet) -> None:
         if not greenlet.exception:
             log.warning('handle_killed_greenlets without an exception')
             return
 
-        try:
-            task_id = greenlet.task_id
-            task_str = f'Greenlet for task {task_id}'
-        except AttributeError:
-            task_id = None
-            task_str = 'Main greenlet'
-
         log.error(
-            '{} dies with exception: {}.\n'
+            'Main greenlet dies with exception: {}.\n'
             'Exception Name: {}\nException Info: {}\nTraceback:\n {}'
             .format(
-                task_str,
                 greenlet.exception,
                 greenlet.exc_info[0],
                 greenlet.exc_info[1],
                 ''.join(traceback.format_tb(greenlet.exc_info[2])),
             ))
-        # also write an error for the task result if it's not the main greenlet
-        if task_id is not None:
-            result = {
-                'result': None,
-                'message': f'The backend query task died unexpectedly: {str(greenlet.exception)}',
-            }
-            self._write_task_result(task_id, result)
-
-    def _do_query_async(self, command: str, task_id: int, **kwargs: Any) -> None:
-        result = getattr(self, command)(**kwargs)
-        self._write_task_result(task_id, result)
 
     def _query_async(self, command: str, **kwargs: Any) -> Response:
-        task_id = self._new_task_id()
-
-        greenlet = gevent.spawn(
-            self._do_query_async,
-            command,
-            task_id,
-            **kwargs,
-        )
-        greenlet.task_id = task_id
-        greenlet.link_exception(self._handle_killed_greenlets)
-        self.killable_greenlets.append(greenlet)
+        task_id = self.task_registry.spawn(command, getattr(self, command), **kwargs)
         return api_response(_wrap_in_ok_result({'task_id': task_id}), status_code=HTTPStatus.OK)
 
     # - Public functions not exposed via the rest api
@@ -252,7 +217,7 @@ class RestAPI():
         log.debug('Waiting for greenlets')
         gevent.wait(self.waited_greenlets)
         log.debug('Waited for greenlets. Killing all other greenlets')
-        gevent.killall(self.killable_greenlets)
+        self.task_registry.kill_all()
         log.debug('Greenlets killed. Killing zerorpc greenlet')
         log.debug('Shutdown completed')
         logging.shutdown()
@@ -279,41 +244,51 @@ class RestAPI():
     def query_tasks_outcome(self, task_id: Optional[int]) -> Response:
         if task_id is None:
             # If no task id is given return list of all pending/completed tasks
-            result = _wrap_in_ok_result([greenlet.task_id for greenlet in self.killable_greenlets])
+            result = _wrap_in_ok_result(self.task_registry.task_ids())
             return api_response(result=result, status_code=HTTPStatus.OK)
 
-        with self.task_lock:
-            for idx, greenlet in enumerate(self.killable_greenlets):
-                if greenlet.task_id == task_id:
-                    if task_id in self.task_results:
-                        # Task has completed and we just got the outcome
-                        function_response = self.task_results.pop(int(task_id), None)
-                        # The result of the original request
-                        result = function_response['result']
-                        # The message of the original request
-                        message = function_response['message']
-                        ret = {'result': result, 'message': message}
-                        result_dict = {
-                            'result': {'status': 'completed', 'outcome': process_result(ret)},
-                            'message': '',
-                        }
-                        # Also remove the greenlet from the killable_greenlets
-                        self.killable_greenlets.pop(idx)
-                        return api_response(result=result_dict, status_code=HTTPStatus.OK)
-                    else:
-                        # Task is still pending and the greenlet is running
-                        result_dict = {
-                            'result': {'status': 'pending', 'outcome': None},
-                            'message': f'The task with id {task_id} is still pending',
-                        }
-                        return api_response(result=result_dict, status_code=HTTPStatus.OK)
-
-        # The task has not been found
+        task = self.task_registry.get(task_id)
+        if task is None:
+            result_dict = {
+                'result': {'status': 'not-found', 'outcome': None},
+                'message': f'No task with id {task_id} found',
+            }
+            return api_response(result=result_dict, status_code=HTTPStatus.NOT_FOUND)
+
+        if not task.finished:
+            # Task is still queued or pending and the greenlet is running
+            result_dict = {
+                'result': {'status': 'pending', 'outcome': None},
+                'message': f'The task with id {task_id} is still pending',
+            }
+            return api_response(result=result_dict, status_code=HTTPStatus.OK)
+
+        # Task has finished and we just got the outcome. Remove it from the registry
+        self.task_registry.pop_finished(task_id)
+        function_response = task.result
+        assert function_response is not None, 'finished tasks should always have a result'
+        # The result and message of the original request
+        ret = {'result': function_response['result'], 'message': function_response['message']}
         result_dict = {
-            'result': {'status': 'not-found', 'outcome': None},
-            'message': f'No task with id {task_id} found',
+            'result': {'status': str(task.status), 'outcome': process_result(ret)},
+            'message': '',
         }
-        return api_response(result=result_dict, status_code=HTTPStatus.NOT_FOUND)
+        return api_response(result=result_dict, status_code=HTTPStatus.OK)
+
+    @require_loggedin_user()
+    def query_tasks_info(self) -> Response:
+        result = [process_result(task.serialize()) for task in self.task_registry.all_tasks()]
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
+    @require_loggedin_user()
+    def cancel_task(self, task_id: int) -> Response:
+        if not self.task_registry.cancel(task_id):
+            return api_response(
+                wrap_in_fail_result(f'No unfinished task with id {task_id} found'),
+                status_code=HTTPStatus.NOT_FOUND,
+            )
+
+        return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
     @staticmethod
     def get_fiat_exchange_rates(currencies: Optional[List[Asset]]) -> Response:
@@ -883,9 +858,8 @@ class RestAPI():
         #    All results would be discarded anyway since we are logging out.
         # 2. Have an intricate stop() notification system for each greenlet, but
         #   that is going to get complicated fast.
-        gevent.killall(self.killable_greenlets)
-        with self.task_lock:
-            self.task_results = {}
+        self.task_registry.kill_all()
+        self.task_registry.clear()
         self.rotkehlchen.logout()
         result_dict['result'] = True
         return api_response(result_dict, status_code=HTTPStatus.OK)
@@ -1037,6 +1011,15 @@ class RestAPI():
         result = {'warnings': warnings, 'errors': errors}
         return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
 
+    def stream_notifications(self) -> Response:
+        queue = self.notifier.subscribe()
+        return Response(
+            self.notifier.stream(queue),
+            status=HTTPStatus.OK,
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+
     def _process_history(
             self,
             from_timestamp: Timestamp,
@@ -1071,9 +1054,48 @@ class RestAPI():
         result_dict = _wrap_in_result(result=process_result(result), message=msg)
         return api_response(result_dict, status_code=HTTPStatus.OK)
 
+    @require_loggedin_user()
+    def get_history_events(
+            self,
+            report_id: Optional[int],
+            offset: int,
+            limit: Optional[int],
+            event_type: Optional[str],
+            from_timestamp: Optional[Timestamp],
+            to_timestamp: Optional[Timestamp],
+    ) -> Response:
+        latest_report = self.rotkehlchen.data.db.get_latest_tax_report()
+        if latest_report is None:
+            result_dict = wrap_in_fail_result('No history processed in order to get its events')
+            return api_response(result_dict, status_code=HTTPStatus.CONFLICT)
+
+        if report_id is None:
+            report_id = latest_report[0]
+        elif report_id != latest_report[0]:
+            result_dict = wrap_in_fail_result(
+                f'History report with id {report_id} does not exist. Only the events '
+                f'of the latest report are kept',
+            )
+            return api_response(result_dict, status_code=HTTPStatus.CONFLICT)
+
+        events, entries_found = self.rotkehlchen.data.db.get_tax_report_events(
+            report_id=report_id,
+            offset=offset,
+            limit=limit,
+            event_type=event_type,
+            from_ts=from_timestamp,
+            to_ts=to_timestamp,
+        )
+        result = {
+            'report_id': report_id,
+            'entries': [x.serialize() for x in events],
+            'entries_found': entries_found,
+        }
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
     @require_loggedin_user()
     def export_processed_history_csv(self, directory_path: Path) -> Response:
-        if len(self.rotkehlchen.accountant.csvexporter.all_events_csv) == 0:
+        if self.rotkehlchen.data.db.get_latest_tax_report() is None:
             result_dict = wrap_in_fail_result('No history processed in order to perform an export')
             return api_response(result_dict, status_code=HTTPStatus.CONFLICT)
 
@@ -1439,6 +1461,49 @@ class RestAPI():
     def ping() -> Response:
         return api_response(_wrap_in_ok_result(True), status_code=HTTPStatus.OK)
 
+    @staticmethod
+    def get_metrics() -> Response:
+        if not metrics.enabled:
+            return api_response(
+                wrap_in_fail_result(
+                    'Metrics are not collected. Start the backend with --enable-metrics',
+                ),
+                status_code=HTTPStatus.CONFLICT,
+            )
+
+        return make_response(
+            (
+                metrics.render(),
+                HTTPStatus.OK,
+                {"mimetype": "text/plain", "Content-Type": "text/plain; version=0.0.4"},
+            ),
+        )
+
+    @require_loggedin_user()
+    def profile_backend(self, duration: int, interval: float) -> Response:
+        if self.profiler is not None:
+            return api_response(
+                wrap_in_fail_result('The backend is already being profiled'),
+                status_code=HTTPStatus.CONFLICT,
+            )
+
+        profiler = SamplingProfiler(interval=interval)
+        self.profiler = profiler
+        profiler.start()
+        try:
+            gevent.sleep(duration)
+        finally:
+            collapsed_stacks = profiler.stop()
+            self.profiler = None
+
+        return make_response(
+            (
+                collapsed_stacks,
+                HTTPStatus.OK,
+                {"mimetype": "text/plain", "Content-Type": "text/plain"},
+            ),
+        )
+
     @require_loggedin_user()
     def import_data(
             self,
@@ -1559,12 +1624,13 @@ class RestAPI():
         )
 
     @require_premium_user(active_check=False)
-    def get_makerdao_dsr_history(self, async_query: bool) -> Response:
+    def get_makerdao_dsr_history(self, async_query: bool, reset_db_data: bool) -> Response:
         return self._api_query_for_eth_module(
             async_query=async_query,
             module='makerdao_dsr',
             method='get_historical_dsr',
             query_specific_balances_before=None,
+            reset_db_data=reset_db_data,
         )
 
     @require_loggedin_user()
@@ -1577,12 +1643,13 @@ class RestAPI():
         )
 
     @require_premium_user(active_check=False)
-    def get_makerdao_vault_details(self, async_query: bool) -> Response:
+    def get_makerdao_vault_details(self, async_query: bool, reset_db_data: bool) -> Response:
         return self._api_query_for_eth_module(
             async_query=async_query,
             module='makerdao_vaults',
             method='get_vault_details',
             query_specific_balances_before=None,
+            reset_db_data=reset_db_data,
         )
 
     @require_loggedin_user()
@@ -22,6 +22,7 @@ from rotkehlchen.api.v1.resources import (
     AllBalancesResource,
     AssetIconsResource,
     AssetMovementsResource,
+    AsyncTasksInfoResource,
     AsyncTasksResource,
     BlockchainBalancesResource,
     BlockchainsAccountsResource,
@@ -36,6 +37,7 @@ from rotkehlchen.api.v1.resources import (
     ExchangesResource,
     ExternalServicesResource,
     FiatExchangeRatesResource,
+    HistoryEventsResource,
     HistoryExportingResource,
     HistoryProcessingResource,
     IgnoredAssetsResource,
@@ -45,9 +47,12 @@ from rotkehlchen.api.v1.resources import (
     MakerDAOVaultsResource,
     ManuallyTrackedBalancesResource,
     MessagesResource,
+    MetricsResource,
+    NotificationsResource,
     OwnedAssetsResource,
     PeriodicDataResource,
     PingResource,
+    ProfilingResource,
     QueriedAddressesResource,
     SettingsResource,
     StatisticsAssetBalanceResource,
@@ -85,6 +90,7 @@ URLS_V1: URLS = [
     ('/settings', SettingsResource),
     ('/tasks/', AsyncTasksResource),
     ('/tasks/<int:task_id>', AsyncTasksResource, 'specific_async_tasks_resource'),
+    ('/tasks/info', AsyncTasksInfoResource),
     ('/fiat_exchange_rates', FiatExchangeRatesResource),
     ('/external_services/', ExternalServicesResource),
     ('/exchanges', ExchangesResource),
@@ -118,8 +124,10 @@ URLS_V1: URLS = [
     ('/statistics/value_distribution', StatisticsValueDistributionResource),
     ('/statistics/renderer', StatisticsRendererResource),
     ('/messages/', MessagesResource),
+    ('/notifications', NotificationsResource),
     ('/periodic/', PeriodicDataResource),
     ('/history/', HistoryProcessingResource),
+    ('/history/events', HistoryEventsResource),
     ('/history/export/', HistoryExportingResource),
     ('/queried_addresses', QueriedAddressesResource),
     ('/blockchains/ETH/transactions', EthereumTransactionsResource),
@@ -146,6 +154,8 @@ URLS_V1: URLS = [
     ('/assets/ignored', IgnoredAssetsResource),
     ('/version', VersionResource),
     ('/ping', PingResource),
+    ('/metrics', MetricsResource),
+    ('/profiling', ProfilingResource),
     ('/import', DataImportResource),
 ]
 
@@ -0,0 +1,224 @@
+import logging
+import time
+import traceback
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+import gevent
+from gevent.lock import BoundedSemaphore, Semaphore
+
+from rotkehlchen.api.notifier import Notifier
+from rotkehlchen.fval import FVal
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.user_messages import NotificationType
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# How many async tasks can run at the same time. The rest wait in the queue
+DEFAULT_MAX_CONCURRENT_TASKS = 8
+# For how long in seconds to keep results of finished tasks that nobody asked for
+DEFAULT_TASK_RESULT_TTL = 3600
+
+
+class TaskStatus(Enum):
+    QUEUED = 1
+    PENDING = 2
+    COMPLETED = 3
+    CANCELLED = 4
+
+    def __str__(self) -> str:
+        if self == TaskStatus.QUEUED:
+            return 'queued'
+        if self == TaskStatus.PENDING:
+            return 'pending'
+        if self == TaskStatus.COMPLETED:
+            return 'completed'
+        if self == TaskStatus.CANCELLED:
+            return 'cancelled'
+
+        # else
+        raise RuntimeError(f'Corrupt value {self} for TaskStatus -- Should never happen')
+
+
+class AsyncTask():
+    """An async task that runs a RestAPI command in its own greenlet"""
+
+    def __init__(self, task_id: int, command: str) -> None:
+        self.id = task_id
+        self.command = command
+        self.status = TaskStatus.QUEUED
+        self.greenlet: Optional[gevent.Greenlet] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.progress: Optional[FVal] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+
+    def runtime(self) -> Optional[FVal]:
+        """Returns for how many seconds the task has been running or ran"""
+        if self.started_at is None:
+            return None
+
+        end = time.time() if self.finished_at is None else self.finished_at
+        return FVal(end - self.started_at)
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'task_id': self.id,
+            'command': self.command,
+            'status': str(self.status),
+            'runtime': self.runtime(),
+            'progress': self.progress,
+        }
+
+
+class TaskRegistry():
+    """Keeps track of all async tasks spawned via the API
+
+    Tasks are kept in a dict keyed by their id. At most `max_concurrent` tasks run
+    at the same time and the rest wait in the queue for a slot. Results of finished
+    tasks are kept until they are retrieved or until `result_ttl` seconds pass,
+    so that clients which never poll for a task don't leak memory.
+
+    If a notifier is given, subscribers are notified whenever a task finishes.
+    """
+
+    def __init__(
+            self,
+            max_concurrent: int = DEFAULT_MAX_CONCURRENT_TASKS,
+            result_ttl: int = DEFAULT_TASK_RESULT_TTL,
+            notifier: Optional[Notifier] = None,
+    ) -> None:
+        self.notifier = notifier
+        self.result_ttl = result_ttl
+        self.tasks: Dict[int, AsyncTask] = {}
+        self.lock = Semaphore()
+        self.slots = BoundedSemaphore(max_concurrent)
+        self.next_id = 0
+
+    def _evict_expired(self) -> None:
+        """Drops finished tasks whose results have been waiting for longer than the TTL
+
+        Should be called with the lock held
+        """
+        now = time.time()
+        expired_ids = [
+            task.id for task in self.tasks.values()
+            if task.finished_at is not None and now - task.finished_at > self.result_ttl
+        ]
+        for task_id in expired_ids:
+            log.debug(f'Evicting unclaimed result of async task {task_id}')
+            del self.tasks[task_id]
+
+    def _run(self, task: AsyncTask, method: Callable, **kwargs: Any) -> None:
+        with self.slots:
+            task.status = TaskStatus.PENDING
+            task.started_at = time.time()
+            result = method(**kwargs)
+        self._finish(task, TaskStatus.COMPLETED, result)
+
+    def _finish(self, task: AsyncTask, status: TaskStatus, result: Dict[str, Any]) -> None:
+        with self.lock:
+            task.status = status
+            task.result = result
+            task.finished_at = time.time()
+            if task.started_at is None:
+                task.started_at = task.finished_at
+
+        if self.notifier is not None:
+            self.notifier.broadcast(NotificationType.TASK_COMPLETED, task.serialize())
+
+    def _handle_killed_greenlet(self, greenlet: gevent.Greenlet) -> None:
+        task = greenlet.async_task
+        log.error(
+            'Greenlet for task {} dies with exception: {}.\n'
+            'Exception Name: {}\nException Info: {}\nTraceback:\n {}'
+            .format(
+                task.id,
+                greenlet.exception,
+                greenlet.exc_info[0],
+                greenlet.exc_info[1],
+                ''.join(traceback.format_tb(greenlet.exc_info[2])),
+            ))
+        result = {
+            'result': None,
+            'message': f'The backend query task died unexpectedly: {str(greenlet.exception)}',
+        }
+        self._finish(task, TaskStatus.COMPLETED, result)
+
+    def spawn(self, command: str, method: Callable, **kwargs: Any) -> int:
+        """Creates a new task that runs method with the given kwargs and returns its id
+
+        The task starts as soon as there is a free slot.
+        """
+        with self.lock:
+            self._evict_expired()
+            task = AsyncTask(task_id=self.next_id, command=command)
+            self.next_id += 1
+            self.tasks[task.id] = task
+
+        greenlet = gevent.spawn(self._run, task, method, **kwargs)
+        greenlet.async_task = task
+        greenlet.link_exception(self._handle_killed_greenlet)
+        task.greenlet = greenlet
+        return task.id
+
+    def get(self, task_id: int) -> Optional[AsyncTask]:
+        with self.lock:
+            self._evict_expired()
+            return self.tasks.get(task_id, None)
+
+    def pop_finished(self, task_id: int) -> Optional[AsyncTask]:
+        """Removes and returns the task with the given id if it has finished"""
+        with self.lock:
+            task = self.tasks.get(task_id, None)
+            if task is None or not task.finished:
+                return None
+
+            return self.tasks.pop(task_id)
+
+    def task_ids(self) -> List[int]:
+        with self.lock:
+            self._evict_expired()
+            return list(self.tasks.keys())
+
+    def all_tasks(self) -> List[AsyncTask]:
+        with self.lock:
+            self._evict_expired()
+            return list(self.tasks.values())
+
+    def cancel(self, task_id: int) -> bool:
+        """Cancels a queued or running task. Returns False if there is no such unfinished task"""
+        task = self.get(task_id)
+        if task is None or task.finished:
+            return False
+
+        if task.greenlet is not None:
+            task.greenlet.kill()
+        self._finish(task, TaskStatus.CANCELLED, {
+            'result': None,
+            'message': f'The task with id {task_id} was cancelled',
+        })
+        return True
+
+    def kill_all(self) -> None:
+        """Kills all unfinished tasks and marks them as cancelled"""
+        with self.lock:
+            unfinished = [x for x in self.tasks.values() if not x.finished]
+        gevent.killall([x.greenlet for x in unfinished if x.greenlet is not None])
+        # A killed greenlet neither reaches _finish() nor calls its exception link
+        for task in unfinished:
+            self._finish(task, TaskStatus.CANCELLED, {
+                'result': None,
+                'message': f'The task with id {task.id} was cancelled',
+            })
+
+    def clear(self) -> None:
+        """Drops all tasks and their results"""
+        with self.lock:
+            self.tasks = {}
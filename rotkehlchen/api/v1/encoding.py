@@ -14,7 +14,17 @@ from rotkehlchen.balances.manual import ManuallyTrackedBalance
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
 from rotkehlchen.chain.bitcoin.utils import is_valid_btc_address
 from rotkehlchen.chain.ethereum.manager import EthereumManager
-from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.constants.misc import (
+    EV_ASSET_MOVE,
+    EV_BUY,
+    EV_DEFI,
+    EV_INTEREST_PAYMENT,
+    EV_LOAN_SETTLE,
+    EV_MARGIN_CLOSE,
+    EV_SELL,
+    EV_TX_GAS_COST,
+    ZERO,
+)
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors import DeserializationError, UnknownAsset, XPUBError
 from rotkehlchen.exchanges.kraken import KrakenAccountType
@@ -610,10 +620,14 @@ class AsyncQueryArgumentSchema(Schema):
     async_query = fields.Boolean(missing=False)
 
 
-class AsyncHistoricalQuerySchema(AsyncQueryArgumentSchema):
+class AsyncResetQuerySchema(AsyncQueryArgumentSchema):
     """A schema for getters that have 2 arguments.
     One to enable async querying and another to force reset DB data by querying everytying again"""
     reset_db_data = fields.Boolean(missing=False)
+
+
+class AsyncHistoricalQuerySchema(AsyncResetQuerySchema):
+    """A schema for getters that can also be limited to a time range"""
     from_timestamp = TimestampField(missing=Timestamp(0))
     to_timestamp = TimestampField(missing=ts_now)
 
@@ -622,6 +636,10 @@ class AsyncTasksQuerySchema(Schema):
     task_id = fields.Integer(strict=True, missing=None)
 
 
+class AsyncTasksCancelSchema(Schema):
+    task_id = fields.Integer(strict=True, required=True)
+
+
 class EthereumTransactionQuerySchema(Schema):
     async_query = fields.Boolean(missing=False)
     address = EthereumAddressField(missing=None)
@@ -918,6 +936,33 @@ class HistoryProcessingSchema(Schema):
     async_query = fields.Boolean(missing=False)
 
 
+class HistoryEventsQuerySchema(Schema):
+    report_id = fields.Integer(missing=None)
+    offset = fields.Integer(
+        validate=webargs.validate.Range(min=0, error='The offset must be >= 0'),
+        missing=0,
+    )
+    limit = fields.Integer(
+        validate=webargs.validate.Range(min=1, error='The limit must be >= 1'),
+        missing=None,
+    )
+    event_type = fields.String(
+        validate=webargs.validate.OneOf(choices=(
+            EV_BUY,
+            EV_SELL,
+            EV_TX_GAS_COST,
+            EV_ASSET_MOVE,
+            EV_LOAN_SETTLE,
+            EV_INTEREST_PAYMENT,
+            EV_MARGIN_CLOSE,
+            EV_DEFI,
+        )),
+        missing=None,
+    )
+    from_timestamp = TimestampField(missing=None)
+    to_timestamp = TimestampField(missing=None)
+
+
 class HistoryExportingSchema(Schema):
     directory_path = DirectoryField(required=True)
 
@@ -1097,6 +1142,26 @@ class DataImportSchema(Schema):
     filepath = FileField(required=True)
 
 
+class ProfilingSchema(Schema):
+    duration = fields.Integer(
+        required=True,
+        strict=True,
+        validate=webargs.validate.Range(
+            min=1,
+            max=600,
+            error='The profiling duration must be between 1 and 600 seconds',
+        ),
+    )
+    interval = fields.Float(
+        validate=webargs.validate.Range(
+            min=0.001,
+            max=1,
+            error='The sampling interval must be between 0.001 and 1 seconds',
+        ),
+        missing=0.01,
+    )
+
+
 class FiatExchangeRatesSchema(Schema):
     currencies = DelimitedOrNormalList(FiatAssetField(), missing=None)
 
@@ -15,6 +15,8 @@ from rotkehlchen.api.v1.encoding import (
     AssetIconsSchema,
     AsyncHistoricalQuerySchema,
     AsyncQueryArgumentSchema,
+    AsyncResetQuerySchema,
+    AsyncTasksCancelSchema,
     AsyncTasksQuerySchema,
     BaseXpubSchema,
     BlockchainAccountsDeleteSchema,
@@ -32,12 +34,14 @@ from rotkehlchen.api.v1.encoding import (
     ExternalServicesResourceAddSchema,
     ExternalServicesResourceDeleteSchema,
     FiatExchangeRatesSchema,
+    HistoryEventsQuerySchema,
     HistoryExportingSchema,
     HistoryProcessingSchema,
     IgnoredAssetsSchema,
     ManuallyTrackedBalancesDeleteSchema,
     ManuallyTrackedBalancesSchema,
     NewUserSchema,
+    ProfilingSchema,
     QueriedAddressesSchema,
     StatisticsAssetBalanceSchema,
     StatisticsValueDistributionSchema,
@@ -174,6 +178,18 @@ class AsyncTasksResource(BaseResource):
     def get(self, task_id: Optional[int]) -> Response:
         return self.rest_api.query_tasks_outcome(task_id=task_id)
 
+    delete_schema = AsyncTasksCancelSchema()
+
+    @use_kwargs(delete_schema, location='view_args')  # type: ignore
+    def delete(self, task_id: int) -> Response:
+        return self.rest_api.cancel_task(task_id=task_id)
+
+
+class AsyncTasksInfoResource(BaseResource):
+
+    def get(self) -> Response:
+        return self.rest_api.query_tasks_info()
+
 
 class FiatExchangeRatesResource(BaseResource):
 
@@ -615,6 +631,12 @@ class MessagesResource(BaseResource):
         return self.rest_api.get_messages()
 
 
+class NotificationsResource(BaseResource):
+
+    def get(self) -> Response:
+        return self.rest_api.stream_notifications()
+
+
 class HistoryProcessingResource(BaseResource):
 
     get_schema = HistoryProcessingSchema()
@@ -633,6 +655,30 @@ class HistoryProcessingResource(BaseResource):
         )
 
 
+class HistoryEventsResource(BaseResource):
+
+    get_schema = HistoryEventsQuerySchema()
+
+    @use_kwargs(get_schema, location='json_and_query')  # type: ignore
+    def get(
+            self,
+            report_id: Optional[int],
+            offset: int,
+            limit: Optional[int],
+            event_type: Optional[str],
+            from_timestamp: Optional[Timestamp],
+            to_timestamp: Optional[Timestamp],
+    ) -> Response:
+        return self.rest_api.get_history_events(
+            report_id=report_id,
+            offset=offset,
+            limit=limit,
+            event_type=event_type,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+        )
+
+
 class HistoryExportingResource(BaseResource):
 
     get_schema = HistoryExportingSchema()
@@ -809,6 +855,21 @@ class PingResource(BaseResource):
         return self.rest_api.ping()
 
 
+class MetricsResource(BaseResource):
+
+    def get(self) -> Response:
+        return self.rest_api.get_metrics()
+
+
+class ProfilingResource(BaseResource):
+
+    put_schema = ProfilingSchema()
+
+    @use_kwargs(put_schema, location='json')  # type: ignore
+    def put(self, duration: int, interval: float) -> Response:
+        return self.rest_api.profile_backend(duration=duration, interval=interval)
+
+
 class DataImportResource(BaseResource):
 
     put_schema = DataImportSchema()
@@ -838,11 +899,14 @@ class MakerDAODSRBalanceResource(BaseResource):
 
 class MakerDAODSRHistoryResource(BaseResource):
 
-    get_schema = AsyncQueryArgumentSchema()
+    get_schema = AsyncResetQuerySchema()
 
     @use_kwargs(get_schema, location='json_and_query')  # type: ignore
-    def get(self, async_query: bool) -> Response:
-        return self.rest_api.get_makerdao_dsr_history(async_query)
+    def get(self, async_query: bool, reset_db_data: bool) -> Response:
+        return self.rest_api.get_makerdao_dsr_history(
+            async_query=async_query,
+            reset_db_data=reset_db_data,
+        )
 
 
 class MakerDAOVaultsResource(BaseResource):
@@ -856,11 +920,14 @@ class MakerDAOVaultsResource(BaseResource):
 
 class MakerDAOVaultDetailsResource(BaseResource):
 
-    get_schema = AsyncQueryArgumentSchema()
+    get_schema = AsyncResetQuerySchema()
 
     @use_kwargs(get_schema, location='json_and_query')  # type: ignore
-    def get(self, async_query: bool) -> Response:
-        return self.rest_api.get_makerdao_vault_details(async_query)
+    def get(self, async_query: bool, reset_db_data: bool) -> Response:
+        return self.rest_api.get_makerdao_vault_details(
+            async_query=async_query,
+            reset_db_data=reset_db_data,
+        )
 
 
 class AaveBalancesResource(BaseResource):
@@ -98,6 +98,23 @@ def app_args(prog: str, description: str) -> argparse.ArgumentParser:
         ),
         action='store_true',
     )
+    p.add_argument(
+        '--historical-prices-file',
+        help=(
+            'Path to a local price file. If given then all historical prices are '
+            'queried only from it, without using any online price oracle.'
+        ),
+        type=str,
+        default=None,
+    )
+    p.add_argument(
+        '--enable-metrics',
+        help=(
+            'If given then timings and counters of the API calls, DB writes and history '
+            'processing are collected and can be queried from the metrics endpoint.'
+        ),
+        action='store_true',
+    )
     p.add_argument(
         'version',
         help='Shows the rotkehlchen version',
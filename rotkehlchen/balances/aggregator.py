@@ -0,0 +1,115 @@
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Set, Union
+
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants import ZERO
+from rotkehlchen.fval import FVal
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Mapping of location name to the balances of each asset in that location
+LocationBalances = Dict[str, Dict[Asset, Dict[str, FVal]]]
+
+
+class BalancesAggregator():
+    """Keeps the latest balances of each balance source and their aggregate
+
+    A source is anything that is queried on its own for balances, like an exchange
+    or all blockchain accounts, and can contribute balances to one or more locations.
+    When a source is updated only its difference from the previous update is applied
+    to the per asset and per location totals so there is no need to recombine the
+    balances of all the sources every time one of them changes.
+    """
+
+    def __init__(self) -> None:
+        self.sources: Dict[str, LocationBalances] = {}
+        self.asset_totals: Dict[Asset, Dict[str, FVal]] = {}
+        self.location_totals: Dict[str, FVal] = defaultdict(FVal)
+        # In how many locations each asset is found, to know when to drop it from the totals
+        self.asset_refs: Dict[Asset, int] = defaultdict(int)
+        self.net_usd = ZERO
+
+    def source_names(self) -> List[str]:
+        return list(self.sources.keys())
+
+    def _apply(self, location_balances: LocationBalances, sign: int) -> None:
+        for location, balances in location_balances.items():
+            for asset, balance in balances.items():
+                amount = balance['amount'] * sign
+                usd_value = balance['usd_value'] * sign
+                if sign > 0:
+                    self.asset_refs[asset] += 1
+                    if asset not in self.asset_totals:
+                        self.asset_totals[asset] = {'amount': ZERO, 'usd_value': ZERO}
+                else:
+                    self.asset_refs[asset] -= 1
+
+                if self.asset_refs[asset] == 0:
+                    del self.asset_refs[asset]
+                    del self.asset_totals[asset]
+                else:
+                    self.asset_totals[asset]['amount'] += amount
+                    self.asset_totals[asset]['usd_value'] += usd_value
+
+                self.location_totals[location] += usd_value
+                self.net_usd += usd_value
+
+    def update_source(
+            self,
+            source: str,
+            location_balances: LocationBalances,
+    ) -> None:
+        """Replaces the balances of a source, applying only the difference to the totals"""
+        old_balances = self.sources.get(source, None)
+        if old_balances is not None:
+            self._apply(old_balances, sign=-1)
+        self._apply(location_balances, sign=1)
+        self.sources[source] = location_balances
+        self._drop_empty_locations()
+
+    def remove_source(self, source: str) -> None:
+        """Removes a source, for example an exchange that is no longer connected"""
+        old_balances = self.sources.pop(source, None)
+        if old_balances is not None:
+            self._apply(old_balances, sign=-1)
+            self._drop_empty_locations()
+
+    def _drop_empty_locations(self) -> None:
+        locations: Set[str] = set()
+        for location_balances in self.sources.values():
+            locations.update(location_balances.keys())
+        for location in list(self.location_totals.keys()):
+            if location not in locations:
+                del self.location_totals[location]
+
+    def snapshot(self) -> Dict[Union[str, Asset], Any]:
+        """Returns the aggregated balances in the format of Rotkehlchen.query_balances()
+
+        Each call returns new dicts so callers are free to modify them
+        """
+        result: Dict[Union[str, Asset], Any] = {}
+        net_usd = self.net_usd
+        for asset, totals in self.asset_totals.items():
+            result[asset] = {
+                'amount': totals['amount'],
+                'usd_value': totals['usd_value'],
+                'percentage_of_net_value': _percentage_of(totals['usd_value'], net_usd),
+            }
+
+        result['location'] = {
+            location: {
+                'usd_value': usd_value,
+                'percentage_of_net_value': _percentage_of(usd_value, net_usd),
+            } for location, usd_value in self.location_totals.items()
+        }
+        result['net_usd'] = net_usd
+        return result
+
+
+def _percentage_of(usd_value: FVal, net_usd: FVal) -> str:
+    if net_usd == ZERO:
+        return '0%'
+    return (usd_value / net_usd).to_percentage()
@@ -1,8 +1,8 @@
-from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.errors import InputError, RemoteError
+from rotkehlchen.errors import InputError
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.typing import Location, Price
@@ -33,14 +33,14 @@ class ManuallyTrackedBalanceWithValue(NamedTuple):
 def get_manually_tracked_balances(db: 'DBHandler') -> List[ManuallyTrackedBalanceWithValue]:
     """Gets the manually tracked balances"""
     balances = db.get_manually_tracked_balances()
+    prices = Inquirer().find_usd_prices(entry.asset for entry in balances)
     balances_with_value = []
     for entry in balances:
-        try:
-            price = Inquirer().find_usd_price(entry.asset)
-        except RemoteError as e:
+        price = prices.get(entry.asset, None)
+        if price is None:
             db.msg_aggregator.add_warning(
                 f'Could not find price for {entry.asset.identifier} during '
-                f'manually tracked balance querying due to {str(e)}',
+                f'manually tracked balance querying',
             )
             price = Price(ZERO)
         # https://github.com/python/mypy/issues/2582 --> for the type ignore below
@@ -100,32 +100,21 @@ def remove_manually_tracked_balances(db: 'DBHandler', labels: List[str]) -> None
     db.remove_manually_tracked_balances(labels)
 
 
-def account_for_manually_tracked_balances(
+def get_manually_tracked_balances_per_location(
         db: 'DBHandler',
-        balances: Dict[str, Any],
-) -> Dict[str, Any]:
-    """Given the big balances mapping adds to it all manually tracked balances"""
-    manually_tracked_balances = get_manually_tracked_balances(db)
-    for m_entry in manually_tracked_balances:
-        location_str = str(m_entry.location)
-        if location_str not in balances:
-            balances[location_str] = {}
-            balances[location_str][m_entry.asset] = {
+) -> Dict[str, Dict[Asset, Dict[str, FVal]]]:
+    """Gets the manually tracked balances summed per location and asset"""
+    balances: Dict[str, Dict[Asset, Dict[str, FVal]]] = {}
+    for m_entry in get_manually_tracked_balances(db):
+        location_balances = balances.setdefault(str(m_entry.location), {})
+        if m_entry.asset not in location_balances:
+            location_balances[m_entry.asset] = {
                 'amount': m_entry.amount,
                 'usd_value': m_entry.usd_value,
             }
         else:
-            if m_entry.asset not in balances[location_str]:
-                balances[location_str][m_entry.asset] = {
-                    'amount': m_entry.amount,
-                    'usd_value': m_entry.usd_value,
-                }
-            else:
-                old_amount = balances[location_str][m_entry.asset]['amount']
-                old_usd_value = balances[location_str][m_entry.asset]['usd_value']
-                balances[location_str][m_entry.asset] = {
-                    'amount': old_amount + m_entry.amount,
-                    'usd_value': old_usd_value + m_entry.usd_value,
-                }
+            entry = location_balances[m_entry.asset]
+            entry['amount'] += m_entry.amount
+            entry['usd_value'] += m_entry.usd_value
 
     return balances
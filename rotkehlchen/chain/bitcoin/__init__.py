@@ -1,5 +1,6 @@
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 
+import gevent
 import requests
 
 from rotkehlchen.errors import RemoteError, UnableToDecryptRemoteData
@@ -7,6 +8,10 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.typing import BTCAddress
 from rotkehlchen.utils.misc import request_get, request_get_dict, satoshis_to_btc
 
+# Maximum length of the addresses given in a single blockchain.info multiaddr query
+# so that the URL stays well within the length servers accept
+BLOCKCHAININFO_MAX_PARAMS_LENGTH = 4000
+
 
 def _prepare_blockcypher_accounts(accounts: List[BTCAddress]) -> List[BTCAddress]:
     """bech32 accounts have to be given lowercase to the blockcypher query.
@@ -24,76 +29,37 @@ def _prepare_blockcypher_accounts(accounts: List[BTCAddress]) -> List[BTCAddress
     return new_accounts
 
 
-def _have_bc1_accounts(accounts: List[BTCAddress]) -> bool:
-    return any(account.lower()[0:3] == 'bc1' for account in accounts)
-
-
-def get_bitcoin_addresses_balances(accounts: List[BTCAddress]) -> Dict[BTCAddress, FVal]:
-    """Queries blockchain.info or blockcypher for the balances of accounts
-
-    May raise:
-    - RemotError if there is a problem querying blockchain.info or blockcypher
-    """
-    source = 'blockchain.info'
-    balances = {}
-    try:
-        if _have_bc1_accounts(accounts):
-            # if 1 account is bech32 we have to query blockcypher. blockchaininfo won't work
-            source = 'blockcypher.com'
-            new_accounts = _prepare_blockcypher_accounts(accounts)
-
-            # blockcypher's batching takes up as many api queries as the batch,
-            # and the api rate limit is 3 requests per second. So we should make
-            # sure each batch is of max size 3
-            # https://www.blockcypher.com/dev/bitcoin/#batching
-            batches = [new_accounts[x: x + 3] for x in range(0, len(new_accounts), 3)]
-            total_idx = 0
-            for batch in batches:
-                params = ';'.join(batch)
-                url = f'https://api.blockcypher.com/v1/btc/main/addrs/{params}/balance'
-                response_data = request_get(url=url, handle_429=True, backoff_in_seconds=4)
-
-                if isinstance(response_data, dict):
-                    # If only one account was requested put it in a list so the
-                    # rest of the code works
-                    response_data = [response_data]
-
-                for idx, entry in enumerate(response_data):
-                    # we don't use the returned address as it may be lowercased
-                    balances[accounts[total_idx + idx]] = satoshis_to_btc(
-                        FVal(entry['final_balance']),
-                    )
-                total_idx += len(batch)
-        else:
-            params = '|'.join(accounts)
-            btc_resp = request_get_dict(
-                url=f'https://blockchain.info/multiaddr?active={params}',
-                handle_429=True,
-                # If we get a 429 then their docs suggest 10 seconds
-                # https://blockchain.info/q
-                backoff_in_seconds=10,
-            )
-            for idx, entry in enumerate(btc_resp['addresses']):
-                balances[accounts[idx]] = satoshis_to_btc(FVal(entry['final_balance']))
-    except (
-            requests.exceptions.ConnectionError,
-            UnableToDecryptRemoteData,
-            requests.exceptions.Timeout,
-    ) as e:
-        raise RemoteError(f'bitcoin external API request for balances failed due to {str(e)}')
-    except KeyError as e:
-        raise RemoteError(
-            f'Malformed response when querying bitcoin blockchain via {source}.'
-            f'Did not find key {e}',
-        )
-
-    return balances
+def _is_bech32(account: BTCAddress) -> bool:
+    return account.lower()[0:3] == 'bc1'
 
 
-def _check_blockcypher_for_transactions(
+def _get_url_length_chunks(
         accounts: List[BTCAddress],
-) -> Dict[BTCAddress, Tuple[bool, FVal]]:
-    have_transactions = {}
+        separator: str,
+        max_length: int,
+) -> List[List[BTCAddress]]:
+    """Splits accounts into chunks whose separator joined length is at most max_length"""
+    chunks: List[List[BTCAddress]] = []
+    chunk: List[BTCAddress] = []
+    chunk_length = 0
+    for account in accounts:
+        added_length = len(account) + (len(separator) if len(chunk) != 0 else 0)
+        if len(chunk) != 0 and chunk_length + added_length > max_length:
+            chunks.append(chunk)
+            chunk = []
+            added_length = len(account)
+            chunk_length = 0
+        chunk.append(account)
+        chunk_length += added_length
+
+    if len(chunk) != 0:
+        chunks.append(chunk)
+    return chunks
+
+
+def _query_blockcypher(accounts: List[BTCAddress]) -> Dict[BTCAddress, Dict[str, Any]]:
+    """Queries blockcypher for the balance entries of the accounts"""
+    entries = {}
     new_accounts = _prepare_blockcypher_accounts(accounts)
     # blockcypher's batching takes up as many api queries as the batch,
     # and the api rate limit is 3 requests per second. So we should make
@@ -112,31 +78,110 @@ def _check_blockcypher_for_transactions(
             response_data = [response_data]
 
         for idx, entry in enumerate(response_data):
-            balance = satoshis_to_btc(FVal(entry['final_balance']))
+            if 'final_n_tx' in entry:
+                # blockcypher calls the number of transactions final_n_tx
+                entry['n_tx'] = entry['final_n_tx']
             # we don't use the returned address as it may be lowercased
-            have_transactions[accounts[total_idx + idx]] = (entry['final_n_tx'] != 0, balance)
+            entries[accounts[total_idx + idx]] = entry
         total_idx += len(batch)
 
-    return have_transactions
+    return entries
+
+
+def _query_blockchaininfo(
+        accounts: List[BTCAddress],
+        backoff_in_seconds: int,
+) -> Dict[BTCAddress, Dict[str, Any]]:
+    """Queries blockchain.info for the balance entries of the accounts
+
+    The accounts are split so that no query URL gets longer than blockchain.info accepts.
+
+    May raise:
+    - KeyError if the response does not contain an expected key
+    - RemoteError if the response does not contain an entry for each queried account
+    """
+    entries = {}
+    for chunk in _get_url_length_chunks(accounts, '|', BLOCKCHAININFO_MAX_PARAMS_LENGTH):
+        params = '|'.join(chunk)
+        btc_resp = request_get_dict(
+            url=f'https://blockchain.info/multiaddr?active={params}',
+            handle_429=True,
+            # If we get a 429 then their docs suggest 10 seconds
+            # https://blockchain.info/q
+            backoff_in_seconds=backoff_in_seconds,
+        )
+        for entry in btc_resp['addresses']:
+            # the addresses are not returned in the order they were given
+            entries[entry['address']] = entry
+
+        missing_accounts = [x for x in chunk if x not in entries]
+        if len(missing_accounts) != 0:
+            raise RemoteError(
+                f'blockchain.info response did not contain the addresses '
+                f'{", ".join(missing_accounts)}',
+            )
+
+    return entries
 
 
-def _check_blockchaininfo_for_transactions(
+def _query_bitcoin_accounts(
         accounts: List[BTCAddress],
+        with_transactions: bool,
 ) -> Dict[BTCAddress, Tuple[bool, FVal]]:
-    have_transactions = {}
-    params = '|'.join(accounts)
-    btc_resp = request_get_dict(
-        url=f'https://blockchain.info/multiaddr?active={params}',
-        handle_429=True,
-        # If we get a 429 then their docs suggest 10 seconds
-        # https://blockchain.infoq/
-        backoff_in_seconds=15,
-    )
-    for idx, entry in enumerate(btc_resp['addresses']):
-        balance = satoshis_to_btc(entry['final_balance'])
-        have_transactions[accounts[idx]] = (entry['n_tx'] != 0, balance)
-
-    return have_transactions
+    """Queries the balances of the accounts and, if requested, whether they have transactions
+
+    blockchain.info can't be queried for bech32 accounts. So those are queried via
+    blockcypher and all others via blockchain.info, which can take many of them in
+    each query. Both sources are queried concurrently.
+
+    May raise:
+    - RemoteError if there is a problem querying blockchain.info or blockcypher
+    """
+    action = 'transactions' if with_transactions else 'balances'
+    bech32_accounts = [x for x in accounts if _is_bech32(x)]
+    other_accounts = [x for x in accounts if not _is_bech32(x)]
+    greenlets = {}
+    if len(other_accounts) != 0:
+        greenlets['blockchain.info'] = gevent.spawn(
+            _query_blockchaininfo,
+            accounts=other_accounts,
+            # keep the longer backoff that the transactions check has always used
+            backoff_in_seconds=15 if with_transactions else 10,
+        )
+    if len(bech32_accounts) != 0:
+        greenlets['blockcypher.com'] = gevent.spawn(_query_blockcypher, bech32_accounts)
+    gevent.joinall(list(greenlets.values()))
+
+    result = {}
+    for source, greenlet in greenlets.items():
+        try:
+            for account, entry in greenlet.get().items():
+                balance = satoshis_to_btc(FVal(entry['final_balance']))
+                has_transactions = entry['n_tx'] != 0 if with_transactions else False
+                result[account] = (has_transactions, balance)
+        except (
+                requests.exceptions.ConnectionError,
+                UnableToDecryptRemoteData,
+                requests.exceptions.Timeout,
+        ) as e:
+            raise RemoteError(f'bitcoin external API request for {action} failed due to {str(e)}')
+        except KeyError as e:
+            raise RemoteError(
+                f'Malformed response when querying bitcoin blockchain via {source}.'
+                f'Did not find key {e}',
+            )
+
+    return result
+
+
+def get_bitcoin_addresses_balances(accounts: List[BTCAddress]) -> Dict[BTCAddress, FVal]:
+    """Queries blockchain.info or blockcypher for the balances of accounts
+
+    May raise:
+    - RemotError if there is a problem querying blockchain.info or blockcypher
+    """
+    result = _query_bitcoin_accounts(accounts, with_transactions=False)
+    return {account: balance for account, (_, balance) in result.items()}
 
 
 def have_bitcoin_transactions(accounts: List[BTCAddress]) -> Dict[BTCAddress, Tuple[bool, FVal]]:
@@ -147,16 +192,4 @@ def have_bitcoin_transactions(accounts: List[BTCAddress]) -> Dict[BTCAddress, Tu
     May raise:
     - RemoteError if any of the queried websites fail to be queried
     """
-    try:
-        if _have_bc1_accounts(accounts):
-            have_transactions = _check_blockcypher_for_transactions(accounts)
-        else:
-            have_transactions = _check_blockchaininfo_for_transactions(accounts)
-    except (
-            requests.exceptions.ConnectionError,
-            UnableToDecryptRemoteData,
-            requests.exceptions.Timeout,
-    ) as e:
-        raise RemoteError(f'bitcoin external API request for transactions failed due to {str(e)}')
-
-    return have_transactions
+    return _query_bitcoin_accounts(accounts, with_transactions=True)
@@ -1,6 +1,7 @@
 import logging
 from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
+import gevent
 from gevent.lock import Semaphore
 
 from rotkehlchen.accounting.structures import Balance
@@ -251,6 +252,9 @@ class Aave(EthereumModule):
         """
         Queries aave history for a single address.
 
+        Only the aTokens whose reserve the address has deposited to or withdrawn from
+        are queried, each of them concurrently and from the end of its own query range.
+
         This function should be entered while holding the history_lock
         semaphore
         """
@@ -283,67 +287,52 @@ class Aave(EthereumModule):
                 to_block=to_block,
             ))
 
-        # now for each atoken get all mint events and pass then to profit calculation
+        # Only query the aTokens whose reserve the address has touched. That is the
+        # ones already queried in the past and the ones in the new deposits/withdrawals
+        touched_reserves = {
+            hex_or_bytes_to_address(event['topics'][1])
+            for event in deposit_events + withdraw_events
+        }
         tokens = atokens_list if atokens_list is not None else ATOKENS_LIST
-        total_address_events = []
-        total_earned_map = {}
+        greenlets = []
         for token in tokens:
-            log.debug(
-                f'Querying aave events for {user_address} and token '
-                f'{token.identifier} with query_events={query_events}',
+            token_last_query = self.database.get_used_query_range(
+                f'aave_events_{user_address}_{token.identifier}',
             )
             events = []
             if given_from_block:
                 events.extend(self.database.get_aave_events(user_address, token))
 
-            new_events = []
-            if query_events:
-                new_events = self.get_events_for_atoken_and_address(
-                    user_address=user_address,
-                    atoken=token,
-                    deposit_events=deposit_events,
-                    withdraw_events=withdraw_events,
-                    from_block=from_block,
-                    to_block=to_block,
-                )
-                events.extend(new_events)
-            total_balance = Balance()
-            for x in events:
-                if x.event_type == 'interest':
-                    total_balance += x.value
-            # If the user still has balance in Aave we also need to see how much
-            # accrued interest has not been yet paid out
-            # TODO: ARCHIVE if to_block is not latest here we should get the balance
-            # from the old block. Means using archive node
-            balance = self.ethereum.call_contract(
-                contract_address=token.ethereum_address,
-                abi=ATOKEN_ABI,
-                method_name='balanceOf',
-                arguments=[user_address],
-            )
-            principal_balance = self.ethereum.call_contract(
-                contract_address=token.ethereum_address,
-                abi=ATOKEN_ABI,
-                method_name='principalBalanceOf',
-                arguments=[user_address],
-            )
+            reserve_asset = _atoken_to_reserve_asset(token)
+            reserve_address, _ = _get_reserve_address_decimals(reserve_asset.identifier)
+            if (
+                len(events) == 0 and token_last_query is None and
+                reserve_address not in touched_reserves
+            ):
+                continue  # the address has never used this reserve
+
+            greenlets.append(gevent.spawn(
+                self._get_history_for_atoken,
+                user_address=user_address,
+                atoken=token,
+                events=events,
+                deposit_events=deposit_events,
+                withdraw_events=withdraw_events,
+                from_block=from_block if token_last_query is None else token_last_query[1] + 1,
+                to_block=to_block,
+                query_events=query_events,
+            ))
 
-            if len(events) == 0 and balance == 0 and principal_balance == 0:
-                # Nothing for this aToken for this address
+        gevent.joinall(greenlets, raise_error=True)
+        total_address_events = []
+        total_earned_map = {}
+        for greenlet in greenlets:
+            if greenlet.value is None:
                 continue
-
-            unpaid_interest = (balance - principal_balance) / (FVal(10) ** FVal(token.decimals))
-            usd_price = Inquirer().find_usd_price(token)
-            total_balance += Balance(
-                amount=unpaid_interest,
-                usd_value=unpaid_interest * usd_price,
-            )
+            token, events, total_balance = greenlet.value
             total_earned_map[token] = total_balance
             total_address_events.extend(events)
 
-            # now update the DB with the recently queried events
-            self.database.add_aave_events(user_address, new_events)
-
         # After all events have been queried then also update the query range.
         # Even if no events are found for an address we need to remember the range
         self.database.update_used_block_query_range(
@@ -355,6 +344,91 @@ class Aave(EthereumModule):
         total_address_events.sort(key=lambda event: event.timestamp)
         return AaveHistory(events=total_address_events, total_earned=total_earned_map)
 
+    def _get_history_for_atoken(
+            self,
+            user_address: ChecksumEthAddress,
+            atoken: EthereumToken,
+            events: List[AaveEvent],
+            deposit_events: List[Dict[str, Any]],
+            withdraw_events: List[Dict[str, Any]],
+            from_block: int,
+            to_block: int,
+            query_events: bool,
+    ) -> Optional[Tuple[EthereumToken, List[AaveEvent], Balance]]:
+        """Queries the new events of a single aToken and its total interest earned
+
+        `events` are the aToken events already saved in the DB. The new events are
+        saved along with the aToken's query range, so that next time only the
+        blocks after to_block are queried for it.
+
+        Returns None if the address has no events and no balance for the aToken.
+
+        This function should be entered while holding the history_lock
+        semaphore
+        """
+        log.debug(
+            f'Querying aave events for {user_address} and token '
+            f'{atoken.identifier} with query_events={query_events}',
+        )
+        events = list(events)
+        if query_events:
+            # Deposits/withdrawals before the aToken's own range are already in the DB
+            new_events = self.get_events_for_atoken_and_address(
+                user_address=user_address,
+                atoken=atoken,
+                deposit_events=[
+                    x for x in deposit_events
+                    if deserialize_blocknumber(x['blockNumber']) >= from_block
+                ],
+                withdraw_events=[
+                    x for x in withdraw_events
+                    if deserialize_blocknumber(x['blockNumber']) >= from_block
+                ],
+                from_block=from_block,
+                to_block=to_block,
+            )
+            events.extend(new_events)
+            # now update the DB with the recently queried events
+            self.database.add_aave_events(user_address, new_events)
+            self.database.update_used_block_query_range(
+                name=f'aave_events_{user_address}_{atoken.identifier}',
+                from_block=AAVE_LENDING_POOL.deployed_block,
+                to_block=to_block,
+            )
+
+        total_balance = Balance()
+        for x in events:
+            if x.event_type == 'interest':
+                total_balance += x.value
+        # If the user still has balance in Aave we also need to see how much
+        # accrued interest has not been yet paid out
+        # TODO: ARCHIVE if to_block is not latest here we should get the balance
+        # from the old block. Means using archive node
+        balance = self.ethereum.call_contract(
+            contract_address=atoken.ethereum_address,
+            abi=ATOKEN_ABI,
+            method_name='balanceOf',
+            arguments=[user_address],
+        )
+        principal_balance = self.ethereum.call_contract(
+            contract_address=atoken.ethereum_address,
+            abi=ATOKEN_ABI,
+            method_name='principalBalanceOf',
+            arguments=[user_address],
+        )
+
+        if len(events) == 0 and balance == 0 and principal_balance == 0:
+            # Nothing for this aToken for this address
+            return None
+
+        unpaid_interest = (balance - principal_balance) / (FVal(10) ** FVal(atoken.decimals))
+        usd_price = Inquirer().find_usd_price(atoken)
+        total_balance += Balance(
+            amount=unpaid_interest,
+            usd_value=unpaid_interest * usd_price,
+        )
+        return atoken, events, total_balance
+
     def get_events_for_atoken_and_address(
             self,
             user_address: ChecksumEthAddress,
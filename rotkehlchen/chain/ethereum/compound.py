@@ -2,15 +2,23 @@ import logging
 from collections import defaultdict
 from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
+import gevent
 from eth_utils import to_checksum_address
+from gevent.lock import Semaphore
 from typing_extensions import Literal
 
 from rotkehlchen.accounting.structures import Balance
 from rotkehlchen.assets.asset import Asset, EthereumToken
-from rotkehlchen.chain.ethereum.graph import Graph
+from rotkehlchen.chain.ethereum.graph import Graph, GraphSelection
+from rotkehlchen.chain.ethereum.structures import CompoundEvent
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.chain.ethereum.zerion import GIVEN_DEFI_BALANCES
-from rotkehlchen.constants.ethereum import CTOKEN_ABI, ERC20TOKEN_ABI, EthereumConstants
+from rotkehlchen.constants.ethereum import (
+    COMPOUND_EVENTS_PREFIX,
+    CTOKEN_ABI,
+    ERC20TOKEN_ABI,
+    EthereumConstants,
+)
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.errors import BlockchainQueryError, RemoteError, UnknownAsset
@@ -39,31 +47,24 @@ A_COMP = EthereumToken('COMP')
 COMPTROLLER_PROXY = EthereumConstants().contract('COMPTROLLER_PROXY')
 COMPTROLLER_ABI = EthereumConstants.abi('COMPTROLLER_IMPLEMENTATION')
 COMP_DEPLOYED_BLOCK = 9601359
+# How far back to requery when continuing from the last queried timestamp, since
+# The Graph may not have indexed the most recent blocks at the time of a query
+GRAPH_REQUERY_OVERLAP_SECS = 3600
 
 
-LEND_EVENTS_QUERY_PREFIX = """{graph_event_name}
-(where: {{blockTime_lte: $end_ts, blockTime_gte: $start_ts, {addr_position}: $address}}) {{
-    id
-    amount
-    to
-    from
-    blockNumber
-    blockTime
-    cTokenSymbol
-    underlyingAmount
-}}}}"""
-
-
-BORROW_EVENTS_QUERY_PREFIX = """{graph_event_name}
- (where: {{blockTime_lte: $end_ts, blockTime_gte: $start_ts, borrower: $address}}) {{
-    id
-    amount
-    borrower
-    blockNumber
-    blockTime
-    underlyingSymbol
-    {payer_or_empty}
-}}}}"""
+LEND_EVENT_FIELDS = 'id amount to from blockNumber blockTime cTokenSymbol underlyingAmount'
+BORROW_EVENT_FIELDS = 'id amount borrower blockNumber blockTime underlyingSymbol'
+LIQUIDATION_EVENT_FIELDS = (
+    'id amount from blockNumber blockTime cTokenSymbol underlyingSymbol underlyingRepayAmount'
+)
+# The graph entity, the field holding the user's address and the fields to query per event type
+GRAPH_EVENTS: Dict[str, Tuple[str, str, str]] = {
+    'mint': ('mintEvents', 'to', LEND_EVENT_FIELDS),
+    'redeem': ('redeemEvents', 'from', LEND_EVENT_FIELDS),
+    'borrow': ('borrowEvents', 'borrower', BORROW_EVENT_FIELDS),
+    'repay': ('repayEvents', 'borrower', BORROW_EVENT_FIELDS + ' payer'),
+    'liquidation': ('liquidationEvents', 'from', LIQUIDATION_EVENT_FIELDS),
+}
 
 
 log = logging.getLogger(__name__)
@@ -81,25 +82,6 @@ class CompoundBalance(NamedTuple):
         }
 
 
-class CompoundEvent(NamedTuple):
-    event_type: Literal['mint', 'redeem', 'borrow', 'repay', 'liquidation', 'comp']
-    address: ChecksumEthAddress
-    block_number: int
-    timestamp: Timestamp
-    asset: Asset
-    value: Balance
-    to_asset: Optional[Asset]
-    to_value: Optional[Balance]
-    realized_pnl: Optional[Balance]
-    tx_hash: str
-    log_index: int  # only used to identify uniqueness
-
-    def serialize(self) -> Dict[str, Any]:
-        serialized = self._asdict()  # pylint: disable=no-member
-        del serialized['log_index']
-        return serialized
-
-
 def _get_txhash_and_logidx(identifier: str) -> Optional[Tuple[str, int]]:
     result = identifier.split('-')
     if len(result) != 2:
@@ -116,24 +98,6 @@ def _get_txhash_and_logidx(identifier: str) -> Optional[Tuple[str, int]]:
     return result[0], log_index
 
 
-def _get_params(
-        from_ts: Timestamp,
-        to_ts: Timestamp,
-        address: ChecksumEthAddress,
-) -> Tuple[Dict[str, Any], Dict[str, Any]]:
-    param_types = {
-        '$start_ts': 'Int!',
-        '$end_ts': 'Int!',
-        '$address': 'Bytes!',
-    }
-    param_values = {
-        'start_ts': from_ts,
-        'end_ts': to_ts,
-        'address': address,
-    }
-    return param_types, param_values
-
-
 class Compound(EthereumModule):
     """Compound integration module
 
@@ -151,7 +115,11 @@ class Compound(EthereumModule):
         self.database = database
         self.premium = premium
         self.msg_aggregator = msg_aggregator
-        self.graph = Graph('https://api.thegraph.com/subgraphs/name/graphprotocol/compound-v2')
+        self.history_lock = Semaphore()
+        self.graph = Graph(
+            'https://api.thegraph.com/subgraphs/name/graphprotocol/compound-v2',
+            cache_dir=self.database.user_data_dir.parent,
+        )
         self.comptroller_address = to_checksum_address(self.ethereum.call_contract(
             contract_address=COMPTROLLER_PROXY.address,
             abi=COMPTROLLER_PROXY.abi,
@@ -252,32 +220,14 @@ class Compound(EthereumModule):
 
         return compound_balances
 
-    def _get_borrow_events(
+    def _process_borrow_events(
             self,
             event_type: Literal['borrow', 'repay'],
             address: ChecksumEthAddress,
-            from_ts: Timestamp,
-            to_ts: Timestamp,
+            entries: List[Dict[str, Any]],
     ) -> List[CompoundEvent]:
-        param_types, param_values = _get_params(from_ts, to_ts, address)
-        if event_type == 'borrow':
-            graph_event_name = 'borrowEvents'
-            payer_or_empty = ''
-        elif event_type == 'repay':
-            graph_event_name = 'repayEvents'
-            payer_or_empty = 'payer'
-
-        result = self.graph.query(
-            querystr=BORROW_EVENTS_QUERY_PREFIX.format(
-                graph_event_name=graph_event_name,
-                payer_or_empty=payer_or_empty,
-            ),
-            param_types=param_types,
-            param_values=param_values,
-        )
-
         events = []
-        for entry in result[graph_event_name]:
+        for entry in entries:
             underlying_symbol = entry['underlyingSymbol']
             try:
                 underlying_asset = Asset(underlying_symbol)
@@ -318,31 +268,14 @@ class Compound(EthereumModule):
 
         return events
 
-    def _get_liquidation_events(
+    def _process_liquidation_events(
             self,
             address: ChecksumEthAddress,
-            from_ts: Timestamp,
-            to_ts: Timestamp,
+            entries: List[Dict[str, Any]],
     ) -> List[CompoundEvent]:
         """https://compound.finance/docs/ctokens#liquidate-borrow"""
-        param_types, param_values = _get_params(from_ts, to_ts, address)
-        result = self.graph.query(
-            querystr="""liquidationEvents (where: {blockTime_lte: $end_ts, blockTime_gte: $start_ts, from: $address}) {
-    id
-    amount
-    from
-    blockNumber
-    blockTime
-    cTokenSymbol
-    underlyingSymbol
-    underlyingRepayAmount
-}}""",
-            param_types=param_types,
-            param_values=param_values,
-        )
-
         events = []
-        for entry in result['liquidationEvents']:
+        for entry in entries:
             ctoken_symbol = entry['cTokenSymbol']
             try:
                 ctoken_asset = Asset(ctoken_symbol)
@@ -405,32 +338,14 @@ class Compound(EthereumModule):
 
         return events
 
-    def _get_lend_events(
+    def _process_lend_events(
             self,
             event_type: Literal['mint', 'redeem'],
             address: ChecksumEthAddress,
-            from_ts: Timestamp,
-            to_ts: Timestamp,
+            entries: List[Dict[str, Any]],
     ) -> List[CompoundEvent]:
-        param_types, param_values = _get_params(from_ts, to_ts, address)
-        if event_type == 'mint':
-            graph_event_name = 'mintEvents'
-            addr_position = 'to'
-        elif event_type == 'redeem':
-            graph_event_name = 'redeemEvents'
-            addr_position = 'from'
-
-        result = self.graph.query(
-            querystr=LEND_EVENTS_QUERY_PREFIX.format(
-                graph_event_name=graph_event_name,
-                addr_position=addr_position,
-            ),
-            param_types=param_types,
-            param_values=param_values,
-        )
-
         events = []
-        for entry in result[graph_event_name]:
+        for entry in entries:
             ctoken_symbol = entry['cTokenSymbol']
             try:
                 ctoken_asset = Asset(ctoken_symbol)
@@ -638,11 +553,107 @@ class Compound(EthereumModule):
 
         return profit_so_far, loss_so_far, liquidation_profit, rewards_assets
 
+    def _query_graph_events(
+            self,
+            from_timestamps: Dict[ChecksumEthAddress, Timestamp],
+            to_ts: Timestamp,
+    ) -> Dict[ChecksumEthAddress, List[CompoundEvent]]:
+        """Queries the graph events of all given addresses, each from its own timestamp
+
+        All event types of all addresses are combined in the same graph queries.
+
+        May raise:
+        - RemoteError due to the graph query failure
+        """
+        selections = {}
+        for idx, (address, from_ts) in enumerate(from_timestamps.items()):
+            for event_type, (entity, address_field, fields) in GRAPH_EVENTS.items():
+                selections[f'{event_type}_{idx}'] = GraphSelection(
+                    entity=entity,
+                    where={
+                        'blockTime_lte': to_ts,
+                        'blockTime_gte': from_ts,
+                        address_field: address,
+                    },
+                    fields=fields,
+                )
+        result = self.graph.query_selections(selections)
+
+        events = {}
+        for idx, address in enumerate(from_timestamps):
+            user_events = self._process_lend_events('mint', address, result[f'mint_{idx}'])
+            user_events.extend(self._process_lend_events('redeem', address, result[f'redeem_{idx}']))  # noqa: E501
+            user_events.extend(self._process_borrow_events('borrow', address, result[f'borrow_{idx}']))  # noqa: E501
+            repay_events = self._process_borrow_events('repay', address, result[f'repay_{idx}'])
+            liquidation_events = self._process_liquidation_events(address, result[f'liquidation_{idx}'])  # noqa: E501
+            liquidation_hashes = {x.tx_hash for x in liquidation_events}
+            user_events.extend(x for x in repay_events if x.tx_hash not in liquidation_hashes)
+            user_events.extend(liquidation_events)
+            events[address] = user_events
+
+        return events
+
+    def _get_events(
+            self,
+            addresses: List[ChecksumEthAddress],
+            to_ts: Timestamp,
+    ) -> List[CompoundEvent]:
+        """Returns all compound events of the given addresses up to to_ts
+
+        Events are kept in the DB and for each address only the range after its
+        last query is queried again.
+
+        May raise:
+        - RemoteError due to the graph query failure or etherscan
+        """
+        events: Dict[ChecksumEthAddress, List[CompoundEvent]] = {}
+        from_timestamps: Dict[ChecksumEthAddress, Timestamp] = {}
+        for address in addresses:
+            events[address] = self.database.get_compound_events(address)
+            last_query = self.database.get_used_query_range(
+                f'{COMPOUND_EVENTS_PREFIX}_{address}',
+            )
+            if last_query is None:
+                from_timestamps[address] = Timestamp(0)
+            elif to_ts > last_query[1]:
+                from_timestamps[address] = Timestamp(
+                    max(0, last_query[1] - GRAPH_REQUERY_OVERLAP_SECS),
+                )
+
+        if len(from_timestamps) != 0:
+            new_events = self._query_graph_events(from_timestamps, to_ts)
+            # query comp events only for addresses with any other event
+            comp_greenlets = {
+                address: gevent.spawn(self._get_comp_events, address, from_ts, to_ts)
+                for address, from_ts in from_timestamps.items()
+                if len(events[address]) != 0 or len(new_events[address]) != 0
+            }
+            gevent.joinall(list(comp_greenlets.values()), raise_error=True)
+            for address, greenlet in comp_greenlets.items():
+                new_events[address].extend(greenlet.value)
+
+            for address in from_timestamps:
+                known_events = {(x.event_type, x.tx_hash, x.log_index) for x in events[address]}
+                address_new_events = [
+                    x for x in new_events[address]
+                    if (x.event_type, x.tx_hash, x.log_index) not in known_events
+                ]
+                self.database.add_compound_events(address, address_new_events)
+                # Even if no events are found for an address we need to remember the range
+                self.database.update_used_query_range(
+                    name=f'{COMPOUND_EVENTS_PREFIX}_{address}',
+                    start_ts=Timestamp(0),
+                    end_ts=to_ts,
+                )
+                events[address].extend(address_new_events)
+
+        return [x for address_events in events.values() for x in address_events]
+
     def get_history(
             self,
             given_defi_balances: GIVEN_DEFI_BALANCES,
             addresses: List[ChecksumEthAddress],
-            reset_db_data: bool,  # pylint: disable=unused-argument
+            reset_db_data: bool,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
     ) -> Dict[str, Any]:
@@ -650,29 +661,13 @@ class Compound(EthereumModule):
         - RemoteError due to the graph query failure or etherscan
         """
         history: Dict[str, Any] = {}
-        events: List[CompoundEvent] = []
-        for address in addresses:
-            user_events = self._get_lend_events('mint', address, from_timestamp, to_timestamp)
-            user_events.extend(self._get_lend_events('redeem', address, from_timestamp, to_timestamp))  # noqa: E501
-            user_events.extend(self._get_borrow_events('borrow', address, from_timestamp, to_timestamp))  # noqa: E501
-            repay_events = self._get_borrow_events('repay', address, from_timestamp, to_timestamp)
-            liquidation_events = self._get_liquidation_events(address, from_timestamp, to_timestamp)  # noqa: E501
-            indices_to_remove = []
-            for levent in liquidation_events:
-                for ridx, revent in enumerate(repay_events):
-                    if levent.tx_hash == revent.tx_hash:
-                        indices_to_remove.append(ridx)
-
-            for i in sorted(indices_to_remove, reverse=True):
-                del repay_events[i]
-
-            user_events.extend(repay_events)
-            user_events.extend(liquidation_events)
-            if len(user_events) != 0:
-                # query comp events only if any other event has happened
-                user_events.extend(self._get_comp_events(address, from_timestamp, to_timestamp))
-                events.extend(user_events)
+        with self.history_lock:
+            if reset_db_data is True:
+                self.database.delete_compound_data()
+
+            all_events = self._get_events(addresses, to_timestamp)
 
+        events = [x for x in all_events if from_timestamp <= x.timestamp <= to_timestamp]
         events.sort(key=lambda x: x.timestamp)
         history['events'] = events
         profit, loss, liquidation, rewards = self._process_events(events, given_defi_balances)
@@ -0,0 +1,140 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types
+from web3._utils.contracts import find_matching_event_abi
+from web3._utils.filters import construct_event_filter_params
+from web3.contract import Contract
+
+from rotkehlchen.typing import ChecksumEthAddress
+
+
+def _freeze(value: Any) -> Any:
+    """Turns lists in an argument filter value into tuples so that it can be hashed"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(x) for x in value)
+    return value
+
+
+class ContractRegistry():
+    """Memoizes the web3 contract objects and the ABI data derived from them
+
+    Contract queries happen with the same few ABIs over and over, so creating the
+    contract objects and finding the events and outputs of the ABIs is done only
+    once for each of them.
+
+    ABIs are identified by the identity of their list, since they are all module
+    level constants. Each cache entry also keeps its ABI so that the identity can't
+    be reused by another list while the entry exists.
+
+    Only one contract object is kept for each address and ABI of the node web3s.
+    It is replaced if a different web3 asks for it, for example after reconnecting
+    to a node, so that old web3 objects are not kept alive by the cache.
+    """
+
+    def __init__(self) -> None:
+        # A web3 without a provider. Used only for encoding calls and decoding results
+        self.offline_web3 = Web3()
+        self.codec = self.offline_web3.codec
+        self.contracts: Dict[Tuple[ChecksumEthAddress, int, bool], Tuple[List, Contract]] = {}
+        self.output_types: Dict[Tuple[int, str], Tuple[List, List[str]]] = {}
+        self.filter_params: Dict[Tuple[Any, ...], Tuple[List, Dict[str, Any]]] = {}
+
+    def contract(
+            self,
+            web3: Optional[Web3],
+            address: ChecksumEthAddress,
+            abi: List,
+    ) -> Contract:
+        """Returns the contract object of address and abi for the given web3
+
+        If no web3 is given the contract can only be used for encoding calls
+        """
+        # keep the offline contracts apart so that using etherscan and a node
+        # alternately does not replace the contract objects all the time
+        key = (address, id(abi), web3 is None)
+        web3 = self.offline_web3 if web3 is None else web3
+        entry = self.contracts.get(key, None)
+        if entry is not None and entry[0] is abi and entry[1].web3 is web3:
+            return entry[1]
+
+        contract = web3.eth.contract(address=address, abi=abi)
+        self.contracts[key] = (abi, contract)
+        return contract
+
+    def function_output_types(
+            self,
+            contract: Contract,
+            abi: List,
+            method_name: str,
+            arguments: Optional[List[Any]],
+    ) -> List[str]:
+        """Returns the output types of the contract's method for the given arguments
+
+        They are only remembered if the method is not overloaded, since otherwise
+        the function to use depends on the arguments.
+        """
+        key = (id(abi), method_name)
+        entry = self.output_types.get(key, None)
+        if entry is not None and entry[0] is abi:
+            return entry[1]
+
+        fn_abi = contract._find_matching_fn_abi(
+            fn_identifier=method_name,
+            args=arguments,
+        )
+        output_types = get_abi_output_types(fn_abi)
+        overloads = [
+            x for x in abi if x.get('type') == 'function' and x.get('name') == method_name
+        ]
+        if len(overloads) == 1:
+            self.output_types[key] = (abi, output_types)
+        return output_types
+
+    def event_filter_params(
+            self,
+            address: ChecksumEthAddress,
+            abi: List,
+            event_name: str,
+            argument_filters: Dict[str, Any],
+            from_block: Any,
+            to_block: Any,
+    ) -> Dict[str, Any]:
+        """Returns the eth_getLogs filter parameters for the event of a contract
+
+        The parameters are created once for each contract, event and argument
+        filters. Each call gets its own copy that it is free to modify.
+        """
+        key: Tuple[Any, ...] = (
+            address,
+            id(abi),
+            event_name,
+            tuple(sorted((k, _freeze(v)) for k, v in argument_filters.items())),
+        )
+        entry: Optional[Tuple[List, Dict[str, Any]]]
+        try:
+            entry = self.filter_params.get(key, None)
+            remember = True
+        except TypeError:  # an argument filter value can't be hashed. Don't remember it
+            entry, remember = None, False
+
+        if entry is None or entry[0] is not abi:
+            event_abi = find_matching_event_abi(abi=abi, event_name=event_name)
+            _, params = construct_event_filter_params(
+                event_abi=event_abi,
+                abi_codec=self.codec,
+                contract_address=address,
+                argument_filters=argument_filters,
+            )
+            if event_abi['anonymous']:
+                # web3.py does not handle the anonymous events correctly and adds the first topic
+                params['topics'] = params['topics'][1:]
+            entry = (abi, params)
+            if remember:
+                self.filter_params[key] = entry
+
+        params = dict(entry[1])
+        params['topics'] = [list(x) if isinstance(x, list) else x for x in params['topics']]
+        params['fromBlock'] = from_block
+        params['toBlock'] = to_block
+        return params
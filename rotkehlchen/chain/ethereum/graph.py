@@ -1,21 +1,106 @@
 import json
 import logging
-from typing import Any, Dict, Optional
+from json.decoder import JSONDecodeError
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
 
 import requests
+from gevent.lock import Semaphore
 from gql import Client, gql
 from gql.transport.requests import RequestsHTTPTransport
+from graphql import GraphQLError, introspection_query
 
 from rotkehlchen.errors import RemoteError
+from rotkehlchen.utils.misc import get_chunks
 
 log = logging.getLogger(__name__)
 
+# Maximum number of entities The Graph returns for a single query
+GRAPH_QUERY_LIMIT = 1000
+# Maximum number of aliased selections to combine in a single query document
+GRAPH_QUERY_MAX_SELECTIONS = 100
+
+
+class GraphSelection(NamedTuple):
+    """A selection of entities to be combined with others in a single query
+
+    The values of `where` are written as literals in the query document
+    """
+    entity: str
+    where: Dict[str, Any]
+    fields: str
+
+
+def _format_graph_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    return json.dumps(str(value))
+
 
 class Graph():
 
-    def __init__(self, url: str) -> None:
-        transport = RequestsHTTPTransport(url=url)
-        self.client = Client(transport=transport, fetch_schema_from_transport=True)
+    def __init__(self, url: str, cache_dir: Optional[Path] = None) -> None:
+        """The schema is only fetched with the first query and if a cache directory
+        is given it is also kept there, so that it's not fetched again"""
+        self.transport = RequestsHTTPTransport(url=url)
+        self.schema_path = None
+        if cache_dir is not None:
+            subgraph_name = url.rstrip('/').split('/')[-1]
+            self.schema_path = cache_dir / f'graph_schema_{subgraph_name}.json'
+        self.client: Optional[Client] = None
+        self.schema_from_cache = False
+        self.client_lock = Semaphore()
+
+    def _read_cached_introspection(self) -> Optional[Dict[str, Any]]:
+        if self.schema_path is None or not self.schema_path.is_file():
+            return None
+
+        try:
+            with open(self.schema_path, 'r') as f:
+                return json.loads(f.read())
+        except (OSError, JSONDecodeError) as e:
+            log.warning(f'Could not read cached graph schema {self.schema_path}: {str(e)}')
+            return None
+
+    def _fetch_introspection(self) -> Dict[str, Any]:
+        """May raise:
+        - RemoteError: If there is a problem querying the schema
+        """
+        log.debug(f'Fetching the schema of {self.transport.url}')
+        try:
+            result = self.transport.execute(gql(introspection_query))
+        except (requests.exceptions.RequestException, Exception) as e:
+            raise RemoteError(f'Failed to query the graph schema due to {str(e)}')
+
+        if result.errors:
+            raise RemoteError(f'Failed to query the graph schema due to {result.errors[0]}')
+
+        if self.schema_path is not None:
+            try:
+                with open(self.schema_path, 'w') as f:
+                    f.write(json.dumps(result.data))
+            except OSError as e:
+                log.warning(f'Could not cache graph schema in {self.schema_path}: {str(e)}')
+
+        return result.data
+
+    def _get_client(self) -> Client:
+        """Returns the client, creating it with the cached or fetched schema if needed
+
+        May raise:
+        - RemoteError: If the schema is not cached and there is a problem querying it
+        """
+        with self.client_lock:
+            if self.client is None:
+                introspection = self._read_cached_introspection()
+                self.schema_from_cache = introspection is not None
+                if introspection is None:
+                    introspection = self._fetch_introspection()
+                self.client = Client(transport=self.transport, introspection=introspection)
+
+            return self.client
 
     def query(
             self,
@@ -34,9 +119,68 @@ class Graph():
         prefix += '{'
         log.debug(f'Querying The Graph for {querystr}')
         try:
-            result = self.client.execute(gql(prefix + querystr), variable_values=param_values)
+            result = self._get_client().execute(
+                gql(prefix + querystr),
+                variable_values=param_values,
+            )
+        except RemoteError:
+            raise
+        except GraphQLError as e:
+            if self.schema_from_cache:
+                # The subgraph may have changed since we cached its schema so the query
+                # did not validate. Retry once with a freshly fetched schema before giving up
+                log.debug(f'Graph query failed with the cached schema: {str(e)}. Retrying')
+                with self.client_lock:
+                    self.client = None
+                    if self.schema_path is not None and self.schema_path.is_file():
+                        self.schema_path.unlink()
+                return self.query(querystr, param_types, param_values)
+
+            raise RemoteError(f'Failed to query the graph for {querystr} due to {str(e)}')
         except (requests.exceptions.RequestException, Exception) as e:
             raise RemoteError(f'Failed to query the graph for {querystr} due to {str(e)}')
 
         log.debug('Got result from The Graph query')
         return result
+
+    def query_selections(
+            self,
+            selections: Dict[str, GraphSelection],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Queries all entities of many selections, combining them in as few queries as possible
+
+        Each selection is put under its alias in a single query document. Entities are
+        ordered by id and come in pages of up to GRAPH_QUERY_LIMIT. Selections that got
+        a full page are queried again from their last id, all together again, until
+        none of them has more entities.
+
+        Returns the entities of each selection by its alias.
+
+        May raise:
+        - RemoteError: If there is a problem querying
+        """
+        results: Dict[str, List[Dict[str, Any]]] = {alias: [] for alias in selections}
+        last_ids = {alias: '' for alias in selections}
+        while len(last_ids) != 0:
+            next_ids = {}
+            for aliases in get_chunks(list(last_ids.keys()), GRAPH_QUERY_MAX_SELECTIONS):
+                querystr = ''
+                for alias in aliases:
+                    selection = selections[alias]
+                    where = {'id_gt': last_ids[alias], **selection.where}
+                    where_str = ', '.join(f'{k}: {_format_graph_value(v)}' for k, v in where.items())  # noqa: E501
+                    querystr += (
+                        f'{alias}: {selection.entity}(first: {GRAPH_QUERY_LIMIT}, orderBy: id, '
+                        f'where: {{{where_str}}}) {{ {selection.fields} }}\n'
+                    )
+
+                result = self.query(querystr=querystr + '}', param_types=None, param_values=None)
+                for alias in aliases:
+                    page = result[alias]
+                    results[alias].extend(page)
+                    if len(page) == GRAPH_QUERY_LIMIT:
+                        next_ids[alias] = page[-1]['id']
+
+            last_ids = next_ids
+
+        return results
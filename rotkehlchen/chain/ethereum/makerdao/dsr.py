@@ -1,7 +1,7 @@
 import logging
-import operator
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 from gevent.lock import Semaphore
 from typing_extensions import Literal
@@ -13,9 +13,14 @@ from rotkehlchen.chain.ethereum.makerdao.common import (
     RAY,
     MakerDAOCommon,
 )
+from rotkehlchen.chain.ethereum.structures import DSRChiPoint
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_DAI
-from rotkehlchen.constants.ethereum import MAKERDAO_DAI_JOIN, MAKERDAO_POT
+from rotkehlchen.constants.ethereum import (
+    MAKERDAO_DAI_JOIN,
+    MAKERDAO_DSR_CHI_RANGE,
+    MAKERDAO_POT,
+)
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.errors import (
     BlockchainQueryError,
@@ -30,12 +35,7 @@ from rotkehlchen.premium.premium import Premium
 from rotkehlchen.serialization.deserialize import deserialize_blocknumber
 from rotkehlchen.typing import ChecksumEthAddress, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import (
-    hex_or_bytes_to_address,
-    hex_or_bytes_to_int,
-    hex_or_bytes_to_str,
-    ts_now,
-)
+from rotkehlchen.utils.misc import hex_or_bytes_to_int, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
@@ -43,8 +43,10 @@ if TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 POT_CREATION_TIMESTAMP = 1573672721
-CHI_BLOCKS_SEARCH_DISTANCE = 250  # Blocks per call query per side (before/after)
-MAX_BLOCKS_TO_QUERY = 346000  # query about a month's worth of blocks in each side before giving up
+# At creation the Pot has chi of 1 and a DSR of 0%
+POT_CREATION_CHI_POINT = DSRChiPoint(timestamp=Timestamp(POT_CREATION_TIMESTAMP), chi=RAY, dsr=RAY)
+# The `what` argument of pot.file() when the DSR is changed. 'dsr' as bytes32
+DSR_FILE_WHAT = int.from_bytes(b'dsr'.ljust(32, b'\x00'), byteorder='big')
 
 
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
@@ -111,35 +113,29 @@ class ChiRetrievalError(Exception):
     pass
 
 
-def _find_closest_event(
-        join_events: List[Dict[str, Any]],
-        exit_events: List[Dict[str, Any]],
-        index: int,
-        comparison: Callable,
-) -> Optional[Dict[str, Any]]:
-    """Given lists of events and index/comparisonop find the closest event
+def _rpow(x: int, n: int, base: int) -> int:
+    """Raises x to the n-th power in fixed point precision of `base`
 
-    Index and comparisonon depend on whether we are searching for the events
-    backwards or forwards.
+    Rounds exactly like the rpow of the Pot contract so that the computed chi
+    matches the one the contract would compute.
     """
-    found_event = None
-    if len(join_events) != 0:
-        found_event = join_events[index]
-    if len(exit_events) != 0:
-        if found_event:
-            try:
-                join_number = deserialize_blocknumber(found_event['blockNumber'])
-                exit_number = deserialize_blocknumber(exit_events[index]['blockNumber'])
-            except DeserializationError as e:
-                msg = f'Error at reading DSR drip event block number. {str(e)}'
-                raise ChiRetrievalError(msg)
+    if x == 0:
+        return base if n == 0 else 0
 
-            if comparison(exit_number, join_number):
-                found_event = exit_events[index]
-        else:
-            found_event = exit_events[index]
+    z = base if n % 2 == 0 else x
+    half = base // 2
+    n //= 2
+    while n > 0:
+        x = (x * x + half) // base
+        if n % 2 == 1:
+            z = (z * x + half) // base
+        n //= 2
+    return z
 
-    return found_event
+
+def _chi_at(point: DSRChiPoint, time: Timestamp) -> int:
+    """Calculates chi at a time from the latest point of the chi series before it"""
+    return point.chi * _rpow(point.dsr, time - point.timestamp, RAY) // RAY
 
 
 class MakerDAODSR(MakerDAOCommon):
@@ -160,6 +156,7 @@ class MakerDAODSR(MakerDAOCommon):
         )
         self.reset_last_query_ts()
         self.historical_dsr_reports: Dict[ChecksumEthAddress, DSRAccountReport] = {}
+        self.chi_series: List[DSRChiPoint] = []
         self.lock = Semaphore()
 
     def reset_last_query_ts(self) -> None:
@@ -464,16 +461,26 @@ class MakerDAODSR(MakerDAOCommon):
             gain_so_far_usd_value=gain_so_far_usd_value,
         )
 
-    def get_historical_dsr(self) -> Dict[ChecksumEthAddress, DSRAccountReport]:
+    def get_historical_dsr(
+            self,
+            reset_db_data: bool = False,
+    ) -> Dict[ChecksumEthAddress, DSRAccountReport]:
         """Gets the historical DSR report per account
 
             This is a premium only call. Check happens only in the API level.
+
+            If reset_db_data is given the DSR chi series saved in the DB is deleted
+            and the reports are queried again.
         """
         now = ts_now()
-        if now - self.last_historical_dsr_query_ts < MAKERDAO_REQUERY_PERIOD:
+        if not reset_db_data and now - self.last_historical_dsr_query_ts < MAKERDAO_REQUERY_PERIOD:
             return self.historical_dsr_reports
 
         with self.lock:
+            if reset_db_data is True:
+                self.database.delete_makerdao_dsr_chi_data()
+                self.chi_series = []
+
             proxy_mappings = self._get_accounts_having_maker_proxy()
             reports = {}
             for account, proxy in proxy_mappings.items():
@@ -488,143 +495,74 @@ class MakerDAODSR(MakerDAOCommon):
         self.last_historical_dsr_query_ts = ts_now()
         return self.historical_dsr_reports
 
-    def _get_join_exit_events(
-            self,
-            from_block: int,
-            to_block: int,
-    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        join_events = self.ethereum.get_logs(
-            contract_address=MAKERDAO_POT.address,
-            abi=MAKERDAO_POT.abi,
-            event_name='LogNote',
-            argument_filters={'sig': '0x049878f3'},  # join
-            from_block=from_block,
-            to_block=to_block,
-        )
-        exit_events = self.ethereum.get_logs(
-            contract_address=MAKERDAO_POT.address,
-            abi=MAKERDAO_POT.abi,
-            event_name='LogNote',
-            argument_filters={'sig': '0x7f8661a1'},  # exit
-            from_block=from_block,
-            to_block=to_block,
-        )
-        return join_events, exit_events
-
-    def _try_get_chi_close_to(self, time: Timestamp) -> FVal:
-        """Best effort attempt to get a chi value close to the given timestamp
+    def _update_chi_series(self) -> None:
+        """Extends the saved DSR chi series up to the latest block
 
-        It can't be 100% accurate since we use the logs of join() or exit()
-        in order to find the closest time chi was changed. It also may not work
-        if for some reason there is no logs in the block range we are looking for.
-
-        Better solution would have been an archive node's query.
+        Chi only changes by compounding the per second DSR, which the Pot contract
+        starts at 0% and which only changes with pot.file('dsr', value). So a
+        point is added at each of those calls and chi at any time can then be
+        calculated from the last point before it.
 
         May raise:
-        - RemoteError if there are problems with querying etherscan
-        - ChiRetrievalError if we are unable to query chi at the given timestamp
+        - RemoteError if etherscan is used and there is a problem with
+        reaching it or with the returned result.
         - BlockchainQueryError if an ethereum node is used and the contract call
         queries fail for some reason
+        - ChiRetrievalError if a DSR change event can't be read
         """
+        if len(self.chi_series) == 0:
+            self.chi_series = self.database.get_makerdao_dsr_chi_points()
 
-        if time > 1584386100:
-            # If the time is after 16/03/2020 19:15 GMT we know that
-            # makerdao DSR was set to 0% we know chi has not changed
-            # https://twitter.com/MakerDAO/status/1239270910810411008
-            return FVal('1018008449363110619399951035')
-
-        block_number = self.ethereum.etherscan.get_blocknumber_by_time(time)
-        latest_block = self.ethereum.get_latest_block_number()
-        blocks_queried = 0
-        counter = 1
-        # Keep trying to find events that could reveal the chi to us. Go back
-        # as far as MAX_BLOCKS_TO_QUERY and only then give up
-        while blocks_queried < MAX_BLOCKS_TO_QUERY:
-            back_from_block = max(
-                MAKERDAO_POT.deployed_block,
-                block_number - counter * CHI_BLOCKS_SEARCH_DISTANCE,
-            )
-            back_to_block = block_number - (counter - 1) * CHI_BLOCKS_SEARCH_DISTANCE
-            forward_from_block = min(
-                latest_block,
-                block_number + (counter - 1) * CHI_BLOCKS_SEARCH_DISTANCE,
-            )
-            forward_to_block = min(
-                latest_block,
-                block_number + CHI_BLOCKS_SEARCH_DISTANCE,
-            )
-            back_joins, back_exits = self._get_join_exit_events(back_from_block, back_to_block)
-            forward_joins, forward_exits = self._get_join_exit_events(
-                from_block=forward_from_block,
-                to_block=forward_to_block,
-            )
+        last_query = self.database.get_used_query_range(MAKERDAO_DSR_CHI_RANGE)
+        from_block = MAKERDAO_POT.deployed_block if last_query is None else last_query[1] + 1
+        to_block = self.ethereum.get_latest_block_number()
+        if from_block > to_block:
+            return
 
-            no_results = all(
-                len(x) == 0 for x in (back_joins, back_exits, forward_joins, forward_exits)
-            )
-            if latest_block == forward_to_block and no_results:
-                # if our forward querying got us to the latest block and there is
-                # still no other results, then take current chi
-                return self.ethereum.call_contract(
-                    contract_address=MAKERDAO_POT.address,
-                    abi=MAKERDAO_POT.abi,
-                    method_name='chi',
-                )
-
-            if not no_results:
-                # got results!
-                break
-
-            blocks_queried += 2 * CHI_BLOCKS_SEARCH_DISTANCE
-            counter += 1
-
-        if no_results:
-            raise ChiRetrievalError(
-                f'Found no DSR events around timestamp {time}. Cant query chi.',
-            )
-
-        # Find the closest event to the to_block number, looking both at events
-        # in the blocks before and in the blocks after block_number
-        found_event = None
-        back_event = _find_closest_event(back_joins, back_exits, -1, operator.gt)
-        forward_event = _find_closest_event(forward_joins, forward_exits, 0, operator.lt)
-
-        if back_event and not forward_event:
-            found_event = back_event
-        elif forward_event and not back_event:
-            found_event = forward_event
-        else:
-            # We have both backward and forward events, get the one closer to block number
+        events = self.ethereum.get_logs(
+            contract_address=MAKERDAO_POT.address,
+            abi=MAKERDAO_POT.abi,
+            event_name='LogNote',
+            argument_filters={'sig': '0x29ae8114'},  # file(bytes32,uint256)
+            from_block=from_block,
+            to_block=to_block,
+        )
+        last_point = self.chi_series[-1] if len(self.chi_series) != 0 else POT_CREATION_CHI_POINT
+        new_points = []
+        for event in events:
             try:
-                back_block_number = deserialize_blocknumber(back_event['blockNumber'])  # type: ignore  # noqa: E501
-                forward_block_number = deserialize_blocknumber(forward_event['blockNumber'])  # type: ignore  # noqa: E501
-            except DeserializationError as e:
-                msg = f'Error at reading DSR drip event block number. {str(e)}'
-                raise ChiRetrievalError(msg)
+                what = hex_or_bytes_to_int(event['topics'][2])
+                dsr = hex_or_bytes_to_int(event['topics'][3])
+            except ConversionError as e:
+                raise ChiRetrievalError(f'Error at reading DSR change event topics. {str(e)}')
 
-            if block_number - back_block_number <= forward_block_number - block_number:
-                found_event = back_event
-            else:
-                found_event = forward_event
+            if what != DSR_FILE_WHAT:
+                continue
 
-        assert found_event, 'at this point found_event should be populated'  # helps mypy
-        event_block_number = deserialize_blocknumber(found_event['blockNumber'])
-        first_topic = hex_or_bytes_to_str(found_event['topics'][0])
+            timestamp = self.ethereum.get_event_timestamp(event)
+            last_point = DSRChiPoint(
+                timestamp=timestamp,
+                chi=_chi_at(last_point, timestamp),
+                dsr=dsr,
+            )
+            new_points.append(last_point)
 
-        amount = self._get_vat_join_exit_at_transaction(
-            movement_type='join' if first_topic.startswith('0x049878f3') else 'exit',
-            proxy_address=hex_or_bytes_to_address(found_event['topics'][1]),
-            block_number=event_block_number,
-            transaction_index=found_event['transactionIndex'],
+        self.database.add_makerdao_dsr_chi_points(new_points)
+        self.database.update_used_block_query_range(
+            name=MAKERDAO_DSR_CHI_RANGE,
+            from_block=MAKERDAO_POT.deployed_block,
+            to_block=to_block,
         )
-        if amount is None:
-            raise ChiRetrievalError(
-                f'Found no VAT.move events around timestamp {time}. Cant query chi.',
-            )
+        self.chi_series.extend(new_points)
+
+    def _get_chi_at(self, time: Timestamp) -> FVal:
+        """Gets chi at the given timestamp from the chi series
 
-        wad_val = hex_or_bytes_to_int(found_event['topics'][2])
-        chi = FVal(amount) / FVal(wad_val)
-        return chi
+        The series should have been updated by _update_chi_series() before this is called
+        """
+        idx = bisect_right([x.timestamp for x in self.chi_series], time)
+        point = self.chi_series[idx - 1] if idx != 0 else POT_CREATION_CHI_POINT
+        return FVal(_chi_at(point, time))
 
     def _get_dsr_account_gain_in_period(
             self,
@@ -634,11 +572,7 @@ class MakerDAODSR(MakerDAOCommon):
     ) -> Tuple[FVal, Timestamp]:
         """Get DSR gain for the account in a given period
 
-        May raise:
-        - ChiRetrievalError if we are unable to query chi at the given timestamp
-        - RemoteError if etherscan is queried and there is a problem with the query
-        - BlockchainQueryError if an ethereum node is used and the contract call
-        queries fail for some reason
+        Chi comes from the chi series so this makes no queries
         """
         # First events show up ~432000 seconds after deployment
         if from_ts < POT_CREATION_TIMESTAMP:
@@ -647,8 +581,8 @@ class MakerDAODSR(MakerDAOCommon):
         if to_ts < POT_CREATION_TIMESTAMP:
             to_ts = Timestamp(POT_CREATION_TIMESTAMP + 432000)
 
-        from_chi = self._try_get_chi_close_to(from_ts)
-        to_chi = self._try_get_chi_close_to(to_ts)
+        from_chi = self._get_chi_at(from_ts)
+        to_chi = self._get_chi_at(to_ts)
         normalized_balance = 0
         amount_in_dsr = 0
         gain_at_from_ts = ZERO
@@ -696,8 +630,16 @@ class MakerDAODSR(MakerDAOCommon):
         history = self.get_historical_dsr()
 
         gains = []
+        chi_series_updated = False
         for account, report in history.items():
             try:
+                # The chi series is shared by all accounts so it is updated only
+                # once. If that fails it is tried again for the next account.
+                if not chi_series_updated:
+                    with self.lock:
+                        self._update_chi_series()
+                    chi_series_updated = True
+
                 gains.append(self._get_dsr_account_gain_in_period(
                     movements=report.movements,
                     from_ts=from_ts,
@@ -1,9 +1,10 @@
 import logging
 from collections import defaultdict
-from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
 
+import gevent
 from eth_utils.address import to_checksum_address
+from gevent.event import AsyncResult
 from gevent.lock import Semaphore
 
 from rotkehlchen.accounting.structures import Balance
@@ -15,6 +16,7 @@ from rotkehlchen.chain.ethereum.makerdao.common import (
     WAD,
     MakerDAOCommon,
 )
+from rotkehlchen.chain.ethereum.structures import StoredVaultEvent, VaultEvent, VaultEventType
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_DAI
 from rotkehlchen.constants.ethereum import (
@@ -32,7 +34,9 @@ from rotkehlchen.constants.ethereum import (
     MAKERDAO_USDC_B_JOIN,
     MAKERDAO_VAT,
     MAKERDAO_WBTC_A_JOIN,
+    MAKERDAO_VAULT_EVENTS_PREFIX,
     MAKERDAO_ZRX_A_JOIN,
+    EthereumContract,
 )
 from rotkehlchen.constants.timing import YEAR_IN_SECONDS
 from rotkehlchen.db.dbhandler import DBHandler
@@ -40,6 +44,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.history.price import query_usd_price_or_use_default
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.premium.premium import Premium
+from rotkehlchen.serialization.deserialize import deserialize_int_from_hex_or_int
 from rotkehlchen.typing import ChecksumEthAddress, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import address_to_bytes32, hex_or_bytes_to_int, ts_now
@@ -85,33 +90,30 @@ def _normalize_amount(asset_symbol: str, amount: int) -> FVal:
     raise AssertionError('should never reach here')
 
 
-class VaultEventType(Enum):
-    DEPOSIT_COLLATERAL = 1
-    WITHDRAW_COLLATERAL = 2
-    GENERATE_DEBT = 3
-    PAYBACK_DEBT = 4
-    LIQUIDATION = 5
+def _make_stored_event(
+        vault: 'MakerDAOVault',
+        event: Dict[str, Any],
+        event_type: VaultEventType,
+        value: Balance,
+        timestamp: Timestamp,
+        raw_amount: int,
+) -> StoredVaultEvent:
+    """Turns a queried log of a vault into the vault event that is kept in the DB
 
-    def __str__(self) -> str:
-        if self == VaultEventType.DEPOSIT_COLLATERAL:
-            return 'deposit'
-        elif self == VaultEventType.WITHDRAW_COLLATERAL:
-            return 'withdraw'
-        elif self == VaultEventType.GENERATE_DEBT:
-            return 'generate'
-        elif self == VaultEventType.PAYBACK_DEBT:
-            return 'payback'
-        elif self == VaultEventType.LIQUIDATION:
-            return 'liquidation'
-
-        raise RuntimeError(f'Corrupt value {self} for VaultEventType -- Should never happen')
-
-
-class VaultEvent(NamedTuple):
-    event_type: VaultEventType
-    value: Balance
-    timestamp: Timestamp
-    tx_hash: str
+    May raise:
+    - DeserializationError if the log index of the event can't be read
+    """
+    return StoredVaultEvent(
+        identifier=vault.identifier,
+        event=VaultEvent(
+            event_type=event_type,
+            value=value,
+            timestamp=timestamp,
+            tx_hash=event['transactionHash'],
+        ),
+        raw_amount=raw_amount,
+        log_index=deserialize_int_from_hex_or_int(event['logIndex'], 'vault event log index'),
+    )
 
 
 class MakerDAOVault(NamedTuple):
@@ -200,6 +202,7 @@ class MakerDAOVaults(MakerDAOCommon):
         self.vault_mappings: Dict[ChecksumEthAddress, List[MakerDAOVault]] = defaultdict(list)
         self.ilk_to_stability_fee: Dict[bytes, FVal] = {}
         self.vault_details: List[MakerDAOVaultDetails] = []
+        self.shared_scans: Dict[Tuple[Any, ...], AsyncResult] = {}
 
     def reset_last_query_ts(self) -> None:
         """Reset the last query timestamps, effectively cleaning the caches"""
@@ -295,16 +298,55 @@ class MakerDAOVaults(MakerDAOCommon):
             stability_fee=self.get_stability_fee(ilk),
         )
 
-    def _query_vault_details(
+    def _get_logs(
             self,
-            vault: MakerDAOVault,
-            proxy: ChecksumEthAddress,
-            urn: ChecksumEthAddress,
-    ) -> Optional[MakerDAOVaultDetails]:
-        asset_symbol = vault.collateral_asset.identifier
-        # They can raise:
-        # ConversionError due to hex_or_bytes_to_address, hex_or_bytes_to_int
-        # RemoteError due to external query errors
+            contract: EthereumContract,
+            event_name: str,
+            argument_filters: Dict[str, Any],
+            from_block: Optional[int],
+            to_block: int,
+    ) -> List[Dict[str, Any]]:
+        """Queries the logs of a makerdao contract from the given block or from its deployment
+
+        While vault details are queried the same scan can be needed by more than
+        one vault, for example all deposits of a proxy in a collateral type. Each
+        distinct scan is made only once and any other vault waits for its result.
+        """
+        from_block = contract.deployed_block if from_block is None else from_block
+        key = (
+            contract.address,
+            event_name,
+            tuple(sorted(argument_filters.items())),
+            from_block,
+            to_block,
+        )
+        result = self.shared_scans.get(key, None)
+        if result is not None:
+            return result.get()
+
+        result = AsyncResult()
+        self.shared_scans[key] = result
+        try:
+            events = self.ethereum.get_logs(
+                contract_address=contract.address,
+                abi=contract.abi,
+                event_name=event_name,
+                argument_filters=argument_filters,
+                from_block=from_block,
+                to_block=to_block,
+            )
+        except BaseException as e:  # let anyone waiting for this scan know it failed
+            result.set_exception(e)
+            raise
+
+        result.set(events)
+        return events
+
+    def _get_vault_creation_ts(self, vault: MakerDAOVault) -> Optional[Timestamp]:
+        creation_ts = self.database.get_makerdao_vault_creation_ts(vault.identifier)
+        if creation_ts is not None:
+            return creation_ts
+
         events = self.ethereum.get_logs(
             contract_address=MAKERDAO_CDP_MANAGER.address,
             abi=MAKERDAO_CDP_MANAGER.abi,
@@ -328,7 +370,22 @@ class MakerDAOVaults(MakerDAOCommon):
                 'happen. Please open a bug report: https://github.com/rotki/rotki/issues',
             )
         creation_ts = self.ethereum.get_event_timestamp(events[0])
+        self.database.set_makerdao_vault_creation_ts(vault.identifier, creation_ts)
+        return creation_ts
 
+    def _query_vault_events(
+            self,
+            vault: MakerDAOVault,
+            proxy: ChecksumEthAddress,
+            urn: ChecksumEthAddress,
+            from_block: Optional[int],
+            to_block: int,
+    ) -> List[StoredVaultEvent]:
+        """Queries the events of a vault between the given blocks
+
+        If from_block is None the events are queried since the deployment of each contract
+        """
+        asset_symbol = vault.collateral_asset.identifier
         # get vat frob events for cross-checking
         argument_filters = {
             'sig': '0x76088703',  # frob
@@ -338,12 +395,12 @@ class MakerDAOVaults(MakerDAOCommon):
             # so don't filter for it
             # 'arg3': address_to_bytes32(proxy),  # proxy - owner
         }
-        frob_events = self.ethereum.get_logs(
-            contract_address=MAKERDAO_VAT.address,
-            abi=MAKERDAO_VAT.abi,
+        frob_events = self._get_logs(
+            contract=MAKERDAO_VAT,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_VAT.deployed_block,
+            from_block=from_block,
+            to_block=to_block,
         )
         frob_event_tx_hashes = [x['transactionHash'] for x in frob_events]
 
@@ -359,13 +416,13 @@ class MakerDAOVaults(MakerDAOCommon):
             # 'usr': proxy,
             'arg1': address_to_bytes32(urn),
         }
-        events = self.ethereum.get_logs(
-            contract_address=gemjoin.address,
-            abi=gemjoin.abi,
+        events = list(self._get_logs(
+            contract=gemjoin,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=gemjoin.deployed_block,
-        )
+            from_block=from_block,
+            to_block=to_block,
+        ))
         # all subsequent deposits should have the proxy as a usr
         # but for non-migrated CDPS the previous query would also work
         # so in those cases we will have the first deposit 2 times
@@ -373,12 +430,12 @@ class MakerDAOVaults(MakerDAOCommon):
             'sig': '0x3b4da69f',  # join
             'usr': proxy,
         }
-        events.extend(self.ethereum.get_logs(
-            contract_address=gemjoin.address,
-            abi=gemjoin.abi,
+        events.extend(self._get_logs(
+            contract=gemjoin,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=gemjoin.deployed_block,
+            from_block=from_block,
+            to_block=to_block,
         ))
         deposit_tx_hashes = set()
         for event in events:
@@ -392,10 +449,8 @@ class MakerDAOVaults(MakerDAOCommon):
                 continue
 
             deposit_tx_hashes.add(tx_hash)
-            amount = _normalize_amount(
-                asset_symbol=asset_symbol,
-                amount=hex_or_bytes_to_int(event['topics'][3]),
-            )
+            raw_amount = hex_or_bytes_to_int(event['topics'][3])
+            amount = _normalize_amount(asset_symbol=asset_symbol, amount=raw_amount)
             timestamp = self.ethereum.get_event_timestamp(event)
             usd_price = query_usd_price_or_use_default(
                 asset=vault.collateral_asset,
@@ -403,11 +458,13 @@ class MakerDAOVaults(MakerDAOCommon):
                 default_value=ZERO,
                 location='vault collateral deposit',
             )
-            vault_events.append(VaultEvent(
+            vault_events.append(_make_stored_event(
+                vault=vault,
+                event=event,
                 event_type=VaultEventType.DEPOSIT_COLLATERAL,
                 value=Balance(amount, amount * usd_price),
                 timestamp=timestamp,
-                tx_hash=tx_hash,
+                raw_amount=raw_amount,
             ))
 
         # Get the collateral withdrawal events
@@ -415,22 +472,20 @@ class MakerDAOVaults(MakerDAOCommon):
             'sig': '0xef693bed',  # exit
             'usr': proxy,
         }
-        events = self.ethereum.get_logs(
-            contract_address=gemjoin.address,
-            abi=gemjoin.abi,
+        events = self._get_logs(
+            contract=gemjoin,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=gemjoin.deployed_block,
+            from_block=from_block,
+            to_block=to_block,
         )
         for event in events:
             tx_hash = event['transactionHash']
             if tx_hash not in frob_event_tx_hashes:
                 # If there is no corresponding frob event then skip
                 continue
-            amount = _normalize_amount(
-                asset_symbol=asset_symbol,
-                amount=hex_or_bytes_to_int(event['topics'][3]),
-            )
+            raw_amount = hex_or_bytes_to_int(event['topics'][3])
+            amount = _normalize_amount(asset_symbol=asset_symbol, amount=raw_amount)
             timestamp = self.ethereum.get_event_timestamp(event)
             usd_price = query_usd_price_or_use_default(
                 asset=vault.collateral_asset,
@@ -438,14 +493,15 @@ class MakerDAOVaults(MakerDAOCommon):
                 default_value=ZERO,
                 location='vault collateral withdrawal',
             )
-            vault_events.append(VaultEvent(
+            vault_events.append(_make_stored_event(
+                vault=vault,
+                event=event,
                 event_type=VaultEventType.WITHDRAW_COLLATERAL,
                 value=Balance(amount, amount * usd_price),
                 timestamp=timestamp,
-                tx_hash=event['transactionHash'],
+                raw_amount=raw_amount,
             ))
 
-        total_dai_wei = 0
         # Get the dai generation events
         argument_filters = {
             'sig': '0xbb35783b',  # move
@@ -455,16 +511,15 @@ class MakerDAOVaults(MakerDAOCommon):
             # filter for it here. Still seems like the urn as arg1 is sufficient
             # 'arg2': address_to_bytes32(proxy),
         }
-        events = self.ethereum.get_logs(
-            contract_address=MAKERDAO_VAT.address,
-            abi=MAKERDAO_VAT.abi,
+        events = self._get_logs(
+            contract=MAKERDAO_VAT,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_VAT.deployed_block,
+            from_block=from_block,
+            to_block=to_block,
         )
         for event in events:
             given_amount = _shift_num_right_by(hex_or_bytes_to_int(event['topics'][3]), RAY_DIGITS)
-            total_dai_wei += given_amount
             amount = _normalize_amount(
                 asset_symbol='DAI',
                 amount=given_amount,
@@ -476,11 +531,13 @@ class MakerDAOVaults(MakerDAOCommon):
                 default_value=FVal(1),
                 location='vault debt generation',
             )
-            vault_events.append(VaultEvent(
+            vault_events.append(_make_stored_event(
+                vault=vault,
+                event=event,
                 event_type=VaultEventType.GENERATE_DEBT,
                 value=Balance(amount, amount * usd_price),
                 timestamp=timestamp,
-                tx_hash=event['transactionHash'],
+                raw_amount=given_amount,
             ))
 
         # Get the dai payback events
@@ -489,16 +546,15 @@ class MakerDAOVaults(MakerDAOCommon):
             'usr': proxy,
             'arg1': address_to_bytes32(urn),
         }
-        events = self.ethereum.get_logs(
-            contract_address=MAKERDAO_DAI_JOIN.address,
-            abi=MAKERDAO_DAI_JOIN.abi,
+        events = self._get_logs(
+            contract=MAKERDAO_DAI_JOIN,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_DAI_JOIN.deployed_block,
+            from_block=from_block,
+            to_block=to_block,
         )
         for event in events:
             given_amount = hex_or_bytes_to_int(event['topics'][3])
-            total_dai_wei -= given_amount
             amount = _normalize_amount(
                 asset_symbol='DAI',
                 amount=given_amount,
@@ -515,56 +571,105 @@ class MakerDAOVaults(MakerDAOCommon):
                 default_value=FVal(1),
                 location='vault debt payback',
             )
-
-            vault_events.append(VaultEvent(
+            vault_events.append(_make_stored_event(
+                vault=vault,
+                event=event,
                 event_type=VaultEventType.PAYBACK_DEBT,
                 value=Balance(amount, amount * usd_price),
                 timestamp=timestamp,
-                tx_hash=event['transactionHash'],
+                raw_amount=given_amount,
             ))
 
         # Get the liquidation events
         argument_filters = {'urn': urn}
-        events = self.ethereum.get_logs(
-            contract_address=MAKERDAO_CAT.address,
-            abi=MAKERDAO_CAT.abi,
+        events = self._get_logs(
+            contract=MAKERDAO_CAT,
             event_name='Bite',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_CAT.deployed_block,
+            from_block=from_block,
+            to_block=to_block,
         )
-        sum_liquidation_amount = ZERO
-        sum_liquidation_usd = ZERO
         for event in events:
             if isinstance(event['data'], str):
                 lot = event['data'][:66]
             else:  # bytes
                 lot = event['data'][:32]
-            amount = _normalize_amount(
-                asset_symbol=asset_symbol,
-                amount=hex_or_bytes_to_int(lot),
-            )
+            raw_amount = hex_or_bytes_to_int(lot)
+            amount = _normalize_amount(asset_symbol=asset_symbol, amount=raw_amount)
             timestamp = self.ethereum.get_event_timestamp(event)
-            sum_liquidation_amount += amount
             usd_price = query_usd_price_or_use_default(
                 asset=vault.collateral_asset,
                 time=timestamp,
                 default_value=ZERO,
                 location='vault collateral liquidation',
             )
-            amount_usd_value = amount * usd_price
-            sum_liquidation_usd += amount_usd_value
-            vault_events.append(VaultEvent(
+            vault_events.append(_make_stored_event(
+                vault=vault,
+                event=event,
                 event_type=VaultEventType.LIQUIDATION,
-                value=Balance(amount, amount_usd_value),
+                value=Balance(amount, amount * usd_price),
                 timestamp=timestamp,
-                tx_hash=event['transactionHash'],
+                raw_amount=raw_amount,
             ))
 
+        return vault_events
+
+    def _query_vault_details(
+            self,
+            vault: MakerDAOVault,
+            proxy: ChecksumEthAddress,
+            urn: ChecksumEthAddress,
+            to_block: int,
+    ) -> Optional[MakerDAOVaultDetails]:
+        """Gets the details of a vault, keeping its events in the DB so that
+        only blocks after the last query need to be scanned
+
+        They can raise:
+        ConversionError due to hex_or_bytes_to_address, hex_or_bytes_to_int
+        RemoteError due to external query errors
+        """
+        creation_ts = self._get_vault_creation_ts(vault)
+        if creation_ts is None:
+            return None
+
+        range_name = f'{MAKERDAO_VAULT_EVENTS_PREFIX}_{vault.identifier}'
+        stored_events = self.database.get_makerdao_vault_events(vault.identifier)
+        last_query = self.database.get_used_query_range(range_name)
+        from_block = None if last_query is None else last_query[1] + 1
+        if from_block is None or from_block <= to_block:
+            new_events = self._query_vault_events(
+                vault=vault,
+                proxy=proxy,
+                urn=urn,
+                from_block=from_block,
+                to_block=to_block,
+            )
+            self.database.add_makerdao_vault_events(new_events)
+            self.database.update_used_block_query_range(
+                name=range_name,
+                from_block=MAKERDAO_CDP_MANAGER.deployed_block,
+                to_block=to_block,
+            )
+            stored_events.extend(new_events)
+
+        total_dai_wei = 0
+        sum_liquidation_amount = ZERO
+        sum_liquidation_usd = ZERO
+        for entry in stored_events:
+            if entry.event.event_type == VaultEventType.GENERATE_DEBT:
+                total_dai_wei += entry.raw_amount
+            elif entry.event.event_type == VaultEventType.PAYBACK_DEBT:
+                total_dai_wei -= entry.raw_amount
+            elif entry.event.event_type == VaultEventType.LIQUIDATION:
+                sum_liquidation_amount += entry.event.value.amount
+                sum_liquidation_usd += entry.event.value.usd_value
+
         total_interest_owed = vault.debt.amount - _normalize_amount(
             asset_symbol='DAI',
             amount=total_dai_wei,
         )
         # sort vault events by timestamp
+        vault_events = [x.event for x in stored_events]
         vault_events.sort(key=lambda event: event.timestamp)
 
         return MakerDAOVaultDetails(
@@ -645,13 +750,14 @@ class MakerDAOVaults(MakerDAOCommon):
             vaults.sort(key=lambda vault: vault.identifier)
         return vaults
 
-    def get_vault_details(self) -> List[MakerDAOVaultDetails]:
+    def get_vault_details(self, reset_db_data: bool = False) -> List[MakerDAOVaultDetails]:
         """Queries vault details for the auto detected vaults of the user
 
         This is a premium only call. Check happens only at the API level.
 
         If the details have been queried in the past REQUERY_PERIOD
-        seconds then the old result is used.
+        seconds then the old result is used, unless reset_db_data is given.
+        Then the vault data saved in the DB is deleted and all of it is queried again.
 
         May raise:
         - RemoteError if etherscan is used and there is a problem with
@@ -659,19 +765,38 @@ class MakerDAOVaults(MakerDAOCommon):
         - BlockchainQueryError if an ethereum node is used and the contract call
         queries fail for some reason
         """
-        now = ts_now()
-        if now - self.last_vault_details_query_ts < MAKERDAO_REQUERY_PERIOD:
-            return self.vault_details
+        if reset_db_data is True:
+            with self.lock:
+                self.database.delete_makerdao_vault_data()
+        else:
+            now = ts_now()
+            if now - self.last_vault_details_query_ts < MAKERDAO_REQUERY_PERIOD:
+                return self.vault_details
 
         self.vault_details = []
         proxy_mappings = self._get_accounts_having_maker_proxy()
         # Make sure that before querying vault details there has been a recent vaults call
         vaults = self.get_vaults()
-        for vault in vaults:
-            proxy = proxy_mappings[vault.owner]
-            vault_detail = self._query_vault_details(vault, proxy, vault.urn)
-            if vault_detail:
-                self.vault_details.append(vault_detail)
+        to_block = self.ethereum.get_latest_block_number()
+        # Query all vaults concurrently. Scans that more than one vault needs are shared
+        self.shared_scans = {}
+        greenlets = [
+            gevent.spawn(
+                self._query_vault_details,
+                vault,
+                proxy_mappings[vault.owner],
+                vault.urn,
+                to_block,
+            ) for vault in vaults
+        ]
+        try:
+            gevent.joinall(greenlets, raise_error=True)
+        finally:
+            self.shared_scans = {}
+
+        for greenlet in greenlets:
+            if greenlet.value:
+                self.vault_details.append(greenlet.value)
 
         # Returns vault details sorted. Oldest identifier first
         self.vault_details.sort(key=lambda details: details.identifier)
@@ -13,12 +13,10 @@ from eth_typing import BlockNumber
 from eth_utils.address import to_checksum_address
 from typing_extensions import Literal
 from web3 import HTTPProvider, Web3
-from web3._utils.abi import get_abi_output_types
-from web3._utils.contracts import find_matching_event_abi
-from web3._utils.filters import construct_event_filter_params
 from web3.datastructures import MutableAttributeDict
 from web3.middleware.exception_retry_request import http_retry_request_middleware
 
+from rotkehlchen.chain.ethereum.contracts import ContractRegistry
 from rotkehlchen.chain.ethereum.transactions import EthTransactions
 from rotkehlchen.constants.ethereum import ETH_SCAN
 from rotkehlchen.db.dbhandler import DBHandler
@@ -27,6 +25,7 @@ from rotkehlchen.externalapis.etherscan import Etherscan
 from rotkehlchen.fval import FVal
 from rotkehlchen.greenlets import GreenletManager
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.metrics import metrics
 from rotkehlchen.serialization.serialize import process_result
 from rotkehlchen.typing import ChecksumEthAddress, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
@@ -128,6 +127,7 @@ class EthereumManager():
         log.debug(f'Initializing Ethereum Manager with {ethrpc_endpoint}')
         self.greenlet_manager = greenlet_manager
         self.web3_mapping: Dict[NodeName, Web3] = {}
+        self.contracts = ContractRegistry()
         self.own_rpc_endpoint = ethrpc_endpoint
         self.etherscan = etherscan
         self.msg_aggregator = msg_aggregator
@@ -297,9 +297,20 @@ class EthereumManager():
             if web3 is None and node != NodeName.ETHERSCAN:
                 continue
 
+            method_name = getattr(method, '__name__', 'unknown')
             try:
-                result = method(web3, **kwargs)
+                with metrics.timer(
+                        'rotki_ethereum_query_seconds',
+                        node=str(node),
+                        method=method_name,
+                ):
+                    result = method(web3, **kwargs)
             except (RemoteError, BlockchainQueryError, requests.exceptions.HTTPError) as e:
+                metrics.inc(
+                    'rotki_ethereum_query_failures_total',
+                    node=str(node),
+                    method=method_name,
+                )
                 log.warning(f'Failed to query {node} for {str(method)} due to {str(e)}')
                 # Catch all possible errors here and just try next node call
                 continue
@@ -492,8 +503,7 @@ class EthereumManager():
         - RemoteError if there is a problem with
         reaching etherscan or with the returned result
         """
-        web3 = Web3()
-        contract = web3.eth.contract(address=contract_address, abi=abi)
+        contract = self.contracts.contract(None, contract_address, abi)
         input_data = contract.encodeABI(method_name, args=arguments if arguments else [])
         result = self.etherscan.eth_call(
             to_address=contract_address,
@@ -505,12 +515,13 @@ class EthereumManager():
                 f' Returned 0x result',
             )
 
-        fn_abi = contract._find_matching_fn_abi(
-            fn_identifier=method_name,
-            args=arguments,
+        output_types = self.contracts.function_output_types(
+            contract=contract,
+            abi=abi,
+            method_name=method_name,
+            arguments=arguments,
         )
-        output_types = get_abi_output_types(fn_abi)
-        output_data = web3.codec.decode_abi(output_types, bytes.fromhex(result[2:]))
+        output_data = self.contracts.codec.decode_abi(output_types, bytes.fromhex(result[2:]))
 
         if len(output_data) == 1:
             return output_data[0]
@@ -596,7 +607,7 @@ class EthereumManager():
                 arguments=arguments,
             )
 
-        contract = web3.eth.contract(address=contract_address, abi=abi)
+        contract = self.contracts.contract(web3, contract_address, abi)
         try:
             method = getattr(contract.caller, method_name)
             result = method(*arguments if arguments else [])
@@ -643,18 +654,14 @@ class EthereumManager():
         - RemoteError if etherscan is used and there is a problem with
         reaching it or with the returned result
         """
-        event_abi = find_matching_event_abi(abi=abi, event_name=event_name)
-        _, filter_args = construct_event_filter_params(
-            event_abi=event_abi,
-            abi_codec=Web3().codec,
-            contract_address=contract_address,
+        filter_args = self.contracts.event_filter_params(
+            address=contract_address,
+            abi=abi,
+            event_name=event_name,
             argument_filters=argument_filters,
-            fromBlock=from_block,
-            toBlock=to_block,
+            from_block=from_block,
+            to_block=to_block,
         )
-        if event_abi['anonymous']:
-            # web3.py does not handle the anonymous events correctly and adds the first topic
-            filter_args['topics'] = filter_args['topics'][1:]
         events: List[Dict[str, Any]] = []
         start_block = from_block
         if web3 is not None:
@@ -1,6 +1,7 @@
 """Ethereum/defi protocol structures that need to be accessed from multiple places"""
 
 from dataclasses import dataclass
+from enum import Enum
 from typing import Any, Dict, NamedTuple, Optional
 
 from typing_extensions import Literal
@@ -8,7 +9,7 @@ from typing_extensions import Literal
 from rotkehlchen.accounting.structures import Balance
 from rotkehlchen.assets.asset import Asset, EthereumToken
 from rotkehlchen.constants.ethereum import EthereumContract
-from rotkehlchen.typing import Timestamp
+from rotkehlchen.typing import ChecksumEthAddress, Timestamp
 
 
 class AaveEvent(NamedTuple):
@@ -25,6 +26,75 @@ class AaveEvent(NamedTuple):
     log_index: int  # only used to identify uniqueness
 
 
+class VaultEventType(Enum):
+    DEPOSIT_COLLATERAL = 1
+    WITHDRAW_COLLATERAL = 2
+    GENERATE_DEBT = 3
+    PAYBACK_DEBT = 4
+    LIQUIDATION = 5
+
+    def __str__(self) -> str:
+        if self == VaultEventType.DEPOSIT_COLLATERAL:
+            return 'deposit'
+        elif self == VaultEventType.WITHDRAW_COLLATERAL:
+            return 'withdraw'
+        elif self == VaultEventType.GENERATE_DEBT:
+            return 'generate'
+        elif self == VaultEventType.PAYBACK_DEBT:
+            return 'payback'
+        elif self == VaultEventType.LIQUIDATION:
+            return 'liquidation'
+
+        raise RuntimeError(f'Corrupt value {self} for VaultEventType -- Should never happen')
+
+
+class VaultEvent(NamedTuple):
+    event_type: VaultEventType
+    value: Balance
+    timestamp: Timestamp
+    tx_hash: str
+
+
+class StoredVaultEvent(NamedTuple):
+    """A MakerDAO vault event along with the data needed to keep it in the DB"""
+    identifier: int
+    event: VaultEvent
+    # The amount as given in the event log, before normalizing it by decimals
+    raw_amount: int
+    log_index: int
+
+
+class DSRChiPoint(NamedTuple):
+    """A point of the MakerDAO DSR rate accumulator (chi) series
+
+    From `timestamp` on chi grows by `dsr` per second, until the next point
+    """
+    timestamp: Timestamp
+    # chi at timestamp in RAY precision (10**27)
+    chi: int
+    # the per second DSR from timestamp on in RAY precision (10**27)
+    dsr: int
+
+
+class CompoundEvent(NamedTuple):
+    event_type: Literal['mint', 'redeem', 'borrow', 'repay', 'liquidation', 'comp']
+    address: ChecksumEthAddress
+    block_number: int
+    timestamp: Timestamp
+    asset: Asset
+    value: Balance
+    to_asset: Optional[Asset]
+    to_value: Optional[Balance]
+    realized_pnl: Optional[Balance]
+    tx_hash: str
+    log_index: int  # only used to identify uniqueness
+
+    def serialize(self) -> Dict[str, Any]:
+        serialized = self._asdict()  # pylint: disable=no-member
+        del serialized['log_index']
+        return serialized
+
+
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class YearnVaultEvent:
     event_type: Literal['deposit', 'withdraw']
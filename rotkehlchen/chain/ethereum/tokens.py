@@ -1,7 +1,7 @@
 import logging
 import random
 from collections import defaultdict
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
 from rotkehlchen.assets.asset import EthereumToken
 from rotkehlchen.assets.resolver import AssetResolver
@@ -10,7 +10,6 @@ from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.constants.ethereum import ETH_SCAN
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.dbhandler import DBHandler
-from rotkehlchen.errors import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -65,7 +64,6 @@ class EthTokens():
     def detect_tokens_for_address(
             self,
             address: ChecksumEthAddress,
-            token_usd_price: Dict[EthereumToken, Price],
             etherscan_chunks: List[List[EthTokenInfo]],
             other_chunks: List[List[EthTokenInfo]],
     ) -> Dict[EthereumToken, FVal]:
@@ -75,11 +73,10 @@ class EthTokens():
             if NodeName.OWN in self.ethereum.web3_mapping:
                 call_order = [NodeName.OWN]
             for chunk in other_chunks:
-                self._get_tokens_balance_and_price(
+                self._get_tokens_balance(
                     address=address,
                     tokens=chunk,
                     balances=balances,
-                    token_usd_price=token_usd_price,
                     call_order=call_order + random.sample(
                         (NodeName.MYCRYPTO, NodeName.BLOCKSCOUT, NodeName.AVADO_POOL),
                         3,
@@ -87,11 +84,10 @@ class EthTokens():
                 )
         else:
             for chunk in etherscan_chunks:
-                self._get_tokens_balance_and_price(
+                self._get_tokens_balance(
                     address=address,
                     tokens=chunk,
                     balances=balances,
-                    token_usd_price=token_usd_price,
                     call_order=(NodeName.ETHERSCAN,),
                 )
 
@@ -122,7 +118,7 @@ class EthTokens():
         etherscan_chunks = list(get_chunks(all_tokens, n=ETHERSCAN_MAX_TOKEN_CHUNK_LENGTH))
         other_chunks = list(get_chunks(all_tokens, n=OTHER_MAX_TOKEN_CHUNK_LENGTH))
         now = ts_now()
-        token_usd_price: Dict[EthereumToken, Price] = {}
+        all_owned_tokens: Set[EthereumToken] = set()
         result = {}
 
         for address in addresses:
@@ -130,7 +126,6 @@ class EthTokens():
             if force_detection or saved_list is None:
                 balances = self.detect_tokens_for_address(
                     address=address,
-                    token_usd_price=token_usd_price,
                     etherscan_chunks=etherscan_chunks,
                     other_chunks=other_chunks,
                 )
@@ -139,24 +134,29 @@ class EthTokens():
                     continue  # Do not query if we know the address has no tokens
 
                 balances = defaultdict(FVal)
-                self._get_tokens_balance_and_price(
+                self._get_tokens_balance(
                     address=address,
                     tokens=[x.token_info() for x in saved_list],
                     balances=balances,
-                    token_usd_price=token_usd_price,
                     call_order=None,  # use defaults
                 )
 
             result[address] = balances
+            all_owned_tokens.update(balances.keys())
+
+        # Now that we know all the tokens get their prices in one go
+        usd_prices = Inquirer().find_usd_prices(all_owned_tokens)
+        token_usd_price: Dict[EthereumToken, Price] = {
+            token: usd_prices.get(token, Price(ZERO)) for token in all_owned_tokens
+        }
 
         return result, token_usd_price
 
-    def _get_tokens_balance_and_price(
+    def _get_tokens_balance(
             self,
             address: ChecksumEthAddress,
             tokens: List[EthTokenInfo],
             balances: Dict[EthereumToken, FVal],
-            token_usd_price: Dict[EthereumToken, Price],
             call_order: Optional[Sequence[NodeName]],
     ) -> None:
         ret = self._get_multitoken_account_balance(
@@ -165,16 +165,7 @@ class EthTokens():
             call_order=call_order,
         )
         for token_identifier, value in ret.items():
-            token = EthereumToken(token_identifier)
-            balances[token] += value
-            if token in token_usd_price:
-                continue
-            # else get the price
-            try:
-                usd_price = Inquirer().find_usd_price(token)
-            except RemoteError:
-                usd_price = Price(ZERO)
-            token_usd_price[token] = usd_price
+            balances[EthereumToken(token_identifier)] += value
 
     def _get_multitoken_multiaccount_balance(
             self,
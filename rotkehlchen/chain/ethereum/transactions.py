@@ -2,6 +2,8 @@ import logging
 from collections import defaultdict
 from typing import Dict, List, Optional, Set
 
+import gevent
+
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.ranges import DBQueryRanges
 from rotkehlchen.errors import RemoteError
@@ -31,6 +33,42 @@ class EthTransactions(LockableQueryObject):
         self.msg_aggregator = msg_aggregator
         self.tx_per_address: Dict[ChecksumEthAddress, int] = defaultdict(int)
 
+    def _query_and_save_transactions(
+            self,
+            address: ChecksumEthAddress,
+            internal: bool,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> List[EthereumTransaction]:
+        """Queries the normal or internal transactions of address from etherscan
+        and saves each page of them in the DB as soon as it arrives
+
+        Returns the transactions that got added to the DB. Internal transactions
+        come with the nonce they got in the DB.
+        """
+        added_transactions = []
+        try:
+            for transactions in self.etherscan.get_transactions(
+                    account=address,
+                    internal=internal,
+                    from_ts=start_ts,
+                    to_ts=end_ts,
+            ):
+                added_transactions.extend(self.database.add_ethereum_transactions(
+                    transactions,
+                    from_etherscan=True,
+                ))
+        except RemoteError as e:
+            self.msg_aggregator.add_error(
+                f'Got error "{str(e)}" while querying ethereum transactions '
+                f'from Etherscan. Transactions not added to the DB '
+                f'from_ts: {start_ts} '
+                f'to_ts: {end_ts} '
+                f'internal: {internal}',
+            )
+
+        return added_transactions
+
     def _single_address_query_transactions(
             self,
             address: ChecksumEthAddress,
@@ -50,36 +88,22 @@ class EthTransactions(LockableQueryObject):
             start_ts=start_ts,
             end_ts=end_ts,
         )
-        new_transactions = []
         for query_start_ts, query_end_ts in ranges_to_query:
-            for internal in (False, True):
-                try:
-                    new_transactions.extend(self.etherscan.get_transactions(
-                        account=address,
-                        internal=internal,
-                        from_ts=query_start_ts,
-                        to_ts=query_end_ts,
-                    ))
-                except RemoteError as e:
-                    self.msg_aggregator.add_error(
-                        f'Got error "{str(e)}" while querying ethereum transactions '
-                        f'from Etherscan. Transactions not added to the DB '
-                        f'from_ts: {query_start_ts} '
-                        f'to_ts: {query_end_ts} '
-                        f'internal: {internal}',
-                    )
-
-        # add new transactions to the DB
-        if new_transactions != []:
-            self.database.add_ethereum_transactions(new_transactions, from_etherscan=True)
-            # And since at least for now the increasingly negative nonce for the internal
-            # transactions happens only in the DB writing, requery the entire batch from
-            # the DB to get the updated transactions
-            transactions = self.database.get_ethereum_transactions(
-                from_ts=start_ts,
-                to_ts=end_ts,
-                address=address,
-            )
+            # Query normal and internal transactions at the same time
+            greenlets = [
+                gevent.spawn(
+                    self._query_and_save_transactions,
+                    address,
+                    internal,
+                    query_start_ts,
+                    query_end_ts,
+                ) for internal in (False, True)
+            ]
+            gevent.joinall(greenlets, raise_error=True)
+            for greenlet in greenlets:
+                transactions.extend(greenlet.value)
+
+        transactions.sort(key=lambda tx: tx.timestamp)
 
         # and also set the last queried timestamps for the address
         ranges.update_used_query_range(
@@ -1,5 +1,7 @@
+from collections import defaultdict
 from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
 
+import gevent
 from gevent.lock import Semaphore
 
 from rotkehlchen.accounting.structures import Balance
@@ -250,13 +252,18 @@ class YearnVaults(EthereumModule):
     def _get_vault_deposit_events(
             self,
             vault: YearnVault,
-            address: ChecksumEthAddress,
+            addresses: List[ChecksumEthAddress],
             from_block: int,
             to_block: int,
-    ) -> List[YearnVaultEvent]:
-        """Get all deposit events of the underlying token to the vault"""
-        events: List[YearnVaultEvent] = []
-        argument_filters = {'from': address, 'to': vault.contract.address}
+    ) -> Dict[ChecksumEthAddress, List[YearnVaultEvent]]:
+        """Get all deposit events of the underlying token to the vault for the given addresses
+
+        All addresses are queried in a single log scan and the events are then
+        matched to each address by the sender of the transfer.
+        """
+        events: Dict[ChecksumEthAddress, List[YearnVaultEvent]] = defaultdict(list)
+        topic_to_address = {address_to_bytes32(x): x for x in addresses}
+        argument_filters = {'from': addresses, 'to': vault.contract.address}
         deposit_events = self.ethereum.get_logs(
             contract_address=vault.underlying_token.ethereum_address,
             abi=ERC20TOKEN_ABI,
@@ -266,6 +273,10 @@ class YearnVaults(EthereumModule):
             to_block=to_block,
         )
         for deposit_event in deposit_events:
+            address = topic_to_address.get(deposit_event['topics'][1].lower(), None)
+            if address is None:
+                continue
+
             timestamp = self.ethereum.get_event_timestamp(deposit_event)
             deposit_amount = token_normalized_value(
                 hex_or_bytes_to_int(deposit_event['data']),
@@ -310,7 +321,7 @@ class YearnVaults(EthereumModule):
                 location='yearn vault deposit',
                 msg_aggregator=self.msg_aggregator,
             )
-            events.append(YearnVaultEvent(
+            events[address].append(YearnVaultEvent(
                 event_type='deposit',
                 block_number=deserialize_blocknumber(deposit_event['blockNumber']),
                 timestamp=timestamp,
@@ -334,13 +345,18 @@ class YearnVaults(EthereumModule):
     def _get_vault_withdraw_events(
             self,
             vault: YearnVault,
-            address: ChecksumEthAddress,
+            addresses: List[ChecksumEthAddress],
             from_block: int,
             to_block: int,
-    ) -> List[YearnVaultEvent]:
-        """Get all withdraw events of the underlying token to the vault"""
-        events: List[YearnVaultEvent] = []
-        argument_filters = {'from': vault.contract.address, 'to': address}
+    ) -> Dict[ChecksumEthAddress, List[YearnVaultEvent]]:
+        """Get all withdraw events of the underlying token from the vault for the given addresses
+
+        All addresses are queried in a single log scan and the events are then
+        matched to each address by the receiver of the transfer.
+        """
+        events: Dict[ChecksumEthAddress, List[YearnVaultEvent]] = defaultdict(list)
+        topic_to_address = {address_to_bytes32(x): x for x in addresses}
+        argument_filters = {'from': vault.contract.address, 'to': addresses}
         withdraw_events = self.ethereum.get_logs(
             contract_address=vault.underlying_token.ethereum_address,
             abi=ERC20TOKEN_ABI,
@@ -350,6 +366,10 @@ class YearnVaults(EthereumModule):
             to_block=to_block,
         )
         for withdraw_event in withdraw_events:
+            address = topic_to_address.get(withdraw_event['topics'][2].lower(), None)
+            if address is None:
+                continue
+
             timestamp = self.ethereum.get_event_timestamp(withdraw_event)
             withdraw_amount = token_normalized_value(
                 hex_or_bytes_to_int(withdraw_event['data']),
@@ -394,7 +414,7 @@ class YearnVaults(EthereumModule):
                 location='yearn vault withdraw',
                 msg_aggregator=self.msg_aggregator,
             )
-            events.append(YearnVaultEvent(
+            events[address].append(YearnVaultEvent(
                 event_type='withdraw',
                 block_number=deserialize_blocknumber(withdraw_event['blockNumber']),
                 timestamp=timestamp,
@@ -442,48 +462,82 @@ class YearnVaults(EthereumModule):
 
         return total
 
-    def get_vault_history(
+    def _query_vault_events(
             self,
-            defi_balances: List['DefiProtocolBalances'],
             vault: YearnVault,
-            address: ChecksumEthAddress,
+            addresses: List[ChecksumEthAddress],
             from_block: int,
             to_block: int,
-    ) -> Optional[YearnVaultHistory]:
+    ) -> Dict[ChecksumEthAddress, List[YearnVaultEvent]]:
+        """Returns the events of all given addresses for a vault, querying only what's missing
+
+        Addresses whose query range is not recent enough are all scanned together
+        starting from the earliest block any of them needs. Events that are older
+        than the part of the range an address still needed are dropped, since they
+        are already in the DB.
+        """
         from_block = max(from_block, vault.contract.deployed_block)
-        last_query = self.database.get_used_query_range(
-            name=f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}',
-        )
-        skip_query = last_query and to_block - last_query[1] < MAX_BLOCKTIME_CACHE
-
-        events = self.database.get_yearn_vaults_events(address=address, vault=vault)
-        if not skip_query:
-            query_from_block = last_query[1] + 1 if last_query else from_block
-            new_events = self._get_vault_deposit_events(vault, address, query_from_block, to_block)
-            if len(events) == 0 and len(new_events) == 0:
-                # After all events have been queried then also update the query range.
-                # Even if no events are found for an address we need to remember the range
-                self.database.update_used_block_query_range(
-                    name=f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}',
-                    from_block=from_block,
+        query_from_blocks: Dict[ChecksumEthAddress, int] = {}
+        events: Dict[ChecksumEthAddress, List[YearnVaultEvent]] = {}
+        for address in addresses:
+            last_query = self.database.get_used_query_range(
+                name=f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}',
+            )
+            skip_query = last_query and to_block - last_query[1] < MAX_BLOCKTIME_CACHE
+            if not skip_query:
+                query_from_blocks[address] = last_query[1] + 1 if last_query else from_block
+            events[address] = self.database.get_yearn_vaults_events(address=address, vault=vault)
+
+        if len(query_from_blocks) != 0:
+            query_addresses = list(query_from_blocks.keys())
+            scan_from_block = min(query_from_blocks.values())
+            new_events = self._get_vault_deposit_events(
+                vault=vault,
+                addresses=query_addresses,
+                from_block=scan_from_block,
+                to_block=to_block,
+            )
+            # Without any deposit there can't be any withdrawals
+            withdraw_addresses = [
+                x for x in query_addresses if len(events[x]) != 0 or len(new_events[x]) != 0
+            ]
+            if len(withdraw_addresses) != 0:
+                withdraw_events = self._get_vault_withdraw_events(
+                    vault=vault,
+                    addresses=withdraw_addresses,
+                    from_block=scan_from_block,
                     to_block=to_block,
                 )
-                return None
-
-            new_events.extend(
-                self._get_vault_withdraw_events(vault, address, query_from_block, to_block),
-            )
-            # Now update the DB with the new events
-            self.database.add_yearn_vaults_events(address, new_events)
-            events.extend(new_events)
+                for address, address_events in withdraw_events.items():
+                    new_events[address].extend(address_events)
+
+            for address in query_addresses:
+                address_new_events = [
+                    x for x in new_events[address]
+                    if x.block_number >= query_from_blocks[address]
+                ]
+                if len(address_new_events) != 0:
+                    # Now update the DB with the new events
+                    self.database.add_yearn_vaults_events(address, address_new_events)
+                    events[address].extend(address_new_events)
 
         # After all events have been queried then also update the query range.
         # Even if no events are found for an address we need to remember the range
-        self.database.update_used_block_query_range(
-            name=f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}',
-            from_block=from_block,
-            to_block=to_block,
-        )
+        for address in addresses:
+            self.database.update_used_block_query_range(
+                name=f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}',
+                from_block=from_block,
+                to_block=to_block,
+            )
+
+        return events
+
+    def _get_vault_history(
+            self,
+            defi_balances: List['DefiProtocolBalances'],
+            vault: YearnVault,
+            events: List[YearnVaultEvent],
+    ) -> Optional[YearnVaultHistory]:
         if len(events) == 0:
             return None
 
@@ -534,17 +588,30 @@ class YearnVaults(EthereumModule):
 
             from_block = self.ethereum.etherscan.get_blocknumber_by_time(from_timestamp)
             to_block = self.ethereum.etherscan.get_blocknumber_by_time(to_timestamp)
-            history: Dict[ChecksumEthAddress, Dict[str, YearnVaultHistory]] = {}
+            # Scan each vault once for all addresses and all vaults concurrently
+            greenlets = {
+                vault.name: gevent.spawn(
+                    self._query_vault_events,
+                    vault=vault,
+                    addresses=addresses,
+                    from_block=from_block,
+                    to_block=to_block,
+                ) for vault in YEARN_VAULTS.values()
+            }
+            try:
+                gevent.joinall(list(greenlets.values()), raise_error=True)
+            finally:
+                # If a scan failed don't let the other ones keep querying etherscan
+                gevent.killall(list(greenlets.values()))
 
+            history: Dict[ChecksumEthAddress, Dict[str, YearnVaultHistory]] = {}
             for address in addresses:
                 history[address] = {}
-                for _, vault in YEARN_VAULTS.items():
-                    vault_history = self.get_vault_history(
+                for vault in YEARN_VAULTS.values():
+                    vault_history = self._get_vault_history(
                         defi_balances=defi_balances.get(address, []),
                         vault=vault,
-                        address=address,
-                        from_block=from_block,
-                        to_block=to_block,
+                        events=greenlets[vault.name].value[address],
                     )
                     if vault_history:
                         history[address][vault.name] = vault_history
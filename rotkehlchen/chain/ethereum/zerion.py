@@ -1,6 +1,7 @@
 import logging
-from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
+import gevent
 from eth_utils.address import to_checksum_address
 from typing_extensions import Literal
 
@@ -131,6 +132,8 @@ class Zerion():
     ) -> None:
         self.ethereum = ethereum_manager
         self.msg_aggregator = msg_aggregator
+        # Prices of the tokens by symbol. Found only once per balances query
+        self._reset_price_caches()
 
         if contract_address:
             self.contract_address = contract_address
@@ -144,12 +147,46 @@ class Zerion():
 
         https://docs.zerion.io/smart-contracts/adapterregistry-v3#getbalances
         """
-        result = self.ethereum.call_contract(
+        self._reset_price_caches()
+        return self._process_balances(self._query_balances(account))
+
+    def all_balances_for_accounts(
+            self,
+            accounts: List[ChecksumEthAddress],
+    ) -> Dict[ChecksumEthAddress, List[DefiProtocolBalances]]:
+        """Gets all protocol balances for many accounts
+
+        The getBalances() calls for all accounts are made concurrently and then the
+        price of each distinct token is found only once for all the accounts.
+
+        Accounts with no protocol balances are not in the result.
+        """
+        greenlets = [gevent.spawn(self._query_balances, account) for account in accounts]
+        gevent.joinall(greenlets, raise_error=True)
+
+        self._reset_price_caches()
+        result = {}
+        for account, greenlet in zip(accounts, greenlets):
+            balances = self._process_balances(greenlet.value)
+            if len(balances) != 0:
+                result[account] = balances
+
+        return result
+
+    def _query_balances(self, account: ChecksumEthAddress) -> List[Any]:
+        return self.ethereum.call_contract(
             contract_address=self.contract_address,
             abi=ZERION_ABI,
             method_name='getBalances',
             arguments=[account],
         )
+
+    def _reset_price_caches(self) -> None:
+        self.defi_prices: Dict[str, Optional[FVal]] = {}
+        self.asset_prices: Dict[str, Price] = {}
+
+    def _process_balances(self, result: List[Any]) -> List[DefiProtocolBalances]:
+        """Turns the result of the contract's getBalances() into protocol balances"""
         protocol_balances = []
         for entry in result:
             protocol = DefiProtocol(
@@ -207,15 +244,18 @@ class Zerion():
         if special_handling:
             return special_handling
 
-        try:
-            asset = Asset(token_symbol)
-            usd_price = Inquirer().find_usd_price(asset)
-        except (UnknownAsset, UnsupportedAsset):
-            if not _is_token_non_standard(token_symbol, token_address):
-                self.msg_aggregator.add_warning(
-                    f'Unsupported asset {token_symbol} encountered during DeFi protocol queries',
-                )
-            usd_price = Price(ZERO)
+        usd_price = self.asset_prices.get(token_symbol, None)
+        if usd_price is None:
+            try:
+                asset = Asset(token_symbol)
+                usd_price = Inquirer().find_usd_price(asset)
+            except (UnknownAsset, UnsupportedAsset):
+                if not _is_token_non_standard(token_symbol, token_address):
+                    self.msg_aggregator.add_warning(
+                        f'Unsupported asset {token_symbol} encountered during DeFi protocol queries',  # noqa: E501
+                    )
+                usd_price = Price(ZERO)
+            self.asset_prices[token_symbol] = usd_price
 
         usd_value = normalized_value * usd_price
         defi_balance = DefiBalance(
@@ -242,8 +282,16 @@ class Zerion():
             if result is not None:
                 return result
 
-        underlying_asset_price = get_underlying_asset_price(token_symbol)
-        usd_price = handle_defi_price_query(self.ethereum, token_symbol, underlying_asset_price)
+        if token_symbol in self.defi_prices:
+            usd_price = self.defi_prices[token_symbol]
+        else:
+            underlying_asset_price = get_underlying_asset_price(token_symbol)
+            usd_price = handle_defi_price_query(
+                self.ethereum,
+                token_symbol,
+                underlying_asset_price,
+            )
+            self.defi_prices[token_symbol] = usd_price
         if usd_price is None:
             return None
 
@@ -835,12 +835,8 @@ class ChainManager(CacheableObject, LockableQueryObject):
             return self.defi_balances
 
         # query zerion for defi balances
-        self.defi_balances = {}
         zerion = self.get_zerion()
-        for account in self.accounts.eth:
-            balances = zerion.all_balances_for_account(account)
-            if len(balances) != 0:
-                self.defi_balances[account] = balances
+        self.defi_balances = zerion.all_balances_for_accounts(self.accounts.eth)
 
         self.defi_balances_last_query_ts = ts_now()
         return self.defi_balances
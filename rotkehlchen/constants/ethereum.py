@@ -129,3 +129,6 @@ CTOKEN_ABI = EthereumConstants.abi('CTOKEN')
 ERC20TOKEN_ABI = EthereumConstants.abi('ERC20_TOKEN')
 
 YEARN_VAULTS_PREFIX = 'yearn_vaults_events'
+COMPOUND_EVENTS_PREFIX = 'compound_events'
+MAKERDAO_VAULT_EVENTS_PREFIX = 'makerdao_vault_events'
+MAKERDAO_DSR_CHI_RANGE = 'makerdao_dsr_chi'
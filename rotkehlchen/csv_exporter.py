@@ -1,9 +1,11 @@
 import csv
 import logging
+import shutil
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
 
-from rotkehlchen.accounting.structures import DefiEvent
+from rotkehlchen.accounting.structures import DefiEvent, TaxReportEvent
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import (
     EV_ASSET_MOVE,
@@ -18,9 +20,11 @@ from rotkehlchen.constants import (
     ZERO,
 )
 from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter, make_sensitive
 from rotkehlchen.typing import AssetMovementCategory, EmptyStr, EventType, Fee, Location, Timestamp
+from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import taxable_gain_for_sell, timestamp_to_date
 
 logger = logging.getLogger(__name__)
@@ -34,48 +38,180 @@ FILENAME_MARGIN_CSV = 'margin_positions.csv'
 FILENAME_LOAN_SETTLEMENTS_CSV = 'loan_settlements.csv'
 FILENAME_DEFI_EVENTS_CSV = 'defi_events.csv'
 FILENAME_ALL_CSV = 'all_events.csv'
-
-
-def _dict_to_csv_file(path: Path, dictionary_list: List) -> None:
-    """Takes a filepath and a list of dictionaries representing the rows and writes them
-    into the file as a CSV"""
-    if len(dictionary_list) == 0:
-        log.debug('Skipping writting empty CSV for {}'.format(path))
-        return
-
-    with open(path, 'w') as f:
-        w = csv.DictWriter(f, dictionary_list[0].keys())
-        w.writeheader()
-        for dic in dictionary_list:
-            w.writerow(dic)
+# Prefix of the temporary directory where the CSV files of the latest report are written
+TAX_REPORT_DIRECTORY_PREFIX = 'rotki_tax_report_'
+
+# Number of processed events kept in memory before writing them to the DB.
+# Also the number of events read at a time when exporting them
+TAX_REPORT_EVENTS_BATCH_SIZE = 1000
+
+
+class CSVFileWriter():
+    """Appends rows to a CSV file as they are created
+
+    The file is only created when the first row is written, so that no empty
+    CSV files are left around.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.rows_num = 0
+        self.file: Optional[TextIO] = None
+        self.writer: Optional[csv.DictWriter] = None
+
+    @property
+    def next_row(self) -> int:
+        """The spreadsheet row number of the next row. Row 1 is the header"""
+        return self.rows_num + 2
+
+    def write_row(self, row: Dict[str, Any]) -> None:
+        if self.writer is None:
+            self.file = open(self.path, 'w')
+            self.writer = csv.DictWriter(self.file, row.keys())
+            self.writer.writeheader()
+
+        self.writer.writerow(row)
+        self.rows_num += 1
+
+    def flush(self) -> None:
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
+
+
+def _all_events_csv_row(
+        event: TaxReportEvent,
+        row: int,
+        profit_currency: Asset,
+) -> Dict[str, Any]:
+    """Turns a tax report event into the given row of the all events CSV
+
+    The net profit or loss is a formula of the other columns of the row
+    """
+    if event.event_type == EV_BUY:
+        net_profit_or_loss_csv = '0'
+    elif event.event_type == EV_SELL:
+        net_profit_or_loss_csv = '=IF(E{}=0,0,L{}-M{})'.format(row, row, row)
+    elif event.event_type in (EV_TX_GAS_COST, EV_ASSET_MOVE, EV_LOAN_SETTLE):
+        net_profit_or_loss_csv = '=-K{}'.format(row)
+    else:  # EV_INTEREST_PAYMENT, EV_MARGIN_CLOSE, EV_DEFI
+        net_profit_or_loss_csv = '=L{}'.format(row)
+
+    return {
+        'type': event.event_type,
+        'location': str(event.location),
+        'paid_asset': event.paid_asset,
+        'paid_in_asset': event.paid_in_asset,
+        'taxable_amount': event.taxable_amount,
+        'received_asset': event.received_asset,
+        'received_in_asset': event.received_in_asset,
+        'net_profit_or_loss': net_profit_or_loss_csv,
+        'time': timestamp_to_date(event.timestamp, formatstr='%d/%m/%Y %H:%M:%S'),
+        'is_virtual': event.is_virtual,
+        f'paid_in_{profit_currency.identifier}': event.paid_in_profit_currency,
+        f'taxable_received_in_{profit_currency.identifier}': (
+            event.taxable_received_in_profit_currency
+        ),
+        f'taxable_bought_cost_in_{profit_currency.identifier}': (
+            event.taxable_bought_cost_in_profit_currency
+        ),
+    }
 
 
 class CSVExporter():
 
     def __init__(
             self,
+            database: DBHandler,
             profit_currency: Asset,
             user_directory: Path,
             create_csv: bool,
+            msg_aggregator: MessagesAggregator,
     ):
+        self.database = database
+        self.msg_aggregator = msg_aggregator
         self.user_directory = user_directory
+        self.report_directory = TemporaryDirectory(prefix=TAX_REPORT_DIRECTORY_PREFIX)
         self.profit_currency = profit_currency
         self.create_csv = create_csv
-        self.all_events: List[Dict[str, Any]] = []
-        self.reset_csv_lists()
-
-    def reset_csv_lists(self) -> None:
-        # TODO: Further specify the types here in more detail. Get rid of "Any"
-        if self.create_csv:
-            self.trades_csv: List[Dict[str, Any]] = []
-            self.loan_profits_csv: List[Dict[str, Any]] = []
-            self.asset_movements_csv: List[Dict[str, Any]] = []
-            self.tx_gas_costs_csv: List[Dict[str, Any]] = []
-            self.margin_positions_csv: List[Dict[str, Any]] = []
-            self.loan_settlements_csv: List[Dict[str, Any]] = []
-            self.defi_events_csv: List[Dict[str, Any]] = []
-            self.all_events_csv: List[Dict[str, Any]] = []
-            self.all_events = []
+        self.report_id: Optional[int] = None
+        self.events_num = 0
+        self.pending_events: List[TaxReportEvent] = []
+        self._create_writers()
+
+    def _create_writers(self) -> None:
+        directory = Path(self.report_directory.name)
+        self.trades_csv = CSVFileWriter(directory / FILENAME_TRADES_CSV)
+        self.loan_profits_csv = CSVFileWriter(directory / FILENAME_LOAN_PROFITS_CSV)
+        self.asset_movements_csv = CSVFileWriter(directory / FILENAME_ASSET_MOVEMENTS_CSV)
+        self.tx_gas_costs_csv = CSVFileWriter(directory / FILENAME_GAS_CSV)
+        self.margin_positions_csv = CSVFileWriter(directory / FILENAME_MARGIN_CSV)
+        self.loan_settlements_csv = CSVFileWriter(directory / FILENAME_LOAN_SETTLEMENTS_CSV)
+        self.defi_events_csv = CSVFileWriter(directory / FILENAME_DEFI_EVENTS_CSV)
+
+    @property
+    def writers(self) -> List[CSVFileWriter]:
+        return [
+            self.trades_csv,
+            self.loan_profits_csv,
+            self.asset_movements_csv,
+            self.tx_gas_costs_csv,
+            self.margin_positions_csv,
+            self.loan_settlements_csv,
+            self.defi_events_csv,
+        ]
+
+    def start_report(self, start_ts: Timestamp, end_ts: Timestamp) -> None:
+        """Starts a new tax report run
+
+        Its events are stored in the DB and its CSV files are written in a new
+        temporary directory while it is processed, replacing those of the previous report.
+        """
+        self.cleanup()
+        self.events_num = 0
+        self.pending_events = []
+        if not self.create_csv:
+            return
+
+        self.report_directory = TemporaryDirectory(prefix=TAX_REPORT_DIRECTORY_PREFIX)
+        self._create_writers()
+        self.report_id = self.database.add_tax_report(
+            start_ts=start_ts,
+            end_ts=end_ts,
+            profit_currency=self.profit_currency,
+        )
+
+    def flush_events(self) -> None:
+        """Writes the events that are still kept in memory to the DB"""
+        if len(self.pending_events) == 0 or self.report_id is None:
+            return
+
+        self.database.add_tax_report_events(
+            report_id=self.report_id,
+            start_idx=self.events_num - len(self.pending_events),
+            events=self.pending_events,
+        )
+        self.pending_events = []
+
+    def finish_report(self) -> None:
+        """Stores the rest of the report's events and closes its CSV files"""
+        self.flush_events()
+        for writer in self.writers:
+            writer.close()
+
+    def cleanup(self) -> None:
+        """Closes the CSV files of the latest report and deletes them
+
+        Their data is not encrypted, so they should not outlive the user's session.
+        """
+        for writer in self.writers:
+            writer.close()
+        self.report_directory.cleanup()
 
     def add_to_allevents(
             self,
@@ -92,60 +228,77 @@ class CSVExporter():
             taxable_amount: FVal = ZERO,
             taxable_bought_cost: FVal = ZERO,
     ) -> None:
-        row = len(self.all_events_csv) + 2
         if event_type == EV_BUY:
             net_profit_or_loss = FVal(0)  # no profit by buying
-            net_profit_or_loss_csv = '0'
         elif event_type == EV_SELL:
             if taxable_amount == 0:
                 net_profit_or_loss = FVal(0)
             else:
                 net_profit_or_loss = taxable_received_in_profit_currency - taxable_bought_cost
-            net_profit_or_loss_csv = '=IF(E{}=0,0,L{}-M{})'.format(row, row, row)
         elif event_type in (EV_TX_GAS_COST, EV_ASSET_MOVE, EV_LOAN_SETTLE):
             net_profit_or_loss = paid_in_profit_currency
-            net_profit_or_loss_csv = '=-K{}'.format(row)
         elif event_type in (EV_INTEREST_PAYMENT, EV_MARGIN_CLOSE, EV_DEFI):
             net_profit_or_loss = taxable_received_in_profit_currency
-            net_profit_or_loss_csv = '=L{}'.format(row)
         else:
             raise ValueError('Illegal event type "{}" at add_to_allevents'.format(event_type))
 
-        exported_paid_asset = (
-            paid_asset if isinstance(paid_asset, str) else paid_asset.identifier
-        )
-        exported_received_asset = (
-            received_asset if isinstance(received_asset, str) else received_asset.identifier
+        event = TaxReportEvent(
+            event_type=event_type,
+            location=location,
+            paid_in_profit_currency=paid_in_profit_currency,
+            paid_asset=paid_asset if isinstance(paid_asset, str) else paid_asset.identifier,
+            paid_in_asset=paid_in_asset,
+            taxable_amount=taxable_amount,
+            taxable_bought_cost_in_profit_currency=taxable_bought_cost,
+            received_asset=(
+                received_asset if isinstance(received_asset, str) else received_asset.identifier
+            ),
+            taxable_received_in_profit_currency=taxable_received_in_profit_currency,
+            received_in_asset=received_in_asset,
+            net_profit_or_loss=net_profit_or_loss,
+            timestamp=timestamp,
+            is_virtual=is_virtual,
         )
-        entry = {
-            'type': event_type,
-            'location': str(location),
-            'paid_in_profit_currency': paid_in_profit_currency,
-            'paid_asset': exported_paid_asset,
-            'paid_in_asset': paid_in_asset,
-            'taxable_amount': taxable_amount,
-            'taxable_bought_cost_in_profit_currency': taxable_bought_cost,
-            'received_asset': exported_received_asset,
-            'taxable_received_in_profit_currency': taxable_received_in_profit_currency,
-            'received_in_asset': received_in_asset,
-            'net_profit_or_loss': net_profit_or_loss,
-            'time': timestamp,
-            'is_virtual': is_virtual,
-        }
-        log.debug('csv event', **make_sensitive(entry))
-        self.all_events.append(entry)
-        new_entry = entry.copy()
-        new_entry['net_profit_or_loss'] = net_profit_or_loss_csv
-        new_entry['time'] = timestamp_to_date(timestamp, formatstr='%d/%m/%Y %H:%M:%S')
-        new_entry[f'paid_in_{self.profit_currency.identifier}'] = paid_in_profit_currency
-        key = f'taxable_received_in_{self.profit_currency.identifier}'
-        new_entry[key] = taxable_received_in_profit_currency
-        key = f'taxable_bought_cost_in_{self.profit_currency.identifier}'
-        new_entry[key] = taxable_bought_cost
-        del new_entry['paid_in_profit_currency']
-        del new_entry['taxable_received_in_profit_currency']
-        del new_entry['taxable_bought_cost_in_profit_currency']
-        self.all_events_csv.append(new_entry)
+        log.debug('csv event', **make_sensitive(event._asdict()))
+        self.pending_events.append(event)
+        self.events_num += 1
+        if len(self.pending_events) >= TAX_REPORT_EVENTS_BATCH_SIZE:
+            self.flush_events()
+
+    def get_events(self, report_id: int) -> Iterator[TaxReportEvent]:
+        """Reads the events of a report from the DB a batch at a time"""
+        offset = 0
+        while True:
+            events, _ = self.database.get_tax_report_events(
+                report_id=report_id,
+                offset=offset,
+                limit=TAX_REPORT_EVENTS_BATCH_SIZE,
+            )
+            yield from events
+            if len(events) < TAX_REPORT_EVENTS_BATCH_SIZE:
+                break
+            offset += TAX_REPORT_EVENTS_BATCH_SIZE
+
+    def _write_all_events_csv(self, path: Path) -> None:
+        """Writes the all events CSV from the events of the latest report in the DB"""
+        report = self.database.get_latest_tax_report()
+        if report is None:
+            log.debug('Skipping writting empty CSV for {}'.format(path))
+            return
+
+        report_id, profit_currency = report
+        writer = None
+        with open(path, 'w') as f:
+            for idx, event in enumerate(self.get_events(report_id)):
+                row = _all_events_csv_row(
+                    event=event,
+                    row=idx + 2,
+                    profit_currency=profit_currency,
+                )
+                if writer is None:
+                    writer = csv.DictWriter(f, row.keys())
+                    writer.writeheader()
+                writer.writerow(row)
 
     def add_buy(
             self,
@@ -164,7 +317,7 @@ class CSVExporter():
             return
 
         exchange_rate_key = f'exchanged_asset_{self.profit_currency.identifier}_exchange_rate'
-        self.trades_csv.append({
+        self.trades_csv.write_row({
             'type': 'buy',
             'location': str(location),
             'asset': bought_asset.identifier,
@@ -225,9 +378,9 @@ class CSVExporter():
             total_fee_in_profit_currency=total_fee_in_profit_currency,
             selling_amount=selling_amount,
         )
-        row = len(self.trades_csv) + 2
+        row = self.trades_csv.next_row
         taxable_profit_formula = '=IF(H{}=0,0,L{}-K{})'.format(row, row, row)
-        self.trades_csv.append({
+        self.trades_csv.write_row({
             'type': 'sell',
             'location': str(location),
             'asset': selling_asset.identifier,
@@ -272,9 +425,9 @@ class CSVExporter():
         if not self.create_csv:
             return
 
-        row = len(self.loan_settlements_csv) + 2
+        row = self.loan_settlements_csv.next_row
         loss_formula = '=C{}*D{}+E{}'.format(row, row, row)
-        self.loan_settlements_csv.append({
+        self.loan_settlements_csv.write_row({
             'asset': asset.identifier,
             'location': str(location),
             'amount': amount,
@@ -309,7 +462,7 @@ class CSVExporter():
         if not self.create_csv:
             return
 
-        self.loan_profits_csv.append({
+        self.loan_profits_csv.write_row({
             'location': str(location),
             'open_time': timestamp_to_date(open_time, formatstr='%d/%m/%Y %H:%M:%S'),
             'close_time': timestamp_to_date(close_time, formatstr='%d/%m/%Y %H:%M:%S'),
@@ -345,7 +498,7 @@ class CSVExporter():
         # Note:  We are not getting the fee info in here but they are not needed
         # in the final CSV export.
 
-        self.margin_positions_csv.append({
+        self.margin_positions_csv.write_row({
             'name': margin_notes,
             'location': str(location),
             'time': timestamp_to_date(timestamp, formatstr='%d/%m/%Y %H:%M:%S'),
@@ -377,7 +530,7 @@ class CSVExporter():
         if not self.create_csv:
             return
 
-        self.asset_movements_csv.append({
+        self.asset_movements_csv.write_row({
             'time': timestamp_to_date(timestamp, formatstr='%d/%m/%Y %H:%M:%S'),
             'exchange': str(exchange),
             'type': str(category),
@@ -407,7 +560,7 @@ class CSVExporter():
         if not self.create_csv:
             return
 
-        self.tx_gas_costs_csv.append({
+        self.tx_gas_costs_csv.write_row({
             'time': timestamp_to_date(timestamp, formatstr='%d/%m/%Y %H:%M:%S'),
             'transaction_hash': transaction_hash.hex(),
             'eth_burned_as_gas': eth_burned_as_gas,
@@ -429,7 +582,7 @@ class CSVExporter():
         if not self.create_csv:
             return
 
-        self.defi_events_csv.append({
+        self.defi_events_csv.write_row({
             'time': timestamp_to_date(event.timestamp, formatstr='%d/%m/%Y %H:%M:%S'),
             'type': str(event.event_type),
             'asset': str(event.asset),
@@ -467,43 +620,32 @@ class CSVExporter():
         )
 
     def create_files(self, dirpath: Path) -> Tuple[bool, str]:
+        """Exports the CSV files of the latest report to the given directory
+
+        The files of the report are already written while it is processed, so they
+        are simply copied. The all events CSV is written from the events in the DB,
+        so it can be exported even if the files of the report are already deleted.
+        In that case the user is warned that only the all events CSV is exported.
+        """
         if not self.create_csv:
             return True, ''
 
+        report = self.database.get_latest_tax_report()
         try:
             dirpath.mkdir(parents=True, exist_ok=True)
-            _dict_to_csv_file(
-                dirpath / FILENAME_TRADES_CSV,
-                self.trades_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_LOAN_PROFITS_CSV,
-                self.loan_profits_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_ASSET_MOVEMENTS_CSV,
-                self.asset_movements_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_GAS_CSV,
-                self.tx_gas_costs_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_MARGIN_CSV,
-                self.margin_positions_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_LOAN_SETTLEMENTS_CSV,
-                self.loan_settlements_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_DEFI_EVENTS_CSV,
-                self.defi_events_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_ALL_CSV,
-                self.all_events_csv,
-            )
+            self.flush_events()
+            if report is not None and report[0] == self.report_id:
+                for writer in self.writers:
+                    writer.flush()
+                    if writer.path.exists():
+                        shutil.copyfile(writer.path, dirpath / writer.path.name)
+            else:
+                self.msg_aggregator.add_warning(
+                    'Only the all events CSV of the last tax report could be exported. '
+                    'The CSV files per event type are deleted on logout and on restart. '
+                    'Process the history again to export them too.',
+                )
+            self._write_all_events_csv(dirpath / FILENAME_ALL_CSV)
         except PermissionError as e:
             return False, str(e)
 
@@ -12,7 +12,7 @@ from eth_utils import is_checksum_address
 from pysqlcipher3 import dbapi2 as sqlcipher
 from typing_extensions import Literal
 
-from rotkehlchen.accounting.structures import Balance
+from rotkehlchen.accounting.structures import Balance, TaxReportEvent
 from rotkehlchen.assets.asset import Asset, EthereumToken
 from rotkehlchen.balances.manual import ManuallyTrackedBalance
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
@@ -21,9 +21,23 @@ from rotkehlchen.chain.bitcoin.xpub import (
     XpubDerivedAddressData,
     deserialize_derivation_path,
 )
-from rotkehlchen.chain.ethereum.structures import AaveEvent, YearnVault, YearnVaultEvent
+from rotkehlchen.chain.ethereum.structures import (
+    AaveEvent,
+    CompoundEvent,
+    DSRChiPoint,
+    StoredVaultEvent,
+    VaultEvent,
+    VaultEventType,
+    YearnVault,
+    YearnVaultEvent,
+)
 from rotkehlchen.constants.assets import A_USD, S_BTC, S_ETH
-from rotkehlchen.constants.ethereum import YEARN_VAULTS_PREFIX
+from rotkehlchen.constants.ethereum import (
+    COMPOUND_EVENTS_PREFIX,
+    MAKERDAO_DSR_CHI_RANGE,
+    MAKERDAO_VAULT_EVENTS_PREFIX,
+    YEARN_VAULTS_PREFIX,
+)
 from rotkehlchen.datatyping import BalancesData
 from rotkehlchen.db.schema import DB_SCRIPT_CREATE_TABLES
 from rotkehlchen.db.settings import (
@@ -60,6 +74,7 @@ from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition,
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.metrics import timed
 from rotkehlchen.premium.premium import PremiumCredentials
 from rotkehlchen.serialization.deserialize import (
     deserialize_asset_amount,
@@ -80,6 +95,7 @@ from rotkehlchen.typing import (
     BTCAddress,
     ChecksumEthAddress,
     EthereumTransaction,
+    EventType,
     ExternalService,
     ExternalServiceApiCredentials,
     HexColorCode,
@@ -622,6 +638,7 @@ class DBHandler:
         )
         return [Asset(q[0]) for q in cursor]
 
+    @timed('rotki_db_write_seconds', method='add_multiple_balances')
     def add_multiple_balances(self, balances: List[AssetBalance]) -> None:
         """Execute addition of multiple balances in the DB"""
         cursor = self.conn.cursor()
@@ -643,6 +660,7 @@ class DBHandler:
         self.conn.commit()
         self.update_last_write()
 
+    @timed('rotki_db_write_seconds', method='add_aave_events')
     def add_aave_events(self, address: ChecksumEthAddress, events: List[AaveEvent]) -> None:
         cursor = self.conn.cursor()
         for e in events:
@@ -706,6 +724,7 @@ class DBHandler:
         self.conn.commit()
         self.update_last_write()
 
+    @timed('rotki_db_write_seconds', method='add_yearn_vaults_events')
     def add_yearn_vaults_events(
             self,
             address: ChecksumEthAddress,
@@ -814,6 +833,353 @@ class DBHandler:
         self.conn.commit()
         self.update_last_write()
 
+    @timed('rotki_db_write_seconds', method='add_compound_events')
+    def add_compound_events(
+            self,
+            address: ChecksumEthAddress,
+            events: List[CompoundEvent],
+    ) -> None:
+        cursor = self.conn.cursor()
+        for e in events:
+            to_asset = to_amount = to_usd_value = None
+            if e.to_asset is not None and e.to_value is not None:
+                to_asset = e.to_asset.identifier
+                to_amount = str(e.to_value.amount)
+                to_usd_value = str(e.to_value.usd_value)
+            pnl_amount = pnl_usd_value = None
+            if e.realized_pnl:
+                pnl_amount = str(e.realized_pnl.amount)
+                pnl_usd_value = str(e.realized_pnl.usd_value)
+            event_tuple = (
+                address,
+                e.event_type,
+                e.asset.identifier,
+                str(e.value.amount),
+                str(e.value.usd_value),
+                to_asset,
+                to_amount,
+                to_usd_value,
+                pnl_amount,
+                pnl_usd_value,
+                str(e.block_number),
+                str(e.timestamp),
+                e.tx_hash,
+                e.log_index,
+            )
+            try:
+                cursor.execute(
+                    'INSERT INTO compound_events( '
+                    'address, '
+                    'event_type, '
+                    'asset, '
+                    'amount, '
+                    'usd_value, '
+                    'to_asset, '
+                    'to_amount, '
+                    'to_usd_value, '
+                    'pnl_amount, '
+                    'pnl_usd_value, '
+                    'block_number, '
+                    'timestamp, '
+                    'tx_hash, '
+                    'log_index)'
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    event_tuple,
+                )
+            except sqlcipher.IntegrityError:  # pylint: disable=no-member
+                self.msg_aggregator.add_warning(
+                    f'Tried to add a compound event that already exists in the DB. '
+                    f'Event data: {event_tuple}. Skipping...',
+                )
+
+        self.conn.commit()
+        self.update_last_write()
+
+    def get_compound_events(self, address: ChecksumEthAddress) -> List[CompoundEvent]:
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT '
+            'event_type, '
+            'asset, '
+            'amount, '
+            'usd_value, '
+            'to_asset, '
+            'to_amount, '
+            'to_usd_value, '
+            'pnl_amount, '
+            'pnl_usd_value, '
+            'block_number, '
+            'timestamp, '
+            'tx_hash, '
+            'log_index '
+            'from compound_events WHERE address=? ORDER BY timestamp ASC;',
+            (address,),
+        )
+        events = []
+        for result in query:
+            to_asset = to_value = realized_pnl = None
+            if result[4] is not None:
+                to_asset = Asset(result[4])
+                to_value = Balance(amount=FVal(result[5]), usd_value=FVal(result[6]))
+            if result[7] is not None:
+                realized_pnl = Balance(amount=FVal(result[7]), usd_value=FVal(result[8]))
+            events.append(CompoundEvent(
+                event_type=result[0],
+                address=address,
+                block_number=int(result[9]),
+                timestamp=Timestamp(int(result[10])),
+                asset=Asset(result[1]),
+                value=Balance(amount=FVal(result[2]), usd_value=FVal(result[3])),
+                to_asset=to_asset,
+                to_value=to_value,
+                realized_pnl=realized_pnl,
+                tx_hash=result[11],
+                log_index=result[12],
+            ))
+        return events
+
+    def delete_compound_data(self) -> None:
+        """Delete all historical compound event data"""
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM compound_events;')
+        cursor.execute(
+            f'DELETE FROM used_query_ranges WHERE name LIKE "{COMPOUND_EVENTS_PREFIX}%";',
+        )
+        self.conn.commit()
+        self.update_last_write()
+
+    def get_makerdao_vault_creation_ts(self, identifier: int) -> Optional[Timestamp]:
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT creation_ts FROM makerdao_vaults WHERE identifier=?;', (identifier,),
+        ).fetchall()
+        if len(query) == 0:
+            return None
+
+        return Timestamp(int(query[0][0]))
+
+    def set_makerdao_vault_creation_ts(self, identifier: int, creation_ts: Timestamp) -> None:
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'INSERT OR REPLACE INTO makerdao_vaults(identifier, creation_ts) VALUES (?, ?)',
+            (identifier, creation_ts),
+        )
+        self.conn.commit()
+        self.update_last_write()
+
+    @timed('rotki_db_write_seconds', method='add_makerdao_vault_events')
+    def add_makerdao_vault_events(self, events: List[StoredVaultEvent]) -> None:
+        cursor = self.conn.cursor()
+        for e in events:
+            event_tuple = (
+                e.identifier,
+                e.event.event_type.value,
+                str(e.raw_amount),
+                str(e.event.value.amount),
+                str(e.event.value.usd_value),
+                e.event.timestamp,
+                e.event.tx_hash,
+                e.log_index,
+            )
+            try:
+                cursor.execute(
+                    'INSERT INTO makerdao_vault_events( '
+                    'identifier, '
+                    'event_type, '
+                    'raw_amount, '
+                    'amount, '
+                    'usd_value, '
+                    'timestamp, '
+                    'tx_hash, '
+                    'log_index)'
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    event_tuple,
+                )
+            except sqlcipher.IntegrityError:  # pylint: disable=no-member
+                self.msg_aggregator.add_warning(
+                    f'Tried to add a makerdao vault event that already exists in the DB. '
+                    f'Event data: {event_tuple}. Skipping...',
+                )
+
+        self.conn.commit()
+        self.update_last_write()
+
+    def get_makerdao_vault_events(self, identifier: int) -> List[StoredVaultEvent]:
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT event_type, raw_amount, amount, usd_value, timestamp, tx_hash, log_index '
+            'FROM makerdao_vault_events WHERE identifier=? ORDER BY timestamp ASC;',
+            (identifier,),
+        )
+        events = []
+        for result in query:
+            events.append(StoredVaultEvent(
+                identifier=identifier,
+                event=VaultEvent(
+                    event_type=VaultEventType(result[0]),
+                    value=Balance(amount=FVal(result[2]), usd_value=FVal(result[3])),
+                    timestamp=Timestamp(int(result[4])),
+                    tx_hash=result[5],
+                ),
+                raw_amount=int(result[1]),
+                log_index=result[6],
+            ))
+        return events
+
+    def delete_makerdao_vault_data(self) -> None:
+        """Delete all saved makerdao vault creation timestamps and historical event data"""
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM makerdao_vaults;')
+        cursor.execute('DELETE FROM makerdao_vault_events;')
+        cursor.execute(
+            f'DELETE FROM used_query_ranges WHERE name LIKE "{MAKERDAO_VAULT_EVENTS_PREFIX}%";',
+        )
+        self.conn.commit()
+        self.update_last_write()
+
+    def add_makerdao_dsr_chi_points(self, points: List[DSRChiPoint]) -> None:
+        """Adds points to the DSR chi series. A point at an existing timestamp replaces it"""
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            'INSERT OR REPLACE INTO makerdao_dsr_chi(timestamp, chi, dsr) VALUES (?, ?, ?)',
+            [(x.timestamp, str(x.chi), str(x.dsr)) for x in points],
+        )
+        self.conn.commit()
+        self.update_last_write()
+
+    def get_makerdao_dsr_chi_points(self) -> List[DSRChiPoint]:
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT timestamp, chi, dsr FROM makerdao_dsr_chi ORDER BY timestamp ASC;',
+        )
+        return [
+            DSRChiPoint(timestamp=Timestamp(int(x[0])), chi=int(x[1]), dsr=int(x[2]))
+            for x in query
+        ]
+
+    def delete_makerdao_dsr_chi_data(self) -> None:
+        """Delete the saved DSR chi series"""
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM makerdao_dsr_chi;')
+        cursor.execute(f'DELETE FROM used_query_ranges WHERE name="{MAKERDAO_DSR_CHI_RANGE}";')
+        self.conn.commit()
+        self.update_last_write()
+
+    def add_tax_report(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            profit_currency: Asset,
+    ) -> int:
+        """Starts a new tax report run and returns its identifier
+
+        Only the events of the latest report run are kept, so all previous reports
+        are deleted.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM tax_report_events;')
+        cursor.execute('DELETE FROM tax_reports;')
+        cursor.execute(
+            'INSERT INTO tax_reports(timestamp, start_ts, end_ts, profit_currency) '
+            'VALUES (?, ?, ?, ?)',
+            (ts_now(), start_ts, end_ts, profit_currency.identifier),
+        )
+        report_id = cursor.lastrowid
+        self.conn.commit()
+        self.update_last_write()
+        return report_id
+
+    def get_latest_tax_report(self) -> Optional[Tuple[int, Asset]]:
+        """Returns the identifier and profit currency of the latest tax report, if any"""
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT identifier, profit_currency FROM tax_reports '
+            'ORDER BY identifier DESC LIMIT 1;',
+        )
+        result = query.fetchone()
+        if result is None:
+            return None
+
+        return result[0], Asset(result[1])
+
+    @timed('rotki_db_write_seconds', method='add_tax_report_events')
+    def add_tax_report_events(
+            self,
+            report_id: int,
+            start_idx: int,
+            events: List[TaxReportEvent],
+    ) -> None:
+        """Adds the events of a tax report run. The first one gets index start_idx"""
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            'INSERT INTO tax_report_events(report_id, idx, type, location, '
+            'paid_in_profit_currency, paid_asset, paid_in_asset, taxable_amount, '
+            'taxable_bought_cost_in_profit_currency, received_asset, '
+            'taxable_received_in_profit_currency, received_in_asset, net_profit_or_loss, '
+            'time, is_virtual) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [
+                (report_id, start_idx + idx) + event.serialize_for_db()
+                for idx, event in enumerate(events)
+            ],
+        )
+        self.conn.commit()
+        self.update_last_write()
+
+    def get_tax_report_events(
+            self,
+            report_id: int,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            event_type: Optional[str] = None,
+            from_ts: Optional[Timestamp] = None,
+            to_ts: Optional[Timestamp] = None,
+    ) -> Tuple[List[TaxReportEvent], int]:
+        """Returns a page of the events of a tax report in the order they were processed
+
+        Also returns the number of events that match the filters in total
+        """
+        cursor = self.conn.cursor()
+        filters = 'WHERE report_id = ? '
+        bindings: List[Any] = [report_id]
+        if event_type is not None:
+            filters += 'AND type = ? '
+            bindings.append(event_type)
+        if from_ts is not None:
+            filters += 'AND time >= ? '
+            bindings.append(from_ts)
+        if to_ts is not None:
+            filters += 'AND time <= ? '
+            bindings.append(to_ts)
+
+        query = cursor.execute(f'SELECT COUNT(*) FROM tax_report_events {filters};', bindings)
+        entries_found = query.fetchone()[0]
+        query = cursor.execute(
+            'SELECT type, location, paid_in_profit_currency, paid_asset, paid_in_asset, '
+            'taxable_amount, taxable_bought_cost_in_profit_currency, received_asset, '
+            'taxable_received_in_profit_currency, received_in_asset, net_profit_or_loss, '
+            f'time, is_virtual FROM tax_report_events {filters}'
+            'ORDER BY idx ASC LIMIT ? OFFSET ?;',
+            bindings + [-1 if limit is None else limit, offset],
+        )
+        events = [
+            TaxReportEvent(
+                event_type=EventType(result[0]),
+                location=deserialize_location_from_db(result[1]),
+                paid_in_profit_currency=FVal(result[2]),
+                paid_asset=result[3],
+                paid_in_asset=FVal(result[4]),
+                taxable_amount=FVal(result[5]),
+                taxable_bought_cost_in_profit_currency=FVal(result[6]),
+                received_asset=result[7],
+                taxable_received_in_profit_currency=FVal(result[8]),
+                received_in_asset=FVal(result[9]),
+                net_profit_or_loss=FVal(result[10]),
+                timestamp=Timestamp(result[11]),
+                is_virtual=bool(result[12]),
+            ) for result in query
+        ]
+        return events, entries_found
+
     def get_used_query_range(self, name: str) -> Optional[Tuple[Timestamp, Timestamp]]:
         """Get the last start/end timestamp range that has been queried for name
 
@@ -822,7 +1188,11 @@ class DBHandler:
         - {exchange_name}_margins
         - {exchange_name}_asset_movements
         - aave_events_{address}
+        - aave_events_{address}_{atoken}
         - yearn_vaults_events_{address}
+        - compound_events_{address}
+        - makerdao_vault_events_{identifier}
+        - makerdao_dsr_chi
         """
         cursor = self.conn.cursor()
         query = cursor.execute(
@@ -869,6 +1239,7 @@ class DBHandler:
         self.conn.commit()
         self.update_last_write()
 
+    @timed('rotki_db_write_seconds', method='update_used_query_range')
     def update_used_query_range(self, name: str, start_ts: Timestamp, end_ts: Timestamp) -> None:
         cursor = self.conn.cursor()
         cursor.execute(
@@ -892,6 +1263,7 @@ class DBHandler:
 
         return Timestamp(int(query[0][0]))
 
+    @timed('rotki_db_write_seconds', method='add_multiple_location_data')
     def add_multiple_location_data(self, location_data: List[LocationData]) -> None:
         """Execute addition of multiple location data in the DB"""
         cursor = self.conn.cursor()
@@ -1354,22 +1726,35 @@ class DBHandler:
             query: str,
             tuples: List[Tuple[Any, ...]],
             **kwargs: Any,
-    ) -> None:
+    ) -> List[Optional[Tuple[Any, ...]]]:
+        """Writes the tuples to the DB, rejecting the ones that already exist
+
+        Returns each tuple as it was written, in the order they were given, or
+        None for the tuples that were not written.
+
+        A warning is given to the user for each rejected tuple, unless expect_duplicates
+        is given as True, in which case they are only logged.
+        """
         cursor = self.conn.cursor()
+        written: List[Optional[Tuple[Any, ...]]] = list(tuples)
         try:
             cursor.executemany(query, tuples)
         except sqlcipher.IntegrityError:  # pylint: disable=no-member
             # That means that one of the tuples hit a constraint, most probably
             # already existing in the DB, in which case we resort to writing them
-            # one by one to only reject the duplicates
+            # one by one to only reject the duplicates. The tuples before it were
+            # already inserted, so roll them back to know which ones get written.
+            self.conn.rollback()
+            written = [None] * len(tuples)
 
             nonces_set: Set[int] = set()
             if tuple_type == 'ethereum_transaction':
                 nonces_set = set(range(len([t for t in tuples if t[10] == -1])))
 
-            for entry in tuples:
+            for idx, entry in enumerate(tuples):
                 try:
                     cursor.execute(query, entry)
+                    written[idx] = entry
                 except sqlcipher.IntegrityError:  # pylint: disable=no-member
                     if tuple_type == 'ethereum_transaction':
                         nonce = entry[10]
@@ -1396,6 +1781,7 @@ class DBHandler:
                             entry = tuple(entry_list)
                             try:
                                 cursor.execute(query, entry)
+                                written[idx] = entry
                                 # Success so just go to the next entry
                                 continue
                             except sqlcipher.IntegrityError:  # pylint: disable=no-member
@@ -1416,6 +1802,12 @@ class DBHandler:
                         continue
 
                     string_repr = db_tuple_to_str(entry, tuple_type)
+                    if kwargs.get('expect_duplicates', False) is True:
+                        logger.debug(
+                            f'Did not add "{string_repr}" to the DB since it already exists.',
+                        )
+                        continue
+
                     self.msg_aggregator.add_warning(
                         f'Failed to add "{string_repr}" to the DB. It already exists.',
                     )
@@ -1424,8 +1816,14 @@ class DBHandler:
 
         self.conn.commit()
         self.update_last_write()
+        return written
 
-    def add_margin_positions(self, margin_positions: List[MarginPosition]) -> None:
+    @timed('rotki_db_write_seconds', method='add_margin_positions')
+    def add_margin_positions(
+            self,
+            margin_positions: List[MarginPosition],
+            expect_duplicates: bool = False,
+    ) -> None:
         margin_tuples: List[Tuple[Any, ...]] = []
         for margin in margin_positions:
             open_time = 0 if margin.open_time is None else margin.open_time
@@ -1456,7 +1854,12 @@ class DBHandler:
               notes)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        self.write_tuples(tuple_type='margin_position', query=query, tuples=margin_tuples)
+        self.write_tuples(
+            tuple_type='margin_position',
+            query=query,
+            tuples=margin_tuples,
+            expect_duplicates=expect_duplicates,
+        )
 
     def get_margin_positions(
             self,
@@ -1520,7 +1923,12 @@ class DBHandler:
 
         return margin_positions
 
-    def add_asset_movements(self, asset_movements: List[AssetMovement]) -> None:
+    @timed('rotki_db_write_seconds', method='add_asset_movements')
+    def add_asset_movements(
+            self,
+            asset_movements: List[AssetMovement],
+            expect_duplicates: bool = False,
+    ) -> None:
         movement_tuples: List[Tuple[Any, ...]] = []
         for movement in asset_movements:
             movement_tuples.append((
@@ -1553,7 +1961,12 @@ class DBHandler:
 )
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        self.write_tuples(tuple_type='asset_movement', query=query, tuples=movement_tuples)
+        self.write_tuples(
+            tuple_type='asset_movement',
+            query=query,
+            tuples=movement_tuples,
+            expect_duplicates=expect_duplicates,
+        )
 
     def get_asset_movements(
             self,
@@ -1633,17 +2046,20 @@ class DBHandler:
         query = cursor.execute(cursorstr)
         return query.fetchone()[0]
 
+    @timed('rotki_db_write_seconds', method='add_ethereum_transactions')
     def add_ethereum_transactions(
             self,
             ethereum_transactions: List[EthereumTransaction],
             from_etherscan: bool,
-    ) -> None:
+    ) -> List[EthereumTransaction]:
         """Adds ethereum transactions to the database
 
         If from_etherscan is True then this means that the source of the transactions
         is an etherscan query. This is used to determine how we should handle the
         transactions with nonce "-1" as this is how we currently identify internal
         ethereum transactions from etherscan.
+
+        Returns the transactions that were added, with the nonce they got in the DB
         """
         tx_tuples: List[Tuple[Any, ...]] = []
         for tx in ethereum_transactions:
@@ -1676,12 +2092,16 @@ class DBHandler:
               nonce)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        self.write_tuples(
+        written = self.write_tuples(
             tuple_type='ethereum_transaction',
             query=query,
             tuples=tx_tuples,
             from_etherscan=from_etherscan,
         )
+        return [
+            tx._replace(nonce=entry[10])
+            for tx, entry in zip(ethereum_transactions, written) if entry is not None
+        ]
 
     def get_ethereum_transactions(
             self,
@@ -1747,9 +2167,13 @@ class DBHandler:
 
         cursor = self.conn.cursor()
         cursor.execute(f'DELETE FROM used_query_ranges WHERE name="ethtxs_{address}";')
-        cursor.execute(f'DELETE FROM used_query_ranges WHERE name="aave_events_{address}";')
+        cursor.execute(f'DELETE FROM used_query_ranges WHERE name LIKE "aave_events_{address}%";')
         cursor.execute('DELETE FROM ethereum_accounts_details WHERE account = ?', (address,))
         cursor.execute('DELETE FROM aave_events WHERE address = ?', (address,))
+        cursor.execute(
+            f'DELETE FROM used_query_ranges WHERE name="{COMPOUND_EVENTS_PREFIX}_{address}";',
+        )
+        cursor.execute('DELETE FROM compound_events WHERE address = ?', (address,))
         cursor.execute(
             'DELETE FROM multisettings WHERE name LIKE "queried_address_%" AND value = ?',
             (address,),
@@ -1775,7 +2199,12 @@ class DBHandler:
         self.conn.commit()
         self.update_last_write()
 
-    def add_trades(self, trades: List[Trade]) -> None:
+    @timed('rotki_db_write_seconds', method='add_trades')
+    def add_trades(
+            self,
+            trades: List[Trade],
+            expect_duplicates: bool = False,
+    ) -> None:
         trade_tuples: List[Tuple[Any, ...]] = []
         for trade in trades:
             trade_tuples.append((
@@ -1807,7 +2236,12 @@ class DBHandler:
               notes)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        self.write_tuples(tuple_type='trade', query=query, tuples=trade_tuples)
+        self.write_tuples(
+            tuple_type='trade',
+            query=query,
+            tuples=trade_tuples,
+            expect_duplicates=expect_duplicates,
+        )
 
     def edit_trade(
             self,
@@ -51,3 +51,28 @@ class DBQueryRanges():
             start_ts=min(starts),
             end_ts=max(ends),
         )
+
+    def update_used_query_subrange(
+            self,
+            location_string: str,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> None:
+        """Extends the queried range of a location with a sub-range that was fully queried
+
+        This is used to save progress while a query is still ongoing. Only one
+        range can be kept per location so a sub-range that neither overlaps nor
+        borders the already queried range is ignored. The whole range is saved
+        anyway with update_used_query_range() once the query finishes.
+        """
+        if start_ts > end_ts:
+            return
+
+        queried_range = self.db.get_used_query_range(location_string)
+        if queried_range is not None:
+            if start_ts > queried_range[1] + 1 or end_ts < queried_range[0] - 1:
+                return
+            start_ts = min(start_ts, queried_range[0])
+            end_ts = max(end_ts, queried_range[1])
+
+        self.db.update_used_query_range(name=location_string, start_ts=start_ts, end_ts=end_ts)
@@ -129,6 +129,87 @@ CREATE TABLE IF NOT EXISTS yearn_vaults_events (
 );
 """
 
+DB_CREATE_COMPOUND_EVENTS = """
+CREATE TABLE IF NOT EXISTS compound_events (
+    address VARCHAR[42] NOT NULL,
+    event_type VARCHAR[12] NOT NULL,
+    asset VARCHAR[12] NOT NULL,
+    amount TEXT NOT NULL,
+    usd_value TEXT NOT NULL,
+    to_asset VARCHAR[12],
+    to_amount TEXT,
+    to_usd_value TEXT,
+    pnl_amount TEXT,
+    pnl_usd_value TEXT,
+    block_number INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    tx_hash VARCHAR[66] NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (event_type, tx_hash, log_index)
+);
+"""
+
+DB_CREATE_MAKERDAO_VAULTS = """
+CREATE TABLE IF NOT EXISTS makerdao_vaults (
+    identifier INTEGER NOT NULL PRIMARY KEY,
+    creation_ts INTEGER NOT NULL
+);
+"""
+
+DB_CREATE_MAKERDAO_VAULT_EVENTS = """
+CREATE TABLE IF NOT EXISTS makerdao_vault_events (
+    identifier INTEGER NOT NULL,
+    event_type INTEGER NOT NULL,
+    raw_amount TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    usd_value TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    tx_hash VARCHAR[66] NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (identifier, event_type, tx_hash, log_index)
+);
+"""
+
+DB_CREATE_MAKERDAO_DSR_CHI = """
+CREATE TABLE IF NOT EXISTS makerdao_dsr_chi (
+    timestamp INTEGER NOT NULL PRIMARY KEY,
+    chi TEXT NOT NULL,
+    dsr TEXT NOT NULL
+);
+"""
+
+DB_CREATE_TAX_REPORTS = """
+CREATE TABLE IF NOT EXISTS tax_reports (
+    identifier INTEGER NOT NULL PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    profit_currency TEXT NOT NULL
+);
+"""
+
+DB_CREATE_TAX_REPORT_EVENTS = """
+CREATE TABLE IF NOT EXISTS tax_report_events (
+    report_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    location CHAR(1) NOT NULL DEFAULT('A') REFERENCES location(location),
+    paid_in_profit_currency TEXT NOT NULL,
+    paid_asset TEXT NOT NULL,
+    paid_in_asset TEXT NOT NULL,
+    taxable_amount TEXT NOT NULL,
+    taxable_bought_cost_in_profit_currency TEXT NOT NULL,
+    received_asset TEXT NOT NULL,
+    taxable_received_in_profit_currency TEXT NOT NULL,
+    received_in_asset TEXT NOT NULL,
+    net_profit_or_loss TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    is_virtual INTEGER NOT NULL,
+    FOREIGN KEY(report_id) REFERENCES tax_reports(identifier) ON DELETE CASCADE,
+    PRIMARY KEY (report_id, idx)
+);
+"""
+
 DB_CREATE_EXTERNAL_SERVICE_CREDENTIALS = """
 CREATE TABLE IF NOT EXISTS external_service_credentials (
     name VARCHAR[30] NOT NULL PRIMARY KEY,
@@ -295,7 +376,7 @@ CREATE TABLE IF NOT EXISTS settings (
 DB_SCRIPT_CREATE_TABLES = """
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
-{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}
+{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}
 COMMIT;
 PRAGMA foreign_keys=on;
 """.format(
@@ -320,6 +401,12 @@ PRAGMA foreign_keys=on;
     DB_CREATE_TAG_MAPPINGS,
     DB_CREATE_AAVE_EVENTS,
     DB_CREATE_YEARN_VAULT_EVENTS,
+    DB_CREATE_COMPOUND_EVENTS,
+    DB_CREATE_MAKERDAO_VAULTS,
+    DB_CREATE_MAKERDAO_VAULT_EVENTS,
+    DB_CREATE_MAKERDAO_DSR_CHI,
+    DB_CREATE_TAX_REPORTS,
+    DB_CREATE_TAX_REPORT_EVENTS,
     DB_CREATE_XPUBS,
     DB_CREATE_XPUB_MAPPINGS,
 )
@@ -9,6 +9,7 @@ import gevent
 import requests
 from gevent.lock import Semaphore
 
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.converters import asset_from_binance
 from rotkehlchen.constants import BINANCE_BASE_URL
 from rotkehlchen.constants.misc import ZERO
@@ -327,7 +328,7 @@ class Binance(ExchangeInterface):
             log.error(msg)
             return None, msg
 
-        returned_balances = {}
+        returned_balances: Dict[Asset, Dict[str, Any]] = {}
         for entry in account_data['balances']:
             amount = entry['free'] + entry['locked']
             if amount == FVal(0):
@@ -353,31 +354,29 @@ class Binance(ExchangeInterface):
                 )
                 continue
 
-            try:
-                usd_price = Inquirer().find_usd_price(asset)
-            except RemoteError as e:
-                self.msg_aggregator.add_error(
-                    f'Error processing binance balance entry due to inability to '
-                    f'query USD price: {str(e)}. Skipping balance entry',
-                )
-                continue
-
-            balance = {}
-            balance['amount'] = amount
-            balance['usd_value'] = FVal(amount * usd_price)
-
             if asset not in returned_balances:
-                returned_balances[asset] = balance
+                returned_balances[asset] = {'amount': amount}
             else:  # Some assets may appear twice in binance balance query for different locations
                 # Lending/staking for example
-                returned_balances[asset]['amount'] += balance['amount']
-                returned_balances[asset]['usd_value'] += balance['usd_value']
+                returned_balances[asset]['amount'] += amount
+
+        # Now that we know all the assets get their prices in one go
+        usd_prices = Inquirer().find_usd_prices(returned_balances.keys())
+        for asset in list(returned_balances.keys()):
+            if asset not in usd_prices:
+                self.msg_aggregator.add_error(
+                    f'Error processing binance balance result due to inability to '
+                    f'query USD price of {asset.identifier}. Skipping balance entry',
+                )
+                del returned_balances[asset]
 
+        for asset, balance in returned_balances.items():
+            balance['usd_value'] = FVal(balance['amount'] * usd_prices[asset])
             log.debug(
                 'binance balance query result',
                 sensitive_log=True,
                 asset=asset,
-                amount=amount,
+                amount=balance['amount'],
                 usd_value=balance['usd_value'],
             )
 
@@ -4,7 +4,7 @@ import json
 import logging
 from http import HTTPStatus
 from json.decoder import JSONDecodeError
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
 import gevent
@@ -22,7 +22,7 @@ from rotkehlchen.errors import (
     UnsupportedAsset,
 )
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade, get_pair_position_asset
-from rotkehlchen.exchanges.exchange import ExchangeInterface
+from rotkehlchen.exchanges.exchange import ExchangeInterface, HistoryPage
 from rotkehlchen.exchanges.utils import deserialize_asset_movement_address, get_key_if_has_val
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
@@ -345,52 +345,56 @@ class Bittrex(ExchangeInterface):
 
         return returned_balances, ''
 
-    def _paginated_api_query(
+    def _paginated_api_query_pages(
             self,
             endpoint: str,
             method: Literal['get', 'put', 'delete'] = 'get',
             options: Optional[Dict[str, Any]] = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Tuple[List[Dict[str, Any]], bool]]:
         """Handle pagination for bittrex v3 api queries
 
+        Yields the data of each page as soon as it arrives along with whether
+        it is the last page.
+
         Docs: https://bittrex.github.io/api/v3#topic-REST-API-Overview
         """
         if not options:
             options = {}
 
-        all_data = []
         while True:
             query_data = self.api_query(endpoint=endpoint, method=method, options=options)
             if len(query_data) == 0:  # no more data
+                yield [], True
                 break
 
-            all_data.extend(query_data)
             if len(query_data) != options['pageSize']:  # less data than page size
+                yield query_data, True
                 break
 
+            yield query_data, False
             options['nextPageToken'] = query_data[-1]['id']
 
-        return all_data
-
-    def query_online_trade_history(
+    def _paginated_api_query(
             self,
-            start_ts: Timestamp,
-            end_ts: Timestamp,
-            market: Optional[TradePair] = None,
-    ) -> List[Trade]:
-        options: Dict[str, Union[str, int]] = {
-            'pageSize': 200,  # max page size according to their docs
-            'startDate': timestamp_to_iso8601(start_ts, utc_as_z=True),
-            'endDate': timestamp_to_iso8601(end_ts, utc_as_z=True),
-        }
-        if market is not None:
-            options['marketSymbol'] = world_pair_to_bittrex(market)
+            endpoint: str,
+            method: Literal['get', 'put', 'delete'] = 'get',
+            options: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Like _paginated_api_query_pages() but returns the data of all pages together"""
+        all_data = []
+        for query_data, _ in self._paginated_api_query_pages(
+                endpoint=endpoint,
+                method=method,
+                options=options,
+        ):
+            all_data.extend(query_data)
 
-        raw_data = self._paginated_api_query(endpoint='orders/closed', options=options)
-        log.debug('bittrex order history result', results_num=len(raw_data))
+        return all_data
 
+    def _deserialize_trades(self, raw_trades: List[Dict[str, Any]]) -> List[Trade]:
+        """Turns bittrex orders to our own trade format, skipping the ones that can't be"""
         trades = []
-        for raw_trade in raw_data:
+        for raw_trade in raw_trades:
             try:
                 trade = trade_from_bittrex(raw_trade)
             except UnknownAsset as e:
@@ -430,6 +434,61 @@ class Bittrex(ExchangeInterface):
 
         return trades
 
+    def query_online_trade_history_pages(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            market: Optional[TradePair] = None,
+    ) -> Iterator[HistoryPage[Trade]]:
+        options: Dict[str, Union[str, int]] = {
+            'pageSize': 200,  # max page size according to their docs
+            'startDate': timestamp_to_iso8601(start_ts, utc_as_z=True),
+            'endDate': timestamp_to_iso8601(end_ts, utc_as_z=True),
+        }
+        if market is not None:
+            options['marketSymbol'] = world_pair_to_bittrex(market)
+
+        covered_start_ts = Timestamp(end_ts + 1)
+        for raw_trades, is_last in self._paginated_api_query_pages(
+                endpoint='orders/closed',
+                options=options,
+        ):
+            log.debug('bittrex order history page', results_num=len(raw_trades))
+            if is_last:
+                covered_start_ts = start_ts
+            else:
+                # Bittrex returns the most recently closed orders first. More orders
+                # closed at the time of the oldest order of the page may be in the
+                # next page, so that time is not covered yet.
+                for raw_trade in raw_trades:
+                    try:
+                        timestamp = deserialize_timestamp_from_date(
+                            date=raw_trade['closedAt'],
+                            formatstr='iso8601',
+                            location='bittrex',
+                        )
+                    except (DeserializationError, KeyError):
+                        continue
+                    covered_start_ts = Timestamp(min(covered_start_ts, timestamp + 1))
+
+            yield self._deserialize_trades(raw_trades), covered_start_ts, end_ts
+
+    def query_online_trade_history(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            market: Optional[TradePair] = None,
+    ) -> List[Trade]:
+        trades = []
+        for page, _, _ in self.query_online_trade_history_pages(
+                start_ts=start_ts,
+                end_ts=end_ts,
+                market=market,
+        ):
+            trades.extend(page)
+
+        return trades
+
     def _deserialize_asset_movement(self, raw_data: Dict[str, Any]) -> Optional[AssetMovement]:
         """Processes a single deposit/withdrawal from bittrex and deserializes it
 
@@ -19,7 +19,7 @@ from typing_extensions import Literal
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.converters import asset_from_coinbase
 from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.constants.timing import QUERY_RETRY_TIMES
+from rotkehlchen.constants.timing import ALL_REMOTES_TIMEOUT, QUERY_RETRY_TIMES
 from rotkehlchen.errors import (
     DeserializationError,
     RemoteError,
@@ -42,7 +42,11 @@ from rotkehlchen.serialization.deserialize import (
 )
 from rotkehlchen.typing import ApiKey, ApiSecret, Fee, Location, Timestamp, TradePair
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.interfaces import cache_response_timewise, protect_with_lock
+from rotkehlchen.utils.interfaces import (
+    QueryRateLimiter,
+    cache_response_timewise,
+    protect_with_lock,
+)
 from rotkehlchen.utils.misc import timestamp_to_iso8601, ts_now
 from rotkehlchen.utils.serialization import rlk_jsonloads_dict, rlk_jsonloads_list
 
@@ -55,6 +59,19 @@ log = RotkehlchenLogsAdapter(logger)
 
 SECS_TO_WAIT_FOR_REPORT = 300
 MINS_TO_WAIT_FOR_REPORT = SECS_TO_WAIT_FOR_REPORT / 60
+# Seconds to wait between polls of the pending reports. Doubled after every poll in
+# which no report got ready, up to the max, and reset once one does.
+MIN_SECS_BETWEEN_REPORT_POLLS = 1
+MAX_SECS_BETWEEN_REPORT_POLLS = 30
+# empty fill reports have length of 95, empty account reports 85
+# So we assume a report of more than 100 bytes has data.
+EMPTY_REPORT_MAX_LENGTH = 100
+REPORT_DOWNLOAD_CHUNK_SIZE = 65536
+
+# https://docs.pro.coinbase.com/#rate-limits
+# Private endpoints allow 5 requests per second
+COINBASEPRO_MAX_CONCURRENT_QUERIES = 5
+COINBASEPRO_MAX_QUERIES_PER_SECOND = 5
 
 
 def coinbasepro_to_worldpair(product: str) -> TradePair:
@@ -90,6 +107,14 @@ class Coinbasepro(ExchangeInterface):
         super(Coinbasepro, self).__init__('coinbasepro', api_key, secret, database)
         self.base_uri = 'https://api.pro.coinbase.com'
         self.msg_aggregator = msg_aggregator
+        self.rate_limiter = QueryRateLimiter(
+            max_concurrent=COINBASEPRO_MAX_CONCURRENT_QUERIES,
+            max_per_second=COINBASEPRO_MAX_QUERIES_PER_SECOND,
+        )
+        # Reports are downloaded from a different host so use a session that does
+        # not send the API key headers
+        self.reports_session = requests.session()
+        self.reports_session.headers.update({'User-Agent': 'rotkehlchen'})
 
         self.session.headers.update({
             'Content-Type': 'Application/JSON',
@@ -168,48 +193,54 @@ class Coinbasepro(ExchangeInterface):
         """
         request_url = f'/{endpoint}'
 
-        timestamp = str(int(time.time()))
         if options:
             stringified_options = json.dumps(options, separators=(',', ':'))
         else:
             stringified_options = ''
             options = {}
-        message = timestamp + request_method + request_url + stringified_options
         log.debug(
             'Coinbase Pro API query',
             request_method=request_method,
             request_url=request_url,
             options=options,
         )
-        if 'products' not in endpoint:
-            try:
-                signature = hmac.new(
-                    b64decode(self.secret),
-                    message.encode(),
-                    hashlib.sha256,
-                ).digest()
-            except binascii.Error:
-                raise RemoteError('Provided API Secret is invalid')
-
-            self.session.headers.update({
-                'CB-ACCESS-SIGN': b64encode(signature).decode('utf-8'),
-                'CB-ACCESS-TIMESTAMP': timestamp,
-            })
 
         retries_left = QUERY_RETRY_TIMES
+        full_url = self.base_uri + request_url
         while retries_left > 0:
-            full_url = self.base_uri + request_url
-            try:
-                response = self.session.request(
-                    request_method.lower(),
-                    full_url,
-                    data=stringified_options,
-                )
-            except requests.exceptions.ConnectionError as e:
-                raise RemoteError(
-                    f'Coinbase Pro {request_method} query at '
-                    f'{full_url} connection error: {str(e)}',
-                )
+            # Queries may run concurrently so sign each one right before it starts and
+            # give the signature only to its own request instead of the shared session
+            with self.rate_limiter.limit():
+                headers = {}
+                if 'products' not in endpoint:
+                    timestamp = str(int(time.time()))
+                    message = timestamp + request_method + request_url + stringified_options
+                    try:
+                        signature = hmac.new(
+                            b64decode(self.secret),
+                            message.encode(),
+                            hashlib.sha256,
+                        ).digest()
+                    except binascii.Error:
+                        raise RemoteError('Provided API Secret is invalid')
+
+                    headers = {
+                        'CB-ACCESS-SIGN': b64encode(signature).decode('utf-8'),
+                        'CB-ACCESS-TIMESTAMP': timestamp,
+                    }
+
+                try:
+                    response = self.session.request(
+                        request_method.lower(),
+                        full_url,
+                        data=stringified_options,
+                        headers=headers,
+                    )
+                except requests.exceptions.ConnectionError as e:
+                    raise RemoteError(
+                        f'Coinbase Pro {request_method} query at '
+                        f'{full_url} connection error: {str(e)}',
+                    )
 
             if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
                 # Backoff a bit by sleeping. Sleep more, the more retries have been made
@@ -443,6 +474,54 @@ class Coinbasepro(ExchangeInterface):
 
         return trades
 
+    def _create_report(self, options: Dict[str, Any]) -> str:
+        """Queues a report for creation at coinbase pro and returns its id
+
+        - Raises the same exceptions as _api_query()
+        - Can raise KeyError if the API does not return the expected response format.
+        """
+        post_result = self._api_query('reports', request_method='POST', options=options)
+        return post_result['id']
+
+    def _download_report(self, report_id: str, file_url: str, tempdir: str) -> Optional[str]:
+        """Streams a ready report to a file in tempdir
+
+        Returns the path of the file or None if the report has no data.
+
+        May raise:
+        - RemoteError if the report can't be downloaded
+        """
+        filepath = os.path.join(tempdir, f'report_{report_id}.csv')
+        length = 0
+        try:
+            response = self.reports_session.get(
+                file_url,
+                stream=True,
+                timeout=ALL_REMOTES_TIMEOUT,
+            )
+            try:
+                if response.status_code != HTTPStatus.OK:
+                    raise RemoteError(
+                        f'Coinbase Pro report {report_id} download responded with error '
+                        f'status code: {response.status_code}',
+                    )
+                with open(filepath, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=REPORT_DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        length += len(chunk)
+            finally:
+                response.close()
+        except requests.exceptions.RequestException as e:
+            raise RemoteError(f'Coinbase Pro report {report_id} download failed: {str(e)}')
+
+        if length > EMPTY_REPORT_MAX_LENGTH:
+            log.debug(f'Got a populated report for id: {report_id}. Wrote it to disk')
+            return filepath
+
+        log.debug(f'Got report for id: {report_id} with length {length}. Skipping it')
+        os.remove(filepath)
+        return None
+
     def _generate_reports(
             self,
             start_ts: Timestamp,
@@ -465,6 +544,9 @@ class Coinbasepro(ExchangeInterface):
         The account reports have the following data format:
         portfolio,type,time,amount,balance,amount/balance unit,transfer id,trade id,order id
 
+        All reports are requested and polled concurrently, within the API rate
+        limits, and each one is streamed to disk as soon as it is ready.
+
         Returns a list of filepaths where the reports were written.
 
         - Raises the same exceptions as _api_query()
@@ -480,7 +562,6 @@ class Coinbasepro(ExchangeInterface):
             account_or_product_ids = self._get_account_ids()
             identifier_key = 'account_id'
 
-        report_ids = []
         options = {
             'type': report_type,
             'start_date': start_date,
@@ -489,41 +570,69 @@ class Coinbasepro(ExchangeInterface):
             # The only way to disable emailing the report link is to give an invalid link
             'email': 'some@invalidemail.com',
         }
-        for identifier in account_or_product_ids:
-            options[identifier_key] = identifier
-            post_result = self._api_query('reports', request_method='POST', options=options)
-            report_ids.append(post_result['id'])
+        greenlets = [
+            gevent.spawn(self._create_report, options={**options, identifier_key: identifier})
+            for identifier in account_or_product_ids
+        ]
+        try:
+            gevent.joinall(greenlets, raise_error=True)
+        finally:
+            # If a query failed don't let the other ones keep querying coinbase pro
+            gevent.killall(greenlets)
+        report_ids = [greenlet.value for greenlet in greenlets]
 
         # At this point all reports must have been queued for creation at the server
-        # Now wait until they are ready and pull them one by one
-        report_paths = []
+        # Now poll the pending ones until they are ready and download them as they get ready
+        report_paths: List[str] = []
         last_change_ts = ts_now()
+        secs_between_polls = MIN_SECS_BETWEEN_REPORT_POLLS
         while True:
-            finished_ids_indices = []
-            for idx, report_id in enumerate(report_ids):
-                get_result = self._api_query(f'reports/{report_id}', request_method='GET')
+            greenlets = [
+                gevent.spawn(self._api_query, f'reports/{report_id}', request_method='GET')
+                for report_id in report_ids
+            ]
+            try:
+                gevent.joinall(greenlets, raise_error=True)
+            finally:
+                # If a query failed don't let the other ones keep querying coinbase pro
+                gevent.killall(greenlets)
+            ready_reports = []
+            for report_id, greenlet in zip(report_ids, greenlets):
+                get_result = greenlet.value
                 # Have to add assert here for mypy since the endpoint string is
                 # a variable string and can't be overloaded and type checked
                 assert isinstance(get_result, dict)
-                if get_result['status'] != 'ready':
-                    continue
+                if get_result['status'] == 'ready':
+                    ready_reports.append((report_id, get_result['file_url']))
+
+            if len(ready_reports) != 0:
                 # a report is ready here so let's reset the timer
                 last_change_ts = ts_now()
-                file_url = get_result['file_url']
-                response = requests.get(file_url)
-                length = len(response.content)
-                # empty fill reports have length of 95, empty account reports 85
-                # So we assume a report of more than 100 chars has data.
-                if length > 100:
-                    log.debug(f'Got a populated report for id: {report_id}. Writing it to disk')
-                    filepath = os.path.join(tempdir, f'report_{report_id}.csv')
-                    with open(filepath, 'wb') as f:
-                        f.write(response.content)
-                    report_paths.append(filepath)
-                else:
-                    log.debug(f'Got report for id: {report_id} with length {length}. Skipping it')
+                secs_between_polls = MIN_SECS_BETWEEN_REPORT_POLLS
+                greenlets = [
+                    gevent.spawn(
+                        self._download_report,
+                        report_id=report_id,
+                        file_url=file_url,
+                        tempdir=tempdir,
+                    ) for report_id, file_url in ready_reports
+                ]
+                try:
+                    gevent.joinall(greenlets, raise_error=True)
+                finally:
+                    # If a query failed don't let the other ones keep querying coinbase pro
+                    gevent.killall(greenlets)
+                report_paths.extend(
+                    greenlet.value for greenlet in greenlets if greenlet.value is not None
+                )
+                ready_ids = {report_id for report_id, _ in ready_reports}
+                report_ids = [x for x in report_ids if x not in ready_ids]
+            else:
+                secs_between_polls = min(secs_between_polls * 2, MAX_SECS_BETWEEN_REPORT_POLLS)
 
-                finished_ids_indices.append(idx)
+            # When there is no more ids to query break out of the loop
+            if len(report_ids) == 0:
+                break
 
             if ts_now() - last_change_ts > SECS_TO_WAIT_FOR_REPORT:
                 raise RemoteError(
@@ -531,14 +640,7 @@ class Coinbasepro(ExchangeInterface):
                     f' {MINS_TO_WAIT_FOR_REPORT} minutes. Bailing out.',
                 )
 
-            # Delete the report ids that have been downloaded. Note: reverse order
-            # so that we don't mess up the indices
-            for idx in reversed(finished_ids_indices):
-                del report_ids[idx]
-
-            # When there is no more ids to query break out of the loop
-            if len(report_ids) == 0:
-                break
+            gevent.sleep(secs_between_polls)
 
         return report_paths
 
@@ -1,5 +1,5 @@
 import logging
-from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Tuple, TypeVar
 
 import requests
 
@@ -7,6 +7,7 @@ from rotkehlchen.db.ranges import DBQueryRanges
 from rotkehlchen.errors import RemoteError
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.metrics import metrics
 from rotkehlchen.serialization.deserialize import deserialize_location
 from rotkehlchen.typing import ApiKey, ApiSecret, T_ApiKey, T_ApiSecret, Timestamp
 from rotkehlchen.utils.interfaces import CacheableObject, LockableQueryObject, protect_with_lock
@@ -25,6 +26,10 @@ ExchangeHistorySuccessCallback = Callable[
 
 ExchangeHistoryFailCallback = Callable[[str], None]
 
+T = TypeVar('T', Trade, MarginPosition, AssetMovement)
+# A page of history entries along with the start and end of the time range it covers
+HistoryPage = Tuple[List[T], Timestamp, Timestamp]
+
 
 class ExchangeInterface(CacheableObject, LockableQueryObject):
 
@@ -49,8 +54,30 @@ class ExchangeInterface(CacheableObject, LockableQueryObject):
         self.first_connection_made = False
         self.session = requests.session()
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
+        self.session.hooks['response'].append(self._record_response_metrics)
         log.info(f'Initialized {name} exchange')
 
+    def _record_response_metrics(
+            self,
+            response: requests.Response,
+            *args: Any,
+            **kwargs: Any,
+    ) -> None:
+        """Session response hook that records every API call made to the exchange
+
+        The recorded duration is the time until the response headers were received
+        """
+        metrics.observe(
+            'rotki_exchange_request_seconds',
+            response.elapsed.total_seconds(),
+            exchange=self.name,
+        )
+        metrics.inc(
+            'rotki_exchange_requests_total',
+            exchange=self.name,
+            status=response.status_code,
+        )
+
     def query_balances(self, **kwargs: Any) -> Tuple[Optional[dict], str]:
         """Returns the balances held in the exchange in the following format:
         {
@@ -126,52 +153,110 @@ class ExchangeInterface(CacheableObject, LockableQueryObject):
             'query_online_deposits_withdrawals should only be implemented by subclasses',
         )
 
-    @protect_with_lock()
-    def query_trade_history(
+    def query_online_trade_history_pages(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
-    ) -> List[Trade]:
-        """Queries the local DB and the remote exchange for the trade history of the user"""
-        trades = self.db.get_trades(
-            from_ts=start_ts,
-            to_ts=end_ts,
-            location=deserialize_location(self.name),
+    ) -> Iterator[HistoryPage[Trade]]:
+        """Queries the exchange's API for the trade history of the user page by page
+
+        Yields each page of trades along with the start and end of the time range
+        that this and all previous pages fully cover. Each page is saved in the DB
+        along with the covered range as soon as it is yielded, so if the query
+        is interrupted it resumes from there the next time.
+
+        By default the whole history is a single page. Exchanges whose API paginates
+        the trade history should override this.
+        """
+        yield self.query_online_trade_history(start_ts=start_ts, end_ts=end_ts), start_ts, end_ts
+
+    def query_online_margin_history_pages(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> Iterator[HistoryPage[MarginPosition]]:
+        """Like query_online_trade_history_pages() but for margin positions"""
+        yield self.query_online_margin_history(start_ts=start_ts, end_ts=end_ts), start_ts, end_ts
+
+    def query_online_deposits_withdrawals_pages(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> Iterator[HistoryPage[AssetMovement]]:
+        """Like query_online_trade_history_pages() but for asset movements"""
+        yield (
+            self.query_online_deposits_withdrawals(start_ts=start_ts, end_ts=end_ts),
+            start_ts,
+            end_ts,
         )
+
+    def _query_and_save_online_pages(
+            self,
+            location_string: str,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            query_pages: Callable[[Timestamp, Timestamp], Iterator[HistoryPage[T]]],
+            save_page: Callable[[List[T]], None],
+    ) -> None:
+        """Queries the time ranges of a location that were not queried before and
+        saves each page of results in the DB as soon as it arrives
+
+        If a previous query was interrupted, entries at the boundary of the range it
+        covered are queried again. So save_page should not warn about duplicates.
+        """
         ranges = DBQueryRanges(self.db)
         ranges_to_query = ranges.get_location_query_ranges(
-            location_string=f'{self.name}_trades',
+            location_string=location_string,
             start_ts=start_ts,
             end_ts=end_ts,
         )
-
-        new_trades = []
         for query_start_ts, query_end_ts in ranges_to_query:
-            # If we have a time frame we have not asked the exchange for trades then
+            # If we have a time frame we have not asked the exchange for then
             # go ahead and do that now
-            try:
-                new_trades.extend(self.query_online_trade_history(
-                    start_ts=query_start_ts,
-                    end_ts=query_end_ts,
-                ))
-            except NotImplementedError:
-                msg = 'query_online_trade_history should only not be implemented by bitmex'
-                assert self.name == 'bitmex', msg
-
-        # make sure to add them to the DB
-        if new_trades != []:
-            self.db.add_trades(new_trades)
+            for page, covered_start_ts, covered_end_ts in query_pages(
+                    query_start_ts,
+                    query_end_ts,
+            ):
+                if len(page) != 0:
+                    save_page(page)
+                ranges.update_used_query_subrange(
+                    location_string=location_string,
+                    start_ts=covered_start_ts,
+                    end_ts=covered_end_ts,
+                )
+
         # and also set the used queried timestamp range for the exchange
         ranges.update_used_query_range(
-            location_string=f'{self.name}_trades',
+            location_string=location_string,
             start_ts=start_ts,
             end_ts=end_ts,
             ranges_to_query=ranges_to_query,
         )
-        # finally append them to the already returned DB trades
-        trades.extend(new_trades)
 
-        return trades
+    @protect_with_lock()
+    def query_trade_history(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> List[Trade]:
+        """Queries the local DB and the remote exchange for the trade history of the user"""
+        try:
+            self._query_and_save_online_pages(
+                location_string=f'{self.name}_trades',
+                start_ts=start_ts,
+                end_ts=end_ts,
+                query_pages=self.query_online_trade_history_pages,
+                save_page=lambda trades: self.db.add_trades(trades, expect_duplicates=True),
+            )
+        except NotImplementedError:
+            msg = 'query_online_trade_history should only not be implemented by bitmex'
+            assert self.name == 'bitmex', msg
+
+        return self.db.get_trades(
+            from_ts=start_ts,
+            to_ts=end_ts,
+            location=deserialize_location(self.name),
+        )
 
     def query_margin_history(
             self,
@@ -180,41 +265,25 @@ class ExchangeInterface(CacheableObject, LockableQueryObject):
     ) -> List[MarginPosition]:
         """Queries the local DB and the remote exchange for the margin positions history of the user
         """
-        margin_positions = self.db.get_margin_positions(
+        try:
+            self._query_and_save_online_pages(
+                location_string=f'{self.name}_margins',
+                start_ts=start_ts,
+                end_ts=end_ts,
+                query_pages=self.query_online_margin_history_pages,
+                save_page=lambda margins: self.db.add_margin_positions(
+                    margins,
+                    expect_duplicates=True,
+                ),
+            )
+        except NotImplementedError:
+            pass
+
+        return self.db.get_margin_positions(
             from_ts=start_ts,
             to_ts=end_ts,
             location=self.name,
         )
-        ranges = DBQueryRanges(self.db)
-        ranges_to_query = ranges.get_location_query_ranges(
-            location_string=f'{self.name}_margins',
-            start_ts=start_ts,
-            end_ts=end_ts,
-        )
-        new_positions = []
-        for query_start_ts, query_end_ts in ranges_to_query:
-            try:
-                new_positions.extend(self.query_online_margin_history(
-                    start_ts=query_start_ts,
-                    end_ts=query_end_ts,
-                ))
-            except NotImplementedError:
-                pass
-
-        # make sure to add them to the DB
-        if new_positions != []:
-            self.db.add_margin_positions(new_positions)
-        # and also set the last queried timestamp for the exchange
-        ranges.update_used_query_range(
-            location_string=f'{self.name}_margins',
-            start_ts=start_ts,
-            end_ts=end_ts,
-            ranges_to_query=ranges_to_query,
-        )
-        # finally append them to the already returned DB margin positions
-        margin_positions.extend(new_positions)
-
-        return margin_positions
 
     @protect_with_lock()
     def query_deposits_withdrawals(
@@ -223,35 +292,21 @@ class ExchangeInterface(CacheableObject, LockableQueryObject):
             end_ts: Timestamp,
     ) -> List[AssetMovement]:
         """Queries the local DB and the exchange for the deposits/withdrawal history of the user"""
-        asset_movements = self.db.get_asset_movements(
-            from_ts=start_ts,
-            to_ts=end_ts,
-            location=self.name,
-        )
-        ranges = DBQueryRanges(self.db)
-        ranges_to_query = ranges.get_location_query_ranges(
+        self._query_and_save_online_pages(
             location_string=f'{self.name}_asset_movements',
             start_ts=start_ts,
             end_ts=end_ts,
+            query_pages=self.query_online_deposits_withdrawals_pages,
+            save_page=lambda movements: self.db.add_asset_movements(
+                movements,
+                expect_duplicates=True,
+            ),
         )
-        new_movements = []
-        for query_start_ts, query_end_ts in ranges_to_query:
-            new_movements.extend(self.query_online_deposits_withdrawals(
-                start_ts=query_start_ts,
-                end_ts=query_end_ts,
-            ))
-
-        if new_movements != []:
-            self.db.add_asset_movements(new_movements)
-        ranges.update_used_query_range(
-            location_string=f'{self.name}_asset_movements',
-            start_ts=start_ts,
-            end_ts=end_ts,
-            ranges_to_query=ranges_to_query,
+        return self.db.get_asset_movements(
+            from_ts=start_ts,
+            to_ts=end_ts,
+            location=self.name,
         )
-        asset_movements.extend(new_movements)
-
-        return asset_movements
 
     def query_history_with_callbacks(
             self,
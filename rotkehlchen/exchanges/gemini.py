@@ -3,12 +3,14 @@ import hmac
 import json
 import logging
 from base64 import b64encode
+from contextlib import nullcontext
 from http import HTTPStatus
 from json.decoder import JSONDecodeError
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union, overload
 
 import gevent
 import requests
+from gevent.lock import Semaphore
 from typing_extensions import Literal
 
 from rotkehlchen.assets.asset import Asset
@@ -37,7 +39,11 @@ from rotkehlchen.serialization.deserialize import (
 )
 from rotkehlchen.typing import ApiKey, ApiSecret, Fee, Location, Timestamp, TradePair
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.interfaces import cache_response_timewise, protect_with_lock
+from rotkehlchen.utils.interfaces import (
+    QueryRateLimiter,
+    cache_response_timewise,
+    protect_with_lock,
+)
 from rotkehlchen.utils.misc import ts_now_in_ms
 from rotkehlchen.utils.serialization import rlk_jsonloads_dict, rlk_jsonloads_list
 
@@ -48,6 +54,11 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# https://docs.gemini.com/rest-api/#rate-limits
+# Private endpoints allow 600 requests per minute and no more than 5 per second are advised
+GEMINI_MAX_CONCURRENT_QUERIES = 5
+GEMINI_MAX_QUERIES_PER_SECOND = 5
+
 
 class GeminiPermissionError(Exception):
     pass
@@ -91,6 +102,12 @@ class Gemini(ExchangeInterface):
         super(Gemini, self).__init__('gemini', api_key, secret, database)
         self.base_uri = base_uri
         self.msg_aggregator = msg_aggregator
+        self.rate_limiter = QueryRateLimiter(
+            max_concurrent=GEMINI_MAX_CONCURRENT_QUERIES,
+            max_per_second=GEMINI_MAX_QUERIES_PER_SECOND,
+        )
+        # Gemini rejects a nonce that is not bigger than the previous one of the key
+        self.nonce_lock = Semaphore()
 
         self.session.headers.update({
             'Content-Type': 'text/plain',
@@ -150,26 +167,34 @@ class Gemini(ExchangeInterface):
         v_endpoint = f'/v1/{endpoint}'
         url = f'{self.base_uri}{v_endpoint}'
         retries_left = QUERY_RETRY_TIMES
+        is_private = endpoint in ('mytrades', 'balances', 'transfers', 'roles')
         while retries_left > 0:
-            if endpoint in ('mytrades', 'balances', 'transfers', 'roles'):
-                # private endpoints
-                timestamp = str(ts_now_in_ms())
-                payload = {'request': v_endpoint, 'nonce': timestamp}
-                if options is not None:
-                    payload.update(options)
-                encoded_payload = json.dumps(payload).encode()
-                b64 = b64encode(encoded_payload)
-                signature = hmac.new(self.secret, b64, hashlib.sha384).hexdigest()
-
-                self.session.headers.update({
-                    'X-GEMINI-PAYLOAD': b64.decode(),
-                    'X-GEMINI-SIGNATURE': signature,
-                })
+            # Queries for different symbols may run concurrently. Private queries are
+            # signed and sent one at a time though, since concurrent requests can reach
+            # gemini in a different order than their nonces and get rejected.
+            nonce_lock = self.nonce_lock if is_private else nullcontext()
+            with nonce_lock, self.rate_limiter.limit():
+                headers = {}
+                if is_private:
+                    # private endpoints
+                    timestamp = str(ts_now_in_ms())
+                    payload = {'request': v_endpoint, 'nonce': timestamp}
+                    if options is not None:
+                        payload.update(options)
+                    encoded_payload = json.dumps(payload).encode()
+                    b64 = b64encode(encoded_payload)
+                    signature = hmac.new(self.secret, b64, hashlib.sha384).hexdigest()
+                    headers = {
+                        'X-GEMINI-PAYLOAD': b64.decode(),
+                        'X-GEMINI-SIGNATURE': signature,
+                    }
 
-            try:
-                response = self.session.request(method=method, url=url)
-            except requests.exceptions.ConnectionError as e:
-                raise RemoteError(f'Gemini {method} query at {url} connection error: {str(e)}')
+                try:
+                    response = self.session.request(method=method, url=url, headers=headers)
+                except requests.exceptions.ConnectionError as e:
+                    raise RemoteError(
+                        f'Gemini {method} query at {url} connection error: {str(e)}',
+                    )
 
             if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
                 # Backoff a bit by sleeping. Sleep more, the more retries have been made
@@ -407,17 +432,31 @@ class Gemini(ExchangeInterface):
             end_ts: Timestamp,
     ) -> List[Trade]:
         """Queries gemini for trades
+
+        Gemini can only be queried for trades per symbol so all symbols are
+        queried concurrently, within the API rate limits. Since every request
+        needs a bigger nonce than the previous one the requests themselves are
+        still sent one at a time.
         """
         log.debug('Query gemini trade history', start_ts=start_ts, end_ts=end_ts)
-        trades = []
-        gemini_trades = []
-        for symbol in self.symbols:
-            gemini_trades = self._get_trades_for_symbol(
+        symbols = self.symbols
+        greenlets = [
+            gevent.spawn(
+                self._get_trades_for_symbol,
                 symbol=symbol,
                 start_ts=start_ts,
                 end_ts=end_ts,
-            )
-            for entry in gemini_trades:
+            ) for symbol in symbols
+        ]
+        try:
+            gevent.joinall(greenlets, raise_error=True)
+        finally:
+            # If a symbol query failed don't let the other ones keep querying gemini
+            gevent.killall(greenlets)
+
+        trades = []
+        for symbol, greenlet in zip(symbols, greenlets):
+            for entry in greenlet.value:
                 try:
                     timestamp = deserialize_timestamp(entry['timestamp'])
                     if timestamp > end_ts:
@@ -7,7 +7,7 @@ import json
 import logging
 import time
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
 import gevent
@@ -31,7 +31,7 @@ from rotkehlchen.exchanges.data_structures import (
     get_pair_position_asset,
     trade_pair_from_assets,
 )
-from rotkehlchen.exchanges.exchange import ExchangeInterface
+from rotkehlchen.exchanges.exchange import ExchangeInterface, HistoryPage
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -561,20 +561,21 @@ class Kraken(ExchangeInterface):
 
         return balances, ''
 
-    def query_until_finished(
+    def query_until_finished_pages(
             self,
             endpoint: str,
             keyname: str,
             start_ts: Timestamp,
             end_ts: Timestamp,
             extra_dict: Optional[dict] = None,
-    ) -> List:
+    ) -> Iterator[Tuple[List, bool]]:
         """ Abstracting away the functionality of querying a kraken endpoint where
         you need to check the 'count' of the returned results and provide sufficient
         calls with enough offset to gather all the data of your query.
-        """
-        result: List = []
 
+        Yields the results of each call as soon as they arrive along with whether
+        they are the last ones.
+        """
         log.debug(
             f'Querying Kraken {endpoint} from {start_ts} to '
             f'{end_ts} with extra_dict {extra_dict}',
@@ -587,9 +588,8 @@ class Kraken(ExchangeInterface):
         )
         count = response['count']
         offset = len(response[keyname])
-        result.extend(response[keyname].values())
-
         log.debug(f'Kraken {endpoint} Query Response with count:{count}')
+        yield list(response[keyname].values()), offset >= count
 
         while offset < count:
             log.debug(
@@ -610,30 +610,43 @@ class Kraken(ExchangeInterface):
                 # If we have provided specific filtering then this is a known
                 # issue documented below, so skip the warning logging
                 # https://github.com/rotki/rotki/issues/116
-                if extra_dict:
-                    break
-                # it is possible that kraken misbehaves and either does not
-                # send us enough results or thinks it has more than it really does
-                log.warning(
-                    'Missing {} results when querying kraken endpoint {}'.format(
-                        count - offset, endpoint),
-                )
+                if not extra_dict:
+                    # it is possible that kraken misbehaves and either does not
+                    # send us enough results or thinks it has more than it really does
+                    log.warning(
+                        'Missing {} results when querying kraken endpoint {}'.format(
+                            count - offset, endpoint),
+                    )
+                yield [], True
                 break
 
-            result.extend(response[keyname].values())
-
-        return result
+            yield list(response[keyname].values()), offset >= count
 
-    def query_online_trade_history(
+    def query_until_finished(
             self,
+            endpoint: str,
+            keyname: str,
             start_ts: Timestamp,
             end_ts: Timestamp,
-    ) -> List[Trade]:
-        result = self.query_until_finished('TradesHistory', 'trades', start_ts, end_ts)
+            extra_dict: Optional[dict] = None,
+    ) -> List:
+        """Like query_until_finished_pages() but returns all the results together"""
+        result: List = []
+        for page, _ in self.query_until_finished_pages(
+                endpoint=endpoint,
+                keyname=keyname,
+                start_ts=start_ts,
+                end_ts=end_ts,
+                extra_dict=extra_dict,
+        ):
+            result.extend(page)
 
-        # And now turn it from kraken trade to our own trade format
+        return result
+
+    def _deserialize_trades(self, raw_trades: List[Dict[str, Any]]) -> List[Trade]:
+        """Turns kraken trades to our own trade format, skipping the ones that can't be"""
         trades = []
-        for raw_data in result:
+        for raw_data in raw_trades:
             try:
                 trades.append(trade_from_kraken(raw_data))
             except UnknownAsset as e:
@@ -665,6 +678,44 @@ class Kraken(ExchangeInterface):
 
         return trades
 
+    def query_online_trade_history_pages(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> Iterator[HistoryPage[Trade]]:
+        covered_start_ts = Timestamp(end_ts + 1)
+        for raw_trades, is_last in self.query_until_finished_pages(
+                endpoint='TradesHistory',
+                keyname='trades',
+                start_ts=start_ts,
+                end_ts=end_ts,
+        ):
+            if is_last:
+                covered_start_ts = start_ts
+            else:
+                # Kraken returns the newest trades first. More trades of the same time
+                # as the oldest trade of the page may be in the next page, so that
+                # time is not covered yet.
+                for raw_trade in raw_trades:
+                    try:
+                        timestamp = deserialize_timestamp_from_kraken(raw_trade['time'])
+                    except (DeserializationError, KeyError):
+                        continue
+                    covered_start_ts = Timestamp(min(covered_start_ts, timestamp + 1))
+
+            yield self._deserialize_trades(raw_trades), covered_start_ts, end_ts
+
+    def query_online_trade_history(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> List[Trade]:
+        trades = []
+        for page, _, _ in self.query_online_trade_history_pages(start_ts, end_ts):
+            trades.extend(page)
+
+        return trades
+
     def _query_endpoint_for_period(
             self,
             endpoint: str,
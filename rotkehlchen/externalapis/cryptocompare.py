@@ -24,6 +24,7 @@ from rotkehlchen.externalapis.interface import ExternalServiceWithApiKey
 from rotkehlchen.fval import FVal
 from rotkehlchen.history import PriceHistorian
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.metrics import metrics
 from rotkehlchen.typing import ExternalService, Price, Timestamp
 from rotkehlchen.utils.misc import (
     convert_to_int,
@@ -42,6 +43,8 @@ PairCacheKey = NewType('PairCacheKey', T_PairCacheKey)
 
 RATE_LIMIT_MSG = 'You are over your rate limit please upgrade your account!'
 CRYPTOCOMPARE_QUERY_RETRY_TIMES = 10
+# Maximum length of the fsyms argument of the pricemulti endpoint as per the docs
+CRYPTOCOMPARE_PRICEMULTI_FSYMS_MAX_LENGTH = 300
 CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
     Asset('TLN'): Asset('WETH'),
     Asset('BLY'): Asset('USDT'),
@@ -231,12 +234,15 @@ class Cryptocompare(ExternalServiceWithApiKey):
         tries = CRYPTOCOMPARE_QUERY_RETRY_TIMES
         while tries >= 0:
             try:
-                response = self.session.get(querystr)
+                with metrics.timer('rotki_cryptocompare_request_seconds'):
+                    response = self.session.get(querystr)
             except requests.exceptions.ConnectionError as e:
                 raise RemoteError(f'Cryptocompare API request failed due to {str(e)}')
 
             try:
-                json_ret = rlk_jsonloads_dict(response.text)
+                # All numeric values cryptocompare returns are json numbers so there
+                # is no need to try and decode every string of the response
+                json_ret = rlk_jsonloads_dict(response.text, numeric_keys=frozenset())
             except JSONDecodeError:
                 raise RemoteError(f'Cryptocompare returned invalid JSON response: {response.text}')
 
@@ -248,6 +254,7 @@ class Cryptocompare(ExternalServiceWithApiKey):
                             f'Got rate limited by cryptocompare. '
                             f'Backing off for {backoff_seconds}',
                         )
+                        metrics.inc('rotki_cryptocompare_backoff_seconds_total', backoff_seconds)
                         gevent.sleep(backoff_seconds)
                         tries -= 1
                         continue
@@ -420,6 +427,81 @@ class Cryptocompare(ExternalServiceWithApiKey):
         result = self._api_query(path=query_path)
         return result
 
+    def query_endpoint_pricemulti(
+            self,
+            from_assets: Iterable[Asset],
+            to_asset: Asset,
+    ) -> Dict[Asset, Optional[Price]]:
+        """Returns the current price of multiple assets compared to another asset
+
+        The assets are queried in as few requests as possible, with each request's
+        fsyms argument staying within the limits of cryptocompare. Assets that need
+        special handling are queried on their own. Assets that are not known to
+        cryptocompare or for which no price was returned are missing from the result.
+
+        A failed request does not affect the others. The assets whose request failed
+        map to None so that the caller can retry them.
+
+        - May raise PriceQueryUnsupportedAsset if to_asset is not known to cryptocompare
+        """
+        try:
+            cc_to_asset_symbol = to_asset.to_cryptocompare()
+        except UnsupportedAsset as e:
+            raise PriceQueryUnsupportedAsset(e.asset_name)
+
+        result: Dict[Asset, Optional[Price]] = {}
+        # Multiple assets may map to the same cryptocompare symbol
+        symbol_to_assets: Dict[str, List[Asset]] = {}
+        for asset in from_assets:
+            if asset in CRYPTOCOMPARE_SPECIAL_CASES or to_asset in CRYPTOCOMPARE_SPECIAL_CASES:
+                try:
+                    price_result = self.query_endpoint_price(from_asset=asset, to_asset=to_asset)
+                except PriceQueryUnsupportedAsset:
+                    continue
+                except RemoteError as e:
+                    log.error(f'Cryptocompare price query for {asset} failed due to {str(e)}')
+                    result[asset] = None
+                    continue
+                if to_asset.identifier in price_result:
+                    result[asset] = Price(FVal(price_result[to_asset.identifier]))
+                continue
+
+            try:
+                cc_symbol = asset.to_cryptocompare()
+            except UnsupportedAsset:
+                continue
+            symbol_to_assets.setdefault(cc_symbol, []).append(asset)
+
+        chunks: List[List[str]] = []
+        chunk_length = CRYPTOCOMPARE_PRICEMULTI_FSYMS_MAX_LENGTH
+        for cc_symbol in symbol_to_assets:
+            # +1 for the comma separating the symbols
+            if chunk_length + len(cc_symbol) + 1 > CRYPTOCOMPARE_PRICEMULTI_FSYMS_MAX_LENGTH:
+                chunks.append([])
+                chunk_length = 0
+            chunks[-1].append(cc_symbol)
+            chunk_length += len(cc_symbol) + 1
+
+        for chunk in chunks:
+            query_path = f'pricemulti?fsyms={",".join(chunk)}&tsyms={cc_to_asset_symbol}'
+            try:
+                chunk_result = self._api_query(path=query_path)
+            except RemoteError as e:
+                log.error(f'Cryptocompare pricemulti query for {chunk} failed due to {str(e)}')
+                for cc_symbol in chunk:
+                    for asset in symbol_to_assets[cc_symbol]:
+                        result[asset] = None
+                continue
+
+            for cc_symbol, prices in chunk_result.items():
+                if cc_symbol not in symbol_to_assets or cc_to_asset_symbol not in prices:
+                    continue
+                price = Price(FVal(prices[cc_to_asset_symbol]))
+                for asset in symbol_to_assets[cc_symbol]:
+                    result[asset] = price
+
+        return result
+
     def query_endpoint_pricehistorical(
             self,
             from_asset: Asset,
@@ -799,7 +881,8 @@ class Cryptocompare(ExternalServiceWithApiKey):
             log.info('Found cryptocompare coinlist cache', path=coinlist_cache_path)
             with open(coinlist_cache_path, 'r') as f:
                 try:
-                    data = rlk_jsonloads_dict(f.read())
+                    # decode it like a fresh query so the coin fields keep their types
+                    data = rlk_jsonloads_dict(f.read(), numeric_keys=frozenset())
                     now = ts_now()
                     invalidate_cache = False
 
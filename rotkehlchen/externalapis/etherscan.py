@@ -1,6 +1,6 @@
 import logging
 from json.decoder import JSONDecodeError
-from typing import Any, Dict, List, Optional, Union, overload
+from typing import Any, Dict, Iterator, List, Optional, Union, overload
 
 import gevent
 import requests
@@ -13,13 +13,23 @@ from rotkehlchen.errors import ConversionError, DeserializationError, RemoteErro
 from rotkehlchen.externalapis.interface import ExternalServiceWithApiKey
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.metrics import metrics
 from rotkehlchen.serialization.deserialize import deserialize_timestamp
 from rotkehlchen.typing import ChecksumEthAddress, EthereumTransaction, ExternalService, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.interfaces import QueryRateLimiter
 from rotkehlchen.utils.misc import convert_to_int, hex_or_bytes_to_int, hexstring_to_bytes
 from rotkehlchen.utils.serialization import rlk_jsonloads_dict
 
 ETHERSCAN_TX_QUERY_LIMIT = 10000
+# Maximum number of etherscan requests in flight at the same time and started per
+# second, shared by all the queries. Etherscan allows 5 requests per second.
+ETHERSCAN_MAX_CONCURRENT_QUERIES = 5
+ETHERSCAN_MAX_QUERIES_PER_SECOND = 5
+# Only the top level status and result of etherscan responses need numeric decoding.
+# Everything else is hashes, addresses and hex or decimal strings that the
+# deserialization functions take care of.
+ETHERSCAN_NUMERIC_KEYS = frozenset(('status', 'result'))
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -87,6 +97,10 @@ class Etherscan(ExternalServiceWithApiKey):
         self.session = requests.session()
         self.warning_given = False
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
+        self.rate_limiter = QueryRateLimiter(
+            max_concurrent=ETHERSCAN_MAX_CONCURRENT_QUERIES,
+            max_per_second=ETHERSCAN_MAX_QUERIES_PER_SECOND,
+        )
 
     @overload  # noqa: F811
     def _query(  # pylint: disable=no-self-use
@@ -172,13 +186,20 @@ class Etherscan(ExternalServiceWithApiKey):
         backoff_limit = 33
         while backoff < backoff_limit:
             try:
-                response = self.session.get(query_str)
+                with self.rate_limiter.limit():
+                    with metrics.timer('rotki_etherscan_request_seconds', action=action):
+                        response = self.session.get(query_str)
             except requests.exceptions.ConnectionError as e:
                 if 'Max retries exceeded with url' in str(e):
                     log.debug(
                         f'Got max retries exceeded from etherscan. Will '
                         f'backoff for {backoff} seconds.',
                     )
+                    metrics.inc(
+                        'rotki_etherscan_backoff_seconds_total',
+                        backoff,
+                        reason='max_retries',
+                    )
                     gevent.sleep(backoff)
                     backoff = backoff * 2
                     if backoff >= backoff_limit:
@@ -198,7 +219,7 @@ class Etherscan(ExternalServiceWithApiKey):
                 )
 
             try:
-                json_ret = rlk_jsonloads_dict(response.text)
+                json_ret = rlk_jsonloads_dict(response.text, numeric_keys=ETHERSCAN_NUMERIC_KEYS)
             except JSONDecodeError:
                 raise RemoteError(f'Etherscan returned invalid JSON response: {response.text}')
 
@@ -219,6 +240,11 @@ class Etherscan(ExternalServiceWithApiKey):
                             f'Got response: {response.text} from etherscan. Will '
                             f'backoff for {backoff} seconds.',
                         )
+                        metrics.inc(
+                            'rotki_etherscan_backoff_seconds_total',
+                            backoff,
+                            reason='rate_limit',
+                        )
                         gevent.sleep(backoff)
                         # Continue increasing backoff until limit is reached.
                         # If limit is reached then keep sleeping with the limit.
@@ -287,8 +313,13 @@ class Etherscan(ExternalServiceWithApiKey):
             internal: bool,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
-    ) -> List[EthereumTransaction]:
-        """Gets a list of transactions (either normal or internal) for account.
+    ) -> Iterator[List[EthereumTransaction]]:
+        """Gets the transactions (either normal or internal) of account a page at a time
+
+        Etherscan returns at most ETHERSCAN_TX_QUERY_LIMIT transactions per query. When
+        a page is full the next one is queried starting from its last block. All the
+        transactions of that last block are left for the next page so that no
+        transaction is returned twice.
 
         May raise:
         - RemoteError due to self._query(). Also if the returned result
@@ -303,9 +334,23 @@ class Etherscan(ExternalServiceWithApiKey):
             options['endBlock'] = str(to_block)
         action: Literal['txlistinternal', 'txlist'] = 'txlistinternal' if internal else 'txlist'
 
-        transactions = []
         while True:
             result = self._query(module='account', action=action, options=options)
+            next_start_block = None
+            if len(result) == ETHERSCAN_TX_QUERY_LIMIT:
+                last_block = int(result[-1]['blockNumber'])
+                if int(result[0]['blockNumber']) == last_block:
+                    # Can't split a page of a single block. Move on to the next block
+                    log.warning(
+                        f'Etherscan returned a full page of transactions for {account} '
+                        f'in block {last_block}. Some of them may be missing',
+                    )
+                    next_start_block = last_block + 1
+                else:
+                    result = [x for x in result if int(x['blockNumber']) != last_block]
+                    next_start_block = last_block
+
+            transactions = []
             for entry in result:
                 try:
                     tx = deserialize_transaction_from_etherscan(data=entry, internal=internal)
@@ -315,16 +360,10 @@ class Etherscan(ExternalServiceWithApiKey):
 
                 transactions.append(tx)
 
-            if len(result) != ETHERSCAN_TX_QUERY_LIMIT:
+            yield transactions
+            if next_start_block is None:
                 break
-            # else we hit the limit. Query once more with startBlock being the last
-            # block we got. There may be duplicate entries if there are more than one
-            # transactions for that last block but they should be filtered
-            # out when we input all of these in the DB
-            last_block = result[-1]['blockNumber']
-            options['startBlock'] = last_block
-
-        return transactions
+            options['startBlock'] = str(next_start_block)
 
     def get_latest_block_number(self) -> int:
         """Gets the latest block number
@@ -417,20 +456,40 @@ class Etherscan(ExternalServiceWithApiKey):
     def get_logs(
             self,
             contract_address: ChecksumEthAddress,
-            topics: List[str],
+            topics: List[Union[None, str, List[str]]],
             from_block: int,
             to_block: Union[int, str] = 'latest',
     ) -> List[Dict[str, Any]]:
         """Performs the etherscan style of eth_getLogs as explained here:
         https://etherscan.io/apis#logs
 
+        A topic can also be a list of values to match any of them, as in eth_getLogs.
+        Etherscan can't OR values of the same topic so for those one query per value
+        is made and the results are merged.
+
         May raise:
         - RemoteError if there are any problems with reaching Etherscan or if
         an unexpected response is returned
         """
+        for idx, topic in enumerate(topics):
+            if not isinstance(topic, list):
+                continue
+
+            result = []
+            for value in dict.fromkeys(topic):  # deduplicate keeping the order
+                value_topics = list(topics)
+                value_topics[idx] = value
+                result.extend(self.get_logs(
+                    contract_address=contract_address,
+                    topics=value_topics,
+                    from_block=from_block,
+                    to_block=to_block,
+                ))
+            return result
+
         options = {'fromBlock': from_block, 'toBlock': to_block, 'address': contract_address}
         for idx, topic in enumerate(topics):
-            if topic is not None:
+            if isinstance(topic, str):  # lists of values were split in queries above
                 options[f'topic{idx}'] = topic
                 options[f'topic{idx}_{idx + 1}opr'] = 'and'
 
@@ -4,11 +4,23 @@ from typing import Any, Callable, List, Optional
 
 import gevent
 
+from rotkehlchen.fval import FVal
 from rotkehlchen.user_messages import MessagesAggregator
 
 log = logging.getLogger(__name__)
 
 
+def set_current_task_progress(progress: FVal) -> None:
+    """Sets the progress percentage of the API async task running in the current greenlet
+
+    Long running commands can call this to let the API consumer know how far along
+    they are. If the code is not running inside an async task this is a no-op.
+    """
+    task = getattr(gevent.getcurrent(), 'async_task', None)
+    if task is not None:
+        task.progress = progress
+
+
 class GreenletManager():
     """A class to collect and manage greenlets spawned by various sources"""
 
@@ -0,0 +1,156 @@
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants.assets import A_USD
+from rotkehlchen.errors import NoPriceForGivenTimestamp, SystemPermissionError
+from rotkehlchen.fval import FVal
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.typing import Price, Timestamp
+from rotkehlchen.utils.misc import timestamp_to_date
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+DB_CREATE_PRICE_HISTORY = """
+CREATE TABLE IF NOT EXISTS price_history (
+    from_asset TEXT NOT NULL,
+    to_asset TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    price TEXT NOT NULL,
+    PRIMARY KEY(from_asset, to_asset, timestamp)
+);
+"""
+
+
+class OfflinePriceOracle():
+    """A historical price oracle backed by a local SQLite file
+
+    The file holds price series per asset pair. They can be synthetic or
+    recorded from the online oracles beforehand, so that historical prices can
+    be queried without any network access. The price of a pair at a given time
+    is the last price of its series at or before that time.
+
+    Prices are public data so unlike the user DB the file is not encrypted.
+    """
+
+    def __init__(self, path: Path, read_only: bool = False) -> None:
+        """Opens the price file at path
+
+        A read only oracle only opens an existing price file. Otherwise the file
+        is created if it does not exist.
+
+        May raise:
+        - SystemPermissionError if a read only oracle's file can't be opened or is
+        not a price file
+        """
+        self.path = path
+        if not read_only:
+            self.conn = sqlite3.connect(str(path))
+            self.conn.executescript(DB_CREATE_PRICE_HISTORY)
+            self.conn.commit()
+            return
+
+        try:
+            self.conn = sqlite3.connect(f'{path.resolve().as_uri()}?mode=ro', uri=True)
+            self.conn.execute('SELECT COUNT(*) FROM price_history').fetchone()
+        except sqlite3.Error as e:
+            raise SystemPermissionError(
+                f'Could not read historical prices from {path}: {str(e)}',
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def add_prices(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            prices: Iterable[Tuple[Timestamp, Price]],
+    ) -> None:
+        """Adds the given (timestamp, price) entries to the series of a pair
+
+        Entries for an already existing timestamp replace the old price.
+        """
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO price_history('
+            'from_asset, to_asset, timestamp, price) VALUES (?, ?, ?, ?)',
+            (
+                (from_asset.identifier, to_asset.identifier, timestamp, str(price))
+                for timestamp, price in prices
+            ),
+        )
+        self.conn.commit()
+
+    def _query_pair(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamp: Timestamp,
+    ) -> Optional[Price]:
+        """Returns the price of the pair at timestamp from its own or its inverse series"""
+        cursor = self.conn.cursor()
+        for from_id, to_id, inverse in (
+                (from_asset.identifier, to_asset.identifier, False),
+                (to_asset.identifier, from_asset.identifier, True),
+        ):
+            result = cursor.execute(
+                'SELECT price FROM price_history WHERE from_asset=? AND to_asset=? '
+                'AND timestamp <= ? ORDER BY timestamp DESC LIMIT 1',
+                (from_id, to_id, timestamp),
+            ).fetchone()
+            if result is None:
+                continue
+
+            price = FVal(result[0])
+            if not inverse:
+                return Price(price)
+            if price != FVal(0):
+                return Price(FVal(1) / price)
+
+        return None
+
+    def query_historical_price(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamp: Timestamp,
+    ) -> Price:
+        """Query the price of `from_asset` in `to_asset` at `timestamp` from the local file
+
+        If there is no series for the pair the price is derived from the USD
+        prices of both assets.
+
+        May raise:
+        - NoPriceForGivenTimestamp if the file has no price for the pair at that time
+        """
+        if from_asset == to_asset:
+            return Price(FVal(1))
+
+        price = self._query_pair(from_asset, to_asset, timestamp)
+        if price is not None:
+            return price
+
+        if A_USD not in (from_asset, to_asset):
+            from_usd_price = self._query_pair(from_asset, A_USD, timestamp)
+            to_usd_price = self._query_pair(to_asset, A_USD, timestamp)
+            if (
+                    from_usd_price is not None and
+                    to_usd_price is not None and
+                    to_usd_price != FVal(0)
+            ):
+                return Price(from_usd_price / to_usd_price)
+
+        log.debug(
+            'No offline historical price found',
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=timestamp,
+        )
+        raise NoPriceForGivenTimestamp(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            date=timestamp_to_date(timestamp, formatstr='%d/%m/%Y, %H:%M:%S'),
+        )
@@ -9,12 +9,14 @@ from rotkehlchen.errors import NoPriceForGivenTimestamp, RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.metrics import timed
 from rotkehlchen.typing import Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import create_timestamp
 
 if TYPE_CHECKING:
     from rotkehlchen.externalapis.cryptocompare import Cryptocompare
+    from rotkehlchen.history.offline import OfflinePriceOracle
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -68,12 +70,14 @@ class PriceHistorian():
     __instance: Optional['PriceHistorian'] = None
     _historical_data_start: Timestamp
     _cryptocompare: 'Cryptocompare'
+    _offline_oracle: Optional['OfflinePriceOracle']
 
     def __new__(
             cls,
             data_directory: Path = None,
             history_date_start: str = None,
             cryptocompare: 'Cryptocompare' = None,
+            offline_oracle: Optional['OfflinePriceOracle'] = None,
     ) -> 'PriceHistorian':
         if PriceHistorian.__instance is not None:
             return PriceHistorian.__instance
@@ -89,10 +93,12 @@ class PriceHistorian():
             formatstr="%d/%m/%Y",
         )
         PriceHistorian._cryptocompare = cryptocompare
+        PriceHistorian._offline_oracle = offline_oracle
 
         return PriceHistorian.__instance
 
     @staticmethod
+    @timed('rotki_historical_price_query_seconds')
     def query_historical_price(from_asset: Asset, to_asset: Asset, timestamp: Timestamp) -> Price:
         """
         Query the historical price on `timestamp` for `from_asset` in `to_asset`.
@@ -105,10 +111,12 @@ class PriceHistorian():
                       know the price.
             timestamp: The timestamp at which to query the price
 
+        If an offline price oracle is used the price is queried only from it.
+
         May raise:
         - PriceQueryUnsupportedAsset if from/to asset is missing from price oracles
         - NoPriceForGivenTimestamp if we can't find a price for the asset in the given
-        timestamp from the external service.
+        timestamp from the external service or the offline price oracle.
         - RemoteError if there is a problem reaching the price oracle server
         or with reading the response returned by the server
         """
@@ -122,6 +130,14 @@ class PriceHistorian():
         if from_asset == to_asset:
             return Price(FVal('1'))
 
+        instance = PriceHistorian()
+        if instance._offline_oracle is not None:
+            return instance._offline_oracle.query_historical_price(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                timestamp=timestamp,
+            )
+
         if from_asset.is_fiat() and to_asset.is_fiat():
             # if we are querying historical forex data then try something other than cryptocompare
             price = Inquirer().query_historical_fiat_exchange_rates(
@@ -133,7 +149,6 @@ class PriceHistorian():
                 return price
             # else cryptocompare also has historical fiat to fiat data
 
-        instance = PriceHistorian()
         return instance._cryptocompare.query_historical_price(
             from_asset=from_asset,
             to_asset=to_asset,
@@ -3,7 +3,7 @@ from __future__ import unicode_literals  # isort:skip
 import logging
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, Iterable, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, NamedTuple, Optional
 
 import requests
 
@@ -37,6 +37,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# For how long in seconds a queried current usd price is cached
+CURRENT_PRICE_CACHE_SECS = 300
+
 SPECIAL_SYMBOLS = (
     'yyDAI+yUSDC+yUSDT+yBUSD',
     'yyDAI+yUSDC+yUSDT+yTUSD',
@@ -113,9 +116,15 @@ def _query_exchanges_rateapi(base: Asset, quote: Asset) -> Optional[Price]:
         return None
 
 
+class CachedPriceEntry(NamedTuple):
+    price: Price
+    time: Timestamp
+
+
 class Inquirer():
     __instance: Optional['Inquirer'] = None
     _cached_forex_data: Dict
+    _cached_current_price: Dict[Asset, CachedPriceEntry]
     _data_directory: Path
     _cryptocompare: 'Cryptocompare'
     _ethereum: Optional['EthereumManager'] = None
@@ -135,6 +144,7 @@ class Inquirer():
 
         Inquirer.__instance._data_directory = data_dir
         Inquirer._cryptocompare = cryptocompare
+        Inquirer.__instance._cached_current_price = {}
         filename = data_dir / 'price_history_forex.json'
         try:
             with open(filename, 'r') as f:
@@ -151,28 +161,56 @@ class Inquirer():
         Inquirer()._ethereum = ethereum
 
     @staticmethod
-    def find_usd_price(asset: Asset) -> Price:
+    def _get_cached_current_price(asset: Asset, now: Timestamp) -> Optional[Price]:
+        cache = Inquirer()._cached_current_price.get(asset, None)
+        if cache is None or now - cache.time > CURRENT_PRICE_CACHE_SECS:
+            return None
+
+        return cache.price
+
+    @staticmethod
+    def _cache_current_price(asset: Asset, price: Price, now: Timestamp) -> None:
+        Inquirer()._cached_current_price[asset] = CachedPriceEntry(price=price, time=now)
+
+    @staticmethod
+    def _find_special_symbol_usd_price(asset: Asset) -> Price:
+        ethereum = Inquirer()._ethereum
+        assert ethereum, 'Inquirer should never be called before the injection of ethereum'
+        underlying_asset_price = get_underlying_asset_price(asset.identifier)
+        usd_price = handle_defi_price_query(
+            ethereum=ethereum,
+            token_symbol=asset.identifier,
+            underlying_asset_price=underlying_asset_price,
+        )
+        if usd_price is None:
+            return Price(ZERO)
+
+        return Price(usd_price)
+
+    @staticmethod
+    def find_usd_price(asset: Asset, ignore_cache: bool = False) -> Price:
         """Returns the current USD price of the asset
 
+        Prices are cached for CURRENT_PRICE_CACHE_SECS unless ignore_cache is True.
+        Prefer find_usd_prices() when the prices of many assets are needed.
+
         May raise:
         - RemoteError if the cryptocompare query has a problem
         """
-        if asset.identifier in SPECIAL_SYMBOLS:
-            ethereum = Inquirer()._ethereum
-            assert ethereum, 'Inquirer should never be called before the injection of ethereum'
-            underlying_asset_price = get_underlying_asset_price(asset.identifier)
-            usd_price = handle_defi_price_query(
-                ethereum=ethereum,
-                token_symbol=asset.identifier,
-                underlying_asset_price=underlying_asset_price,
-            )
-            if usd_price is None:
-                return Price(ZERO)
+        instance = Inquirer()
+        now = ts_now()
+        if not ignore_cache:
+            cached_price = instance._get_cached_current_price(asset, now)
+            if cached_price is not None:
+                return cached_price
 
-            return Price(usd_price)
+        if asset.identifier in SPECIAL_SYMBOLS:
+            price = instance._find_special_symbol_usd_price(asset)
+            instance._cache_current_price(asset, price, now)
+            return price
 
         try:
-            result = Inquirer()._cryptocompare.query_endpoint_price(
+            result = instance._cryptocompare.query_endpoint_price(
                 from_asset=asset,
                 to_asset=A_USD,
             )
@@ -188,8 +226,73 @@ class Inquirer():
 
         price = Price(FVal(result['USD']))
         log.debug('Got usd price from cryptocompare', asset=asset, price=price)
+        instance._cache_current_price(asset, price, now)
         return price
 
+    @staticmethod
+    def find_usd_prices(
+            assets: Iterable[Asset],
+            ignore_cache: bool = False,
+    ) -> Dict[Asset, Price]:
+        """Returns the current USD prices of all the given assets
+
+        Prices found in the cache are used unless ignore_cache is True. All the
+        rest are queried from cryptocompare in bulk. Assets that cryptocompare
+        returns no price for get a price of zero, just like in find_usd_price().
+
+        If part of the bulk query fails, only its assets are queried again one by
+        one. Assets whose query fails then too are missing from the result, so
+        callers have to handle them.
+        """
+        instance = Inquirer()
+        now = ts_now()
+        result: Dict[Asset, Price] = {}
+        to_query = []
+        # Assets that are either special symbols or whose bulk query failed
+        query_one_by_one = []
+        for asset in dict.fromkeys(assets):  # dedup keeping the order
+            if not ignore_cache:
+                cached_price = instance._get_cached_current_price(asset, now)
+                if cached_price is not None:
+                    result[asset] = cached_price
+                    continue
+
+            if asset.identifier in SPECIAL_SYMBOLS:
+                query_one_by_one.append(asset)
+            else:
+                to_query.append(asset)
+
+        if len(to_query) != 0:
+            log.debug('Querying cryptocompare for multiple usd prices', assets_num=len(to_query))
+            try:
+                prices = instance._cryptocompare.query_endpoint_pricemulti(
+                    from_assets=to_query,
+                    to_asset=A_USD,
+                )
+            except PriceQueryUnsupportedAsset:
+                prices = {}  # Can't happen for USD
+            for asset in to_query:
+                if asset not in prices:
+                    log.error('Cryptocompare usd price query failed', asset=asset)
+                    result[asset] = Price(ZERO)
+                    continue
+
+                price = prices[asset]
+                if price is None:  # the query of this asset failed
+                    query_one_by_one.append(asset)
+                    continue
+
+                instance._cache_current_price(asset, price, now)
+                result[asset] = price
+
+        for asset in query_one_by_one:
+            try:
+                result[asset] = instance.find_usd_price(asset, ignore_cache=ignore_cache)
+            except RemoteError as e:
+                log.error(f'Could not query the usd price of {asset} due to {str(e)}')
+
+        return result
+
     @staticmethod
     def get_fiat_usd_exchange_rates(
             currencies: Optional[Iterable[Asset]] = None,
@@ -0,0 +1,169 @@
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, cast
+
+T = TypeVar('T', bound=Callable[..., Any])
+
+LabelsKey = Tuple[Tuple[str, str], ...]
+
+# Upper bounds in seconds of the histogram buckets. Same as the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels_key(labels: Dict[str, Any]) -> LabelsKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: LabelsKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels)
+    if extra is not None:
+        pairs.append(extra)
+    if len(pairs) == 0:
+        return ''
+
+    formatted = []
+    for name, value in pairs:
+        value = value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        formatted.append(f'{name}="{value}"')
+    return '{' + ','.join(formatted) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Histogram():
+    __slots__ = ('bucket_counts', 'sum', 'count')
+
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * len(DEFAULT_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for idx, upper_bound in enumerate(DEFAULT_BUCKETS):
+            if value <= upper_bound:
+                self.bucket_counts[idx] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class _Timer():
+    """Context manager that observes the seconds spent inside it in a histogram"""
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: Dict[str, Any]) -> None:
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NoopTimer():
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopTimer':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class MetricsRegistry():
+    """Keeps counters and timing histograms of the hot paths of the application
+
+    Collection is disabled by default and then every call returns right away
+    without recording anything, so that instrumented code pays almost nothing.
+
+    All updates happen without yielding to other greenlets so no locking is needed.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.counters: Dict[str, Dict[LabelsKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelsKey, Histogram]] = {}
+
+    def reset(self) -> None:
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Increases the counter with the given name and labels by value"""
+        if not self.enabled:
+            return
+
+        series = self.counters.setdefault(name, {})
+        key = _labels_key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Records a value in the histogram with the given name and labels"""
+        if not self.enabled:
+            return
+
+        series = self.histograms.setdefault(name, {})
+        key = _labels_key(labels)
+        histogram = series.get(key, None)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    def timer(self, name: str, **labels: Any) -> Any:
+        """Returns a context manager that records its duration in seconds in a histogram"""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Timer(self, name, labels)
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for name, counter_series in sorted(self.counters.items()):
+            lines.append(f'# TYPE {name} counter')
+            for key, value in sorted(counter_series.items()):
+                lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+
+        for name, histogram_series in sorted(self.histograms.items()):
+            lines.append(f'# TYPE {name} histogram')
+            for key, histogram in sorted(histogram_series.items()):
+                cumulative_count = 0
+                for upper_bound, count in zip(DEFAULT_BUCKETS, histogram.bucket_counts):
+                    cumulative_count += count
+                    labels = _format_labels(key, ('le', str(upper_bound)))
+                    lines.append(f'{name}_bucket{labels} {cumulative_count}')
+                labels = _format_labels(key, ('le', '+Inf'))
+                lines.append(f'{name}_bucket{labels} {histogram.count}')
+                lines.append(f'{name}_sum{_format_labels(key)} {repr(histogram.sum)}')
+                lines.append(f'{name}_count{_format_labels(key)} {histogram.count}')
+
+        return '\n'.join(lines) + '\n' if len(lines) != 0 else ''
+
+
+metrics = MetricsRegistry()
+
+
+def timed(name: str, **labels: Any) -> Callable[[T], T]:
+    """Decorator that records the duration of each call of a function in a histogram"""
+    def decorator(f: T) -> T:
+        @wraps(f)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not metrics.enabled:
+                return f(*args, **kwargs)
+
+            with _Timer(metrics, name, labels):
+                return f(*args, **kwargs)
+
+        return cast(T, wrapper)
+    return decorator
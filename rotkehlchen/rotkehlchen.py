@@ -13,8 +13,10 @@ from gevent.lock import Semaphore
 from typing_extensions import Literal
 
 from rotkehlchen.accounting.accountant import Accountant
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.resolver import AssetResolver
-from rotkehlchen.balances.manual import account_for_manually_tracked_balances
+from rotkehlchen.balances.aggregator import BalancesAggregator
+from rotkehlchen.balances.manual import get_manually_tracked_balances_per_location
 from rotkehlchen.chain.bitcoin.xpub import XpubManager
 from rotkehlchen.chain.ethereum.manager import (
     ETHEREUM_NODES_TO_CONNECT_AT_START,
@@ -42,6 +44,7 @@ from rotkehlchen.externalapis.etherscan import Etherscan
 from rotkehlchen.fval import FVal
 from rotkehlchen.greenlets import GreenletManager
 from rotkehlchen.history import PriceHistorian, TradesHistorian
+from rotkehlchen.history.offline import OfflinePriceOracle
 from rotkehlchen.icons import IconManager
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import (
@@ -50,6 +53,7 @@ from rotkehlchen.logging import (
     RotkehlchenLogsAdapter,
     configure_logging,
 )
+from rotkehlchen.metrics import metrics, timed
 from rotkehlchen.premium.premium import Premium, PremiumCredentials, premium_create_and_verify
 from rotkehlchen.premium.sync import PremiumSyncManager
 from rotkehlchen.serialization.deserialize import deserialize_location
@@ -64,7 +68,6 @@ from rotkehlchen.typing import (
 )
 from rotkehlchen.usage_analytics import maybe_submit_usage_analytics
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import combine_stat_dicts, dict_get_sumof, merge_dicts
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -87,7 +90,7 @@ class Rotkehlchen():
 
         May Raise:
         - SystemPermissionError if the given data directory's permissions
-        are not correct.
+        are not correct or if the given historical prices file can't be read.
         """
         self.lock = Semaphore()
         self.lock.acquire()
@@ -97,6 +100,7 @@ class Rotkehlchen():
         self.premium: Optional[Premium] = None
         self.user_is_logged_in: bool = False
         configure_logging(args)
+        metrics.enabled = args.enable_metrics
 
         self.sleep_secs = args.sleep_secs
         if args.data_dir is None:
@@ -116,6 +120,14 @@ class Rotkehlchen():
         AssetResolver(data_directory=self.data_dir)
         self.data = DataHandler(self.data_dir, self.msg_aggregator)
         self.cryptocompare = Cryptocompare(data_directory=self.data_dir, database=None)
+        self.offline_price_oracle: Optional[OfflinePriceOracle] = None
+        if args.historical_prices_file is not None:
+            prices_path = Path(args.historical_prices_file)
+            if not prices_path.is_file():
+                raise SystemPermissionError(
+                    f'The given historical prices file {prices_path} does not exist',
+                )
+            self.offline_price_oracle = OfflinePriceOracle(prices_path, read_only=True)
         self.coingecko = Coingecko()
         self.icon_manager = IconManager(data_dir=self.data_dir, coingecko=self.coingecko)
         self.greenlet_manager.spawn_and_track(
@@ -212,6 +224,7 @@ class Rotkehlchen():
             data_directory=self.data_dir,
             history_date_start=historical_data_start,
             cryptocompare=self.cryptocompare,
+            offline_oracle=self.offline_price_oracle,
         )
         self.accountant = Accountant(
             db=self.data.db,
@@ -254,6 +267,7 @@ class Rotkehlchen():
             exchange_manager=self.exchange_manager,
             chain_manager=self.chain_manager,
         )
+        self.balances_aggregator = BalancesAggregator()
         self.user_is_logged_in = True
         log.debug('User unlocking complete')
 
@@ -272,9 +286,11 @@ class Rotkehlchen():
         # Reset rotkehlchen logger to default
         LoggingSettings(anonymized_logs=DEFAULT_ANONYMIZED_LOGS)
 
+        self.accountant.csvexporter.cleanup()
         del self.accountant
         del self.trades_historian
         del self.data_importer
+        del self.balances_aggregator
 
         if self.premium is not None:
             del self.premium
@@ -600,12 +616,13 @@ class Rotkehlchen():
 
         return trades
 
+    @timed('rotki_query_balances_seconds')
     def query_balances(
             self,
             requested_save_data: bool = False,
             timestamp: Timestamp = None,
             ignore_cache: bool = False,
-    ) -> Dict[str, Any]:
+    ) -> Dict[Union[str, Asset], Any]:
         """Query all balances rotkehlchen can see.
 
         If requested_save_data is True then the data are always saved in the DB,
@@ -620,64 +637,47 @@ class Rotkehlchen():
         """
         log.info('query_balances called', requested_save_data=requested_save_data)
 
-        balances = {}
+        aggregator = self.balances_aggregator
         problem_free = True
-        for _, exchange in self.exchange_manager.connected_exchanges.items():
+        connected_exchanges = self.exchange_manager.connected_exchanges
+        for source in aggregator.source_names():
+            if source not in ('blockchain', 'manual') and source not in connected_exchanges:
+                aggregator.remove_source(source)
+
+        for name, exchange in connected_exchanges.items():
+            # Each exchange caches its balances for its own cache period so only
+            # the exchanges whose balances are older than that are requeried
             exchange_balances, _ = exchange.query_balances(ignore_cache=ignore_cache)
             # If we got an error, disregard that exchange but make sure we don't save data
             if not isinstance(exchange_balances, dict):
                 problem_free = False
+                aggregator.remove_source(name)
             else:
-                balances[exchange.name] = exchange_balances
+                aggregator.update_source(name, {name: exchange_balances})
+                self.msg_aggregator.add_balance_update(name, exchange_balances)
 
+        # The chain manager keeps its own cache of balances and manually tracked
+        # balances only need a DB read, so these are always refreshed and we can
+        # see changes to the accounts or the manual entries right away
         try:
             blockchain_result = self.chain_manager.query_balances(
                 blockchain=None,
                 force_token_detection=ignore_cache,
                 ignore_cache=ignore_cache,
             )
-            balances['blockchain'] = {
+            blockchain_balances = {
                 asset: balance.to_dict() for asset, balance in blockchain_result.totals.items()
             }
+            aggregator.update_source('blockchain', {'blockchain': blockchain_balances})
+            self.msg_aggregator.add_balance_update('blockchain', blockchain_balances)
         except (RemoteError, EthSyncError) as e:
             problem_free = False
+            aggregator.remove_source('blockchain')
             log.error(f'Querying blockchain balances failed due to: {str(e)}')
 
-        balances = account_for_manually_tracked_balances(db=self.data.db, balances=balances)
-
-        combined = combine_stat_dicts([v for k, v in balances.items()])
-        total_usd_per_location = [(k, dict_get_sumof(v, 'usd_value')) for k, v in balances.items()]
-
-        # calculate net usd value
-        net_usd = FVal(0)
-        for _, v in combined.items():
-            net_usd += FVal(v['usd_value'])
-
-        stats: Dict[str, Any] = {
-            'location': {
-            },
-            'net_usd': net_usd,
-        }
-        for entry in total_usd_per_location:
-            name = entry[0]
-            total = entry[1]
-            if net_usd != FVal(0):
-                percentage = (total / net_usd).to_percentage()
-            else:
-                percentage = '0%'
-            stats['location'][name] = {
-                'usd_value': total,
-                'percentage_of_net_value': percentage,
-            }
-
-        for k, v in combined.items():
-            if net_usd != FVal(0):
-                percentage = (v['usd_value'] / net_usd).to_percentage()
-            else:
-                percentage = '0%'
-            combined[k]['percentage_of_net_value'] = percentage
-
-        result_dict = merge_dicts(combined, stats)
+        manual_balances = get_manually_tracked_balances_per_location(self.data.db)
+        aggregator.update_source('manual', manual_balances)
+        result_dict = aggregator.snapshot()
 
         allowed_to_save = requested_save_data or self.data.should_save_balances()
 
@@ -834,6 +834,7 @@ class Rotkehlchen():
             return False, 'Exchange {} is not registered'.format(name)
 
         self.exchange_manager.delete_exchange(name)
+        self.balances_aggregator.remove_source(name)
         # Success, remove it also from the DB
         self.data.db.remove_exchange(name)
         self.data.db.delete_used_query_range_for_exchange(name)
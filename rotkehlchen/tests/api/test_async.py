@@ -5,6 +5,7 @@ import gevent
 import pytest
 import requests
 
+from rotkehlchen.api.tasks import TaskRegistry, TaskStatus
 from rotkehlchen.tests.utils.api import (
     api_url_for,
     assert_error_response,
@@ -154,3 +155,107 @@ def test_query_async_task_that_died(rotkehlchen_api_server_with_exchanges):
     assert json_data['result']['outcome']['result'] is None
     msg = 'The backend query task died unexpectedly: BOOM!'
     assert json_data['result']['outcome']['message'] == msg
+
+
+@pytest.mark.parametrize('added_exchanges', [('binance',)])
+def test_query_tasks_info_and_cancel(rotkehlchen_api_server_with_exchanges):
+    """Test that the per task info is returned and that a running task can be cancelled"""
+    server = rotkehlchen_api_server_with_exchanges
+    binance = server.rest_api.rotkehlchen.exchange_manager.connected_exchanges['binance']
+
+    def mock_binance_asset_return(url):  # pylint: disable=unused-argument
+        gevent.sleep(10)
+        return MockResponse(200, BINANCE_BALANCES_RESPONSE)
+
+    binance_patch = patch.object(binance.session, 'get', side_effect=mock_binance_asset_return)
+    with binance_patch:
+        response = requests.get(api_url_for(
+            server,
+            "named_exchanges_balances_resource",
+            name='binance',
+        ), json={'async_query': True})
+        task_id = assert_ok_async_response(response)
+        # let the task start running
+        gevent.sleep(0.1)
+
+        response = requests.get(api_url_for(server, "asynctasksinforesource"))
+        assert_proper_response(response)
+        result = response.json()['result']
+        assert len(result) == 1
+        assert result[0]['task_id'] == task_id
+        assert result[0]['command'] == '_query_exchange_balances'
+        assert result[0]['status'] == 'pending'
+        assert result[0]['runtime'] is not None
+        assert result[0]['progress'] is None
+
+        response = requests.delete(
+            api_url_for(server, "specific_async_tasks_resource", task_id=task_id),
+        )
+        assert_proper_response(response)
+        assert response.json()['result'] is True
+
+    # the outcome of the cancelled task can be retrieved once and then it's gone
+    response = requests.get(
+        api_url_for(server, "specific_async_tasks_resource", task_id=task_id),
+    )
+    assert_proper_response(response)
+    json_data = response.json()
+    assert json_data['result']['status'] == 'cancelled'
+    assert json_data['result']['outcome']['result'] is None
+    assert json_data['result']['outcome']['message'] == f'The task with id {task_id} was cancelled'
+    response = requests.get(api_url_for(server, "asynctasksresource"))
+    assert_proper_response(response)
+    assert response.json()['result'] == []
+
+    # cancelling an unknown task should fail
+    response = requests.delete(
+        api_url_for(server, "specific_async_tasks_resource", task_id=task_id),
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg=f'No unfinished task with id {task_id} found',
+        status_code=HTTPStatus.NOT_FOUND,
+    )
+
+
+def test_task_registry_evicts_unclaimed_results():
+    """Test that results nobody asked for are evicted after the TTL and that
+    tasks over the concurrency limit are queued"""
+    registry = TaskRegistry(max_concurrent=1, result_ttl=1)
+
+    def command(value):
+        gevent.sleep(0.1)
+        return {'result': value, 'message': ''}
+
+    first_id = registry.spawn('command', command, value=1)
+    second_id = registry.spawn('command', command, value=2)
+    gevent.sleep(0.01)
+    assert registry.get(first_id).status == TaskStatus.PENDING
+    assert registry.get(second_id).status == TaskStatus.QUEUED
+
+    gevent.sleep(0.3)
+    assert registry.get(first_id).result == {'result': 1, 'message': ''}
+    assert registry.get(second_id).result == {'result': 2, 'message': ''}
+    gevent.sleep(1.1)
+    assert registry.task_ids() == []
+
+
+def test_task_registry_kill_all_cancels_tasks():
+    """Test that killed tasks are marked as cancelled so that they can be evicted"""
+    registry = TaskRegistry(max_concurrent=1, result_ttl=1)
+
+    def command():
+        gevent.sleep(10)
+        return {'result': True, 'message': ''}
+
+    running_id = registry.spawn('command', command)
+    queued_id = registry.spawn('command', command)
+    gevent.sleep(0.01)
+    registry.kill_all()
+    for task_id in (running_id, queued_id):
+        task = registry.get(task_id)
+        assert task.status == TaskStatus.CANCELLED
+        assert task.finished_at is not None
+
+    gevent.sleep(1.1)
+    assert registry.task_ids() == []
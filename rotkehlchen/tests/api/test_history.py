@@ -81,7 +81,7 @@ def test_query_history(rotkehlchen_api_server_with_exchanges):
 
     # Simply check that the results got returned here. The actual correctness of
     # accounting results is checked in other tests such as test_simple_accounting
-    assert len(outcome) == 2
+    assert len(outcome) == 3
     overview = outcome['overview']
     assert len(overview) == 10
     assert overview["loan_profit"] is not None
@@ -94,12 +94,17 @@ def test_query_history(rotkehlchen_api_server_with_exchanges):
     assert overview["total_taxable_profit_loss"] is not None
     assert overview["total_profit_loss"] is not None
     assert overview["defi_profit_loss"] is not None
-    all_events = outcome['all_events']
-    assert isinstance(all_events, list)
     # TODO: These events are not actually checked anywhere for correctness
     #       A test should probably be made for their correctness, even though
     #       they are assumed correct if the overview is correct
-    assert len(all_events) == 36
+    assert outcome['events_num'] == 36
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server_with_exchanges, "historyeventsresource"),
+        json={'report_id': outcome['report_id']},
+    )
+    result = assert_proper_response_with_result(response)
+    assert result['entries_found'] == 36
+    assert len(result['entries']) == 36
 
     # And now make sure that warnings have also been generated for the query of
     # the unsupported/unknown assets
@@ -207,7 +212,7 @@ def test_query_history_timerange(rotkehlchen_api_server_with_exchanges):
     assert_proper_response(response)
     data = response.json()
     assert data['message'] == ''
-    assert len(data['result']) == 2
+    assert len(data['result']) == 3
     overview = data['result']['overview']
     assert len(overview) == 10
     assert overview["loan_profit"] is not None
@@ -220,9 +225,30 @@ def test_query_history_timerange(rotkehlchen_api_server_with_exchanges):
     assert overview["total_taxable_profit_loss"] is not None
     assert overview["total_profit_loss"] is not None
     assert overview["defi_profit_loss"] is not None
-    all_events = data['result']['all_events']
-    assert isinstance(all_events, list)
-    assert len(all_events) == 4
+    assert data['result']['events_num'] == 4
+
+    # The events of the report can be queried a page at a time
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server_with_exchanges, "historyeventsresource"),
+        json={'offset': 1, 'limit': 2},
+    )
+    result = assert_proper_response_with_result(response)
+    assert result['report_id'] == data['result']['report_id']
+    assert result['entries_found'] == 4
+    assert len(result['entries']) == 2
+    # Also as query arguments, which is how the frontend sends them
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server_with_exchanges, "historyeventsresource"),
+        params={'report_id': data['result']['report_id'], 'offset': 1, 'limit': 2},
+    )
+    assert assert_proper_response_with_result(response) == result
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server_with_exchanges, "historyeventsresource"),
+        json={'event_type': 'buy'},
+    )
+    result = assert_proper_response_with_result(response)
+    assert len(result['entries']) == result['entries_found']
+    assert all(x['type'] == 'buy' for x in result['entries'])
 
     response = requests.get(
         api_url_for(rotkehlchen_api_server_with_exchanges, "periodicdataresource"),
@@ -1,6 +1,9 @@
+from http import HTTPStatus
+
 import pytest
 import requests
 
+from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.api import api_url_for, assert_proper_response
 from rotkehlchen.tests.utils.history import mock_history_processing_and_exchanges
 
@@ -44,3 +47,36 @@ def test_query_messages(rotkehlchen_api_server_with_exchanges):
     warnings = data['result']['warnings']
     assert len(errors) == 0
     assert len(warnings) == 0
+
+
+def test_notifications_stream(rotkehlchen_api_server):
+    """Test that subscribers of the notifications stream get messages pushed to them
+    and that pushed messages don't end up in the messages queue as well"""
+    server = rotkehlchen_api_server
+    rotki = server.rest_api.rotkehlchen
+    response = requests.get(api_url_for(server, 'notificationsresource'), stream=True)
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Content-Type'].startswith('text/event-stream')
+    lines = response.iter_lines(decode_unicode=True)
+    assert next(lines) == ': connected'
+    assert next(lines) == ''
+
+    rotki.msg_aggregator.add_warning('a warning')
+    rotki.msg_aggregator.add_error('an error')
+    rotki.msg_aggregator.add_balance_update('blockchain', {'ETH': {'amount': FVal('1')}})
+    assert [next(lines) for _ in range(9)] == [
+        'event: warning',
+        'data: "a warning"',
+        '',
+        'event: error',
+        'data: "an error"',
+        '',
+        'event: balance_update',
+        'data: {"location": "blockchain", "balances": {"ETH": {"amount": "1"}}}',
+        '',
+    ]
+    response.close()
+
+    response = requests.get(api_url_for(server, 'messagesresource'))
+    assert_proper_response(response)
+    assert response.json()['result'] == {'warnings': [], 'errors': []}
@@ -1,9 +1,15 @@
+from http import HTTPStatus
 from typing import Any, Dict
 from unittest.mock import patch
 
 import requests
 
-from rotkehlchen.tests.utils.api import api_url_for, assert_proper_response
+from rotkehlchen.metrics import metrics
+from rotkehlchen.tests.utils.api import (
+    api_url_for,
+    assert_error_response,
+    assert_proper_response,
+)
 from rotkehlchen.utils.misc import get_system_spec
 
 
@@ -80,3 +86,53 @@ def test_query_version_when_update_required(rotkehlchen_api_server):
     assert data['result']['our_version'] == our_version
     assert data['result']['latest_version'] == 'v99.99.99'
     assert 'v99.99.99' in data['result']['download_url']
+
+
+def test_query_metrics(rotkehlchen_api_server):
+    """Test that the metrics endpoint returns the collected metrics in the Prometheus format"""
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'metricsresource'))
+    assert_error_response(
+        response=response,
+        contained_in_msg='Metrics are not collected',
+        status_code=HTTPStatus.CONFLICT,
+    )
+
+    metrics.reset()
+    metrics.enabled = True
+    try:
+        rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+        rotki.data.db.update_used_query_range(name='foo', start_ts=0, end_ts=10)
+        response = requests.get(api_url_for(rotkehlchen_api_server, 'metricsresource'))
+    finally:
+        metrics.enabled = False
+        metrics.reset()
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Content-Type'].startswith('text/plain')
+    assert '# TYPE rotki_db_write_seconds histogram' in response.text
+    assert 'rotki_db_write_seconds_count{method="update_used_query_range"} 1' in response.text
+
+
+def test_profile_backend(rotkehlchen_api_server):
+    """Test that profiling the backend returns the sampled stacks in the collapsed format"""
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, 'profilingresource'),
+        json={'duration': 1, 'interval': 0.01},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Content-Type'].startswith('text/plain')
+    lines = response.text.splitlines()
+    assert len(lines) > 0
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack.split(';')[0] in ('running', 'waiting')
+        assert int(count) > 0
+
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, 'profilingresource'),
+        json={'duration': 0},
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg='The profiling duration must be between 1 and 600 seconds',
+    )
@@ -6,13 +6,15 @@ from unittest.mock import patch
 
 import pytest
 
+from rotkehlchen.accounting.structures import TaxReportEvent
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.balances.manual import ManuallyTrackedBalance
-from rotkehlchen.constants import YEAR_IN_SECONDS
+from rotkehlchen.constants import EV_BUY, EV_SELL, YEAR_IN_SECONDS, ZERO
 from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR, A_USD
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.dbhandler import DBINFO_FILENAME, DBHandler, detect_sqlcipher_version
 from rotkehlchen.db.queried_addresses import QueriedAddresses
+from rotkehlchen.db.ranges import DBQueryRanges
 from rotkehlchen.db.settings import (
     DEFAULT_ACTIVE_MODULES,
     DEFAULT_ANONYMIZED_LOGS,
@@ -69,6 +71,12 @@ from rotkehlchen.utils.serialization import rlk_jsondumps
 TABLES_AT_INIT = [
     'aave_events',
     'yearn_vaults_events',
+    'compound_events',
+    'makerdao_vaults',
+    'makerdao_vault_events',
+    'makerdao_dsr_chi',
+    'tax_reports',
+    'tax_report_events',
     'timed_balances',
     'timed_location_data',
     'asset_movement_category',
@@ -805,7 +813,7 @@ def test_add_asset_movements(data_dir, username):
 def test_add_ethereum_transactions(data_dir, username):
     """Test that adding and retrieving ethereum transactions from the DB works fine.
 
-    Also duplicates should be ignored and an error returned
+    Also duplicates should be ignored and only the transactions actually added returned
     """
     msg_aggregator = MessagesAggregator()
     data = DataHandler(data_dir, msg_aggregator)
@@ -850,9 +858,23 @@ def test_add_ethereum_transactions(data_dir, username):
         input_data=MOCK_INPUT_DATA,
         nonce=3,
     )
+    tx4 = EthereumTransaction(
+        tx_hash=b'4',
+        timestamp=Timestamp(1453806400),
+        block_number=7,
+        from_address=ETH_ADDRESS1,
+        to_address=ETH_ADDRESS2,
+        value=FVal('1000000'),
+        gas=FVal('5000000'),
+        gas_price=FVal('2000000000'),
+        gas_used=FVal('25000000'),
+        input_data=MOCK_INPUT_DATA,
+        nonce=4,
+    )
 
-    # Add and retrieve the first 2 margins. All should be fine.
-    data.db.add_ethereum_transactions([tx1, tx2], from_etherscan=True)
+    # Add and retrieve the first 2 transactions. All should be fine.
+    added = data.db.add_ethereum_transactions([tx1, tx2], from_etherscan=True)
+    assert added == [tx1, tx2]
     errors = msg_aggregator.consume_errors()
     warnings = msg_aggregator.consume_warnings()
     assert len(errors) == 0
@@ -860,15 +882,17 @@ def test_add_ethereum_transactions(data_dir, username):
     returned_transactions = data.db.get_ethereum_transactions()
     assert returned_transactions == [tx1, tx2]
 
-    # Add the last 2 transactions. Since tx2 already exists in the DB it should be
-    # ignored (no errors shown for attempting to add already existing transaction)
-    data.db.add_ethereum_transactions([tx2, tx3], from_etherscan=True)
+    # Add the last 2 transactions with tx2 between them. Since tx2 already exists in
+    # the DB it should be ignored (no errors shown for attempting to add already
+    # existing transaction) but the transactions around it should be added
+    added = data.db.add_ethereum_transactions([tx3, tx2, tx4], from_etherscan=True)
+    assert added == [tx3, tx4]
     errors = msg_aggregator.consume_errors()
     warnings = msg_aggregator.consume_warnings()
     assert len(errors) == 0
     assert len(warnings) == 0
     returned_transactions = data.db.get_ethereum_transactions()
-    assert returned_transactions == [tx1, tx2, tx3]
+    assert returned_transactions == [tx1, tx2, tx3, tx4]
 
 
 @pytest.mark.parametrize('ethereum_accounts', [[]])
@@ -1068,3 +1092,62 @@ def test_remove_queried_address_on_account_remove(data_dir, username):
     )
     addresses = queried_addresses.get_queried_addresses_for_module('makerdao_vaults')
     assert not addresses
+
+
+def test_tax_report_events(database):
+    """Test that only the latest tax report's events are kept and can be queried in pages"""
+    def make_event(event_type, timestamp):
+        return TaxReportEvent(
+            event_type=event_type,
+            location=Location.KRAKEN,
+            paid_in_profit_currency=FVal('10.5'),
+            paid_asset='EUR',
+            paid_in_asset=FVal('10.5'),
+            taxable_amount=ZERO,
+            taxable_bought_cost_in_profit_currency=ZERO,
+            received_asset='ETH',
+            taxable_received_in_profit_currency=ZERO,
+            received_in_asset=FVal('0.1'),
+            net_profit_or_loss=ZERO,
+            timestamp=Timestamp(timestamp),
+            is_virtual=False,
+        )
+
+    old_report_id = database.add_tax_report(Timestamp(0), Timestamp(100), A_EUR)
+    database.add_tax_report_events(old_report_id, 0, [make_event(EV_BUY, 1)])
+    report_id = database.add_tax_report(Timestamp(0), Timestamp(100), A_EUR)
+    assert database.get_latest_tax_report() == (report_id, A_EUR)
+    assert database.get_tax_report_events(old_report_id) == ([], 0)
+
+    events = [make_event(EV_BUY if x % 2 == 0 else EV_SELL, x) for x in range(5)]
+    database.add_tax_report_events(report_id, 0, events[:3])
+    database.add_tax_report_events(report_id, 3, events[3:])
+    assert database.get_tax_report_events(report_id) == (events, 5)
+    assert database.get_tax_report_events(report_id, offset=1, limit=2) == (events[1:3], 5)
+    assert database.get_tax_report_events(report_id, event_type=EV_SELL) == (events[1::2], 2)
+    result = database.get_tax_report_events(
+        report_id,
+        from_ts=Timestamp(1),
+        to_ts=Timestamp(3),
+        limit=1,
+    )
+    assert result == ([events[1]], 3)
+
+
+def test_update_used_query_subrange(database):
+    """Test that fully queried sub-ranges extend the queried range only if they touch it"""
+    ranges = DBQueryRanges(database)
+    ranges.update_used_query_subrange('kraken_trades', start_ts=1500, end_ts=2000)
+    assert database.get_used_query_range('kraken_trades') == (1500, 2000)
+    # an empty sub-range is ignored
+    ranges.update_used_query_subrange('kraken_trades', start_ts=2001, end_ts=2000)
+    assert database.get_used_query_range('kraken_trades') == (1500, 2000)
+    # a bordering sub-range extends the range
+    ranges.update_used_query_subrange('kraken_trades', start_ts=1200, end_ts=1499)
+    assert database.get_used_query_range('kraken_trades') == (1200, 2000)
+    # an overlapping sub-range extends the range
+    ranges.update_used_query_subrange('kraken_trades', start_ts=1900, end_ts=2500)
+    assert database.get_used_query_range('kraken_trades') == (1200, 2500)
+    # a disjoint sub-range can't be saved
+    ranges.update_used_query_subrange('kraken_trades', start_ts=3000, end_ts=3500)
+    assert database.get_used_query_range('kraken_trades') == (1200, 2500)
@@ -1,6 +1,14 @@
 from rotkehlchen.accounting.structures import Balance
 from rotkehlchen.assets.asset import Asset, EthereumToken
-from rotkehlchen.chain.ethereum.structures import AaveEvent, YearnVaultEvent
+from rotkehlchen.chain.ethereum.structures import (
+    AaveEvent,
+    CompoundEvent,
+    DSRChiPoint,
+    StoredVaultEvent,
+    VaultEvent,
+    VaultEventType,
+    YearnVaultEvent,
+)
 from rotkehlchen.chain.ethereum.yearn.vaults import YEARN_VAULTS
 from rotkehlchen.constants.assets import A_DAI
 from rotkehlchen.data_handler import DataHandler
@@ -122,3 +130,143 @@ def test_add_and_get_yearn_vault_events(data_dir, username):
     assert events == addr1_events
     events = data.db.get_yearn_vaults_events(address=addr2, vault=YEARN_VAULTS['yDAI'])
     assert events == addr2_events
+
+
+def test_add_and_get_compound_events(data_dir, username):
+    """Test that get compound events works fine and returns only events for what we need"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '123', create_new=True)
+
+    addr1 = make_ethereum_address()
+    addr1_events = [CompoundEvent(
+        event_type='mint',
+        address=addr1,
+        block_number=1,
+        timestamp=Timestamp(1),
+        asset=A_DAI,
+        value=Balance(amount=FVal(1), usd_value=FVal(1)),
+        to_asset=Asset('cDAI'),
+        to_value=Balance(amount=FVal(50), usd_value=FVal(1)),
+        realized_pnl=None,
+        tx_hash='0x01653e88600a6492ad6e9ae2af415c990e623479057e4e93b163e65cfb2d4436',
+        log_index=1,
+    ), CompoundEvent(
+        event_type='comp',
+        address=addr1,
+        block_number=2,
+        timestamp=Timestamp(2),
+        asset=Asset('COMP'),
+        value=Balance(amount=FVal('0.5'), usd_value=FVal(100)),
+        to_asset=None,
+        to_value=None,
+        realized_pnl=Balance(amount=FVal('0.5'), usd_value=FVal(100)),
+        tx_hash='0x4147da3e5d3c0565a99192ce0b32182ab30b8e1067921d9b2a8ef3bd60b7e2ce',
+        log_index=2,
+    )]
+    data.db.add_compound_events(address=addr1, events=addr1_events)
+    addr2 = make_ethereum_address()
+    addr2_events = [CompoundEvent(
+        event_type='borrow',
+        address=addr2,
+        block_number=1,
+        timestamp=Timestamp(1),
+        asset=A_DAI,
+        value=Balance(amount=FVal(10), usd_value=FVal(10)),
+        to_asset=None,
+        to_value=None,
+        realized_pnl=None,
+        tx_hash='0x8c094d58f33e8dedcd348cb33b58f3bd447602f1fecb99e51b1c2868029eab55',
+        log_index=1,
+    )]
+    data.db.add_compound_events(address=addr2, events=addr2_events)
+
+    assert data.db.get_compound_events(address=addr1) == addr1_events
+    assert data.db.get_compound_events(address=addr2) == addr2_events
+
+    data.db.delete_compound_data()
+    assert data.db.get_compound_events(address=addr1) == []
+
+
+def test_add_and_get_makerdao_vault_events(data_dir, username):
+    """Test that makerdao vault events and creation timestamps are kept per vault"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '123', create_new=True)
+
+    assert data.db.get_makerdao_vault_creation_ts(1) is None
+    data.db.set_makerdao_vault_creation_ts(1, Timestamp(1))
+    assert data.db.get_makerdao_vault_creation_ts(1) == 1
+    assert data.db.get_makerdao_vault_creation_ts(2) is None
+
+    vault1_events = [StoredVaultEvent(
+        identifier=1,
+        event=VaultEvent(
+            event_type=VaultEventType.GENERATE_DEBT,
+            value=Balance(amount=FVal('1.5'), usd_value=FVal('1.51')),
+            timestamp=Timestamp(2),
+            tx_hash='0x01653e88600a6492ad6e9ae2af415c990e623479057e4e93b163e65cfb2d4436',
+        ),
+        raw_amount=1500000000000000000,
+        log_index=3,
+    ), StoredVaultEvent(
+        identifier=1,
+        event=VaultEvent(
+            event_type=VaultEventType.DEPOSIT_COLLATERAL,
+            value=Balance(amount=FVal(10), usd_value=FVal(2000)),
+            timestamp=Timestamp(1),
+            tx_hash='0x4147da3e5d3c0565a99192ce0b32182ab30b8e1067921d9b2a8ef3bd60b7e2ce',
+        ),
+        raw_amount=10000000000000000000,
+        log_index=1,
+    )]
+    vault2_events = [StoredVaultEvent(
+        identifier=2,
+        event=VaultEvent(
+            event_type=VaultEventType.LIQUIDATION,
+            value=Balance(amount=FVal(1), usd_value=FVal(200)),
+            timestamp=Timestamp(5),
+            tx_hash='0x8c094d58f33e8dedcd348cb33b58f3bd447602f1fecb99e51b1c2868029eab55',
+        ),
+        raw_amount=1000000000000000000,
+        log_index=2,
+    )]
+    data.db.add_makerdao_vault_events(vault1_events + vault2_events)
+    # Adding the same events again should not duplicate them
+    data.db.add_makerdao_vault_events(vault1_events)
+
+    assert data.db.get_makerdao_vault_events(1) == [vault1_events[1], vault1_events[0]]
+    assert data.db.get_makerdao_vault_events(2) == vault2_events
+    assert data.db.get_makerdao_vault_events(3) == []
+
+    data.db.update_used_block_query_range(
+        name='makerdao_vault_events_1',
+        from_block=1,
+        to_block=10,
+    )
+    data.db.delete_makerdao_vault_data()
+    assert data.db.get_makerdao_vault_creation_ts(1) is None
+    assert data.db.get_makerdao_vault_events(1) == []
+    assert data.db.get_makerdao_vault_events(2) == []
+    assert data.db.get_used_query_range('makerdao_vault_events_1') is None
+
+
+def test_add_and_delete_makerdao_dsr_chi_points(data_dir, username):
+    """Test that DSR chi points are replaced per timestamp and that they can be deleted"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '123', create_new=True)
+
+    points = [
+        DSRChiPoint(timestamp=Timestamp(2), chi=1000000000000000000000000001, dsr=2),
+        DSRChiPoint(timestamp=Timestamp(1), chi=1000000000000000000000000000, dsr=1),
+    ]
+    data.db.add_makerdao_dsr_chi_points(points)
+    new_point = DSRChiPoint(timestamp=Timestamp(2), chi=1000000000000000000000000002, dsr=3)
+    data.db.add_makerdao_dsr_chi_points([new_point])
+    data.db.update_used_block_query_range(name='makerdao_dsr_chi', from_block=1, to_block=10)
+    assert data.db.get_makerdao_dsr_chi_points() == [points[1], new_point]
+
+    data.db.delete_makerdao_dsr_chi_data()
+    assert data.db.get_makerdao_dsr_chi_points() == []
+    assert data.db.get_used_query_range('makerdao_dsr_chi') is None
@@ -1,7 +1,8 @@
 import json
 import warnings as test_warnings
+from collections import defaultdict
 from enum import Enum
-from typing import Callable, Optional
+from typing import Any, Callable, DefaultDict, Dict, Optional
 from unittest.mock import patch
 
 import requests
@@ -144,9 +145,15 @@ def create_coinbasepro_query_mock(
         cb: Coinbasepro,
         emulate_errors: ErrorEmulation = ErrorEmulation.NONE,
         original_get: Optional[Callable] = None,
+        pending_polls: int = 0,
 ):
+    """Mocks the coinbase pro API and the report downloads
 
-    def mock_get_request(url: str) -> MockResponse:
+    Each report is reported as pending for the first `pending_polls` times it's polled
+    """
+    polls: DefaultDict[str, int] = defaultdict(int)
+
+    def mock_get_request(url: str, **kwargs: Any) -> MockResponse:
         if 'download_report/' in url:
             parts = url.split('download_report/')
             assert len(parts) == 2
@@ -174,12 +181,13 @@ def create_coinbasepro_query_mock(
             return MockResponse(200, text)
         else:
             assert original_get, 'for mocked gets we need also the original function'
-            return original_get(url)
+            return original_get(url, **kwargs)
 
     def mock_coinbasepro_request(
             request_method: Literal['get', 'post'],
             url: str,
             data: str = '',
+            headers: Optional[Dict[str, str]] = None,  # pylint: disable=unused-argument
             allow_redirects: bool = True,  # pylint: disable=unused-argument
     ) -> MockResponse:
         if 'products' in url:
@@ -233,17 +241,25 @@ def create_coinbasepro_query_mock(
                 parts = url.split('reports/')
                 assert len(parts) == 2
                 report_id = parts[1]
-                text = GET_REPORT_RESPONSE_TEMPLATE.format(
-                    report_id,
-                    f'http://download_report/{report_id}',
-                )
+                polls[report_id] += 1
+                if polls[report_id] <= pending_polls:
+                    text = POST_REPORT_RESPONSE_TEMPLATE.format(report_id)
+                else:
+                    text = GET_REPORT_RESPONSE_TEMPLATE.format(
+                        report_id,
+                        f'http://download_report/{report_id}',
+                    )
         else:
             raise AssertionError(f'Unknown url: {url} encountered during CoinbasePro mocking')
         return MockResponse(200, text)
 
     coinbasepro_mock = patch.object(cb.session, 'request', side_effect=mock_coinbasepro_request)
     if original_get:
-        requests_get_mock = patch('requests.get', side_effect=mock_get_request)
+        requests_get_mock = patch.object(
+            cb.reports_session,
+            'get',
+            side_effect=mock_get_request,
+        )
         return coinbasepro_mock, requests_get_mock
 
     return coinbasepro_mock
@@ -376,6 +392,31 @@ def test_query_trade_history(function_scope_coinbasepro):
     assert len(errors) == 0
 
 
+def test_query_trade_history_pending_reports(function_scope_coinbasepro):
+    """Test that reports that are not ready yet are polled again after waiting"""
+    cb = function_scope_coinbasepro
+    cb_query_mock, get_mock = create_coinbasepro_query_mock(
+        cb,
+        original_get=requests.get,
+        pending_polls=2,
+    )
+    poll_wait_patch = patch(
+        'rotkehlchen.exchanges.coinbasepro.MIN_SECS_BETWEEN_REPORT_POLLS',
+        new=0.01,
+    )
+    with cb_query_mock as query_mock, get_mock as download_mock, poll_wait_patch:
+        trades = cb.query_trade_history(start_ts=0, end_ts=1579449769)
+
+    assert trades == [EXPECTED_TRADE]
+    report_polls = [
+        call for call in query_mock.call_args_list
+        if call[0][0] == 'get' and 'reports/' in call[0][1]
+    ]
+    assert len(report_polls) == 3
+    assert download_mock.call_count == 1
+    assert download_mock.call_args[1]['stream'] is True
+
+
 def test_query_trade_history_unknown_assets(function_scope_coinbasepro):
     """Test that unknown assets are handled when querying trade data from coinbase pro"""
     cb = function_scope_coinbasepro
@@ -1,6 +1,9 @@
+import json
 import warnings as test_warnings
+from base64 import b64decode
 from unittest.mock import patch
 
+import gevent
 import pytest
 import requests
 
@@ -157,6 +160,60 @@ def test_gemini_query_all_trades_pagination(sandbox_gemini):
     assert len(trades) == 591
 
 
+MYTRADES_RESPONSE_TEMPLATE = """[{{
+    "price": "{price}",
+    "amount": "1",
+    "timestamp": {timestamp},
+    "timestampms": {timestamp}000,
+    "type": "Buy",
+    "aggressor": true,
+    "fee_currency": "USD",
+    "fee_amount": "0.5",
+    "tid": {tid},
+    "order_id": "{tid}",
+    "exchange": "gemini",
+    "is_auction_fill": false
+}}]"""
+
+
+def test_gemini_query_trades_of_symbols_concurrently(sandbox_gemini):
+    """Test that the trades of all symbols are queried concurrently with increasing nonces
+
+    Uses mocked calls so that the queries' timing is known
+    """
+    sandbox_gemini._symbols = ['btcusd', 'ethusd', 'ltcusd']
+    sandbox_gemini.first_connection_made = True
+    nonces = []
+    in_flight = 0
+    max_in_flight = 0
+
+    def mock_trades_request(method, url, headers):  # pylint: disable=unused-argument
+        nonlocal in_flight, max_in_flight
+        payload = json.loads(b64decode(headers['X-GEMINI-PAYLOAD']))
+        nonces.append(int(payload['nonce']))
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        gevent.sleep(0.5)
+        in_flight -= 1
+        symbol_idx = sandbox_gemini._symbols.index(payload['symbol'])
+        return MockResponse(200, MYTRADES_RESPONSE_TEMPLATE.format(
+            price=100 + symbol_idx,
+            timestamp=1584720549 - symbol_idx,
+            tid=symbol_idx,
+        ))
+
+    with patch.object(sandbox_gemini.session, 'request', side_effect=mock_trades_request):
+        trades = sandbox_gemini.query_online_trade_history(
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1584881354),
+        )
+
+    assert [trade.pair for trade in trades] == ['BTC_USD', 'ETH_USD', 'LTC_USD']
+    assert [trade.rate for trade in trades] == [FVal(100), FVal(101), FVal(102)]
+    assert max_in_flight == 3
+    assert nonces == sorted(set(nonces))
+
+
 # Taken from the API docs
 TRANSFERS_RESPONSE = """[
    {
@@ -6,7 +6,7 @@ import pytest
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.converters import KRAKEN_TO_WORLD, asset_from_kraken
 from rotkehlchen.constants.assets import A_BTC, A_ETH
-from rotkehlchen.errors import UnprocessableTradePair
+from rotkehlchen.errors import RemoteError, UnprocessableTradePair
 from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.exchanges.kraken import KRAKEN_DELISTED, Kraken, kraken_to_world_pair
 from rotkehlchen.fval import FVal
@@ -343,3 +343,63 @@ def test_trade_from_kraken_unexpected_data(function_scope_kraken):
     input_trades = test_trades
     input_trades = input_trades.replace('"vol": "1",', '')
     query_kraken_and_test(input_trades, expected_warnings_num=0, expected_errors_num=1)
+
+
+def test_kraken_trade_history_resumes_from_saved_pages(function_scope_kraken):
+    """Test that each page of kraken trades is saved as it arrives, so that an
+    interrupted query only needs to query what was not covered the next time"""
+    kraken = function_scope_kraken
+
+    def make_raw_trade(txid, timestamp):
+        return {
+            'ordertxid': txid,
+            'postxid': 1,
+            'pair': 'XXBTZEUR',
+            'time': str(timestamp),
+            'type': 'buy',
+            'ordertype': 'market',
+            'price': '100',
+            'vol': '1',
+            'fee': '0.1',
+            'cost': '100',
+            'margin': '0.0',
+            'misc': '',
+        }
+
+    queries = []
+
+    def mock_interrupted_query(endpoint, start_ts, end_ts, offset=None, extra_dict=None):  # pylint: disable=unused-argument  # noqa: E501
+        queries.append((start_ts, end_ts, offset))
+        if offset is not None:
+            raise RemoteError('Connection lost')
+        # kraken returns the newest trades first
+        return {
+            'trades': {'1': make_raw_trade('1', 1500), '2': make_raw_trade('2', 1400)},
+            'count': 4,
+        }
+
+    with patch.object(kraken, '_query_endpoint_for_period', side_effect=mock_interrupted_query):
+        with pytest.raises(RemoteError):
+            kraken.query_trade_history(start_ts=1000, end_ts=2000)
+
+    assert queries == [(1000, 2000, None), (1000, 2000, 2)]
+    assert len(kraken.db.get_trades()) == 2
+    # more trades at the time of the oldest trade of the page could be in the next page
+    assert kraken.db.get_used_query_range('kraken_trades') == (1401, 2000)
+
+    def mock_query(endpoint, start_ts, end_ts, offset=None, extra_dict=None):  # pylint: disable=unused-argument  # noqa: E501
+        queries.append((start_ts, end_ts, offset))
+        return {
+            'trades': {'2': make_raw_trade('2', 1400), '3': make_raw_trade('3', 1200)},
+            'count': 2,
+        }
+
+    queries.clear()
+    with patch.object(kraken, '_query_endpoint_for_period', side_effect=mock_query):
+        trades = kraken.query_trade_history(start_ts=1000, end_ts=2000)
+
+    assert queries == [(1000, 1400, None)]
+    assert [x.timestamp for x in trades] == [1200, 1400, 1500]
+    assert kraken.db.get_used_query_range('kraken_trades') == (1000, 2000)
+    # the re-queried trade at the boundary should not be reported to the user
+    assert kraken.msg_aggregator.consume_warnings() == []
@@ -9,6 +9,7 @@ from rotkehlchen.errors import NoPriceForGivenTimestamp
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.constants import A_SNGLS
+from rotkehlchen.tests.utils.mock import MockResponse
 
 
 def test_cryptocompare_query_pricehistorical(cryptocompare):
@@ -55,6 +56,32 @@ def test_cryptocompare_historical_data_use_cached_price(data_dir, database):
     assert result[1].high == FVal(20)
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_cryptocompare_all_coins_keeps_string_fields(data_dir, database):
+    """Test that numeric looking strings of the coin list are not decoded as numbers
+
+    Both when the coin list is queried and when it is read from the cache
+    """
+    contents = """{"Response": "Success", "Data": {
+    "BTC": {"Id": "1182", "Symbol": "BTC", "CoinName": "Bitcoin", "SortOrder": "1"},
+    "42": {"Id": "4321", "Symbol": "42", "CoinName": "42 Coin", "SortOrder": "34"}}}"""
+    cc = Cryptocompare(data_directory=data_dir, database=database)
+    with patch.object(cc.session, 'get', return_value=MockResponse(200, contents)) as get_mock:
+        queried_coins = cc.all_coins()
+        cached_coins = cc.all_coins()
+        assert get_mock.call_count == 1
+
+    for coins in (queried_coins, cached_coins):
+        assert coins['BTC'] == {
+            'Id': '1182',
+            'Symbol': 'BTC',
+            'CoinName': 'Bitcoin',
+            'SortOrder': '1',
+        }
+        assert coins['42']['Id'] == '4321'
+        assert coins['42']['Symbol'] == '42'
+
+
 @pytest.mark.skip(
     'Same test as test_end_to_end_tax_report::'
     'test_cryptocompare_asset_and_price_not_found_in_history_processing',
@@ -84,3 +84,51 @@ def test_deserialize_transaction_from_etherscan():
         input_data=bytes.fromhex(data['input'][2:]),
         nonce=0,
     )
+
+
+def test_get_logs_with_or_topics(temp_etherscan):
+    """Test that a topic with multiple values is split into one query per value"""
+    etherscan = temp_etherscan
+    queried_options = []
+
+    def mock_query(module, action, options):  # pylint: disable=unused-argument
+        queried_options.append(options)
+        return [{'topics': [options['topic0'], options['topic1']]}]
+
+    topics = ['0xaa', ['0x01', '0x02', '0x01']]
+    with patch.object(etherscan, '_query', side_effect=mock_query):
+        result = etherscan.get_logs(
+            contract_address='0x4678f0a6958e4D2Bc4F1BAF7Bc52E8F3564f3fE4',
+            topics=topics,
+            from_block=1,
+            to_block=10,
+        )
+
+    assert [x['topic1'] for x in queried_options] == ['0x01', '0x02']
+    assert all(x['topic0'] == '0xaa' for x in queried_options)
+    assert result == [{'topics': ['0xaa', '0x01']}, {'topics': ['0xaa', '0x02']}]
+
+
+def test_get_transactions_paginates_by_block(temp_etherscan):
+    """Test that a full page of transactions continues from its last block without duplicates"""
+    etherscan = temp_etherscan
+    address = '0x5153493bB1E1642A63A098A65dD3913daBB6AE24'
+    blocks = [1, 2, 3, 3, 4]
+
+    def make_entry(idx, block):
+        return {'blockNumber': block, 'timeStamp': 1439048640 + block, 'hash': '0x' + f'{idx:064x}', 'nonce': idx, 'from': address, 'to': address, 'value': 1, 'gas': 21000, 'gasPrice': 1, 'gasUsed': 21000, 'input': '0x'}  # noqa: E501
+
+    entries = [make_entry(idx, block) for idx, block in enumerate(blocks)]
+    queried_start_blocks = []
+
+    def mock_query(module, action, options):  # pylint: disable=unused-argument
+        start_block = int(options.get('startBlock', 0))
+        queried_start_blocks.append(start_block)
+        return [x for x in entries if x['blockNumber'] >= start_block][:3]
+
+    with patch('rotkehlchen.externalapis.etherscan.ETHERSCAN_TX_QUERY_LIMIT', 3):
+        with patch.object(etherscan, '_query', side_effect=mock_query):
+            pages = list(etherscan.get_transactions(account=address, internal=False))
+
+    assert queried_start_blocks == [0, 3, 4]
+    assert [[tx.block_number for tx in page] for page in pages] == [[1, 2], [3, 3], [4]]
@@ -148,10 +148,14 @@ def create_inquirer(data_directory, should_mock_current_price_queries, mocked_pr
     if not should_mock_current_price_queries:
         return inquirer
 
-    def mock_find_usd_price(asset):  # pylint: disable=unused-argument
+    def mock_find_usd_price(asset, ignore_cache=False):  # pylint: disable=unused-argument
         return mocked_prices.get(asset, FVal('1.5'))
 
+    def mock_find_usd_prices(assets, ignore_cache=False):  # pylint: disable=unused-argument
+        return {asset: mocked_prices.get(asset, FVal('1.5')) for asset in assets}
+
     inquirer.find_usd_price = mock_find_usd_price  # type: ignore
+    inquirer.find_usd_prices = mock_find_usd_prices  # type: ignore
 
     def mock_query_fiat_pair(base, quote):  # pylint: disable=unused-argument
         return FVal(1)
@@ -58,12 +58,16 @@ def cli_args(data_dir, ethrpc_endpoint):
         'logtarget',
         'loglevel',
         'logfromothermodules',
+        'historical_prices_file',
+        'enable_metrics',
     ])
     args.loglevel = 'debug'
     args.logfromothermodules = False
     args.sleep_secs = 60
     args.data_dir = data_dir
     args.ethrpc_endpoint = ethrpc_endpoint
+    args.historical_prices_file = None
+    args.enable_metrics = False
     return args
 
 
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from rotkehlchen.assets.asset import EthereumToken
@@ -48,3 +50,30 @@ def test_get_lending_profit_for_address(aave, price_historian):  # pylint: disab
     # and 5.6 "should be" the principal balance at the given block
     assert history.total_earned['aDAI'].amount >= FVal('5.6')
     assert history.total_earned['aDAI'].usd_value >= FVal('5.6')
+
+
+def test_get_history_queries_only_touched_reserves(aave):
+    """Test that only the aTokens whose reserve the address used are queried"""
+    dai_reserve = EthereumToken('DAI').ethereum_address
+    deposit_event = {
+        'topics': ['0x00', '0x' + '00' * 12 + dai_reserve[2:].lower()],
+        'blockNumber': 10000000,
+    }
+
+    def mock_get_logs(event_name, **kwargs):  # pylint: disable=unused-argument
+        return [deposit_event] if event_name == 'Deposit' else []
+
+    queried_atokens = []
+
+    def mock_get_history_for_atoken(atoken, **kwargs):  # pylint: disable=unused-argument
+        queried_atokens.append(atoken)
+
+    with patch.object(aave.ethereum, 'get_logs', side_effect=mock_get_logs):
+        with patch.object(aave, '_get_history_for_atoken', side_effect=mock_get_history_for_atoken):  # noqa: E501
+            history = aave.get_history_for_address(
+                user_address=AAVE_TEST_ACC_2,
+                to_block=10386830,
+            )
+
+    assert queried_atokens == [EthereumToken('aDAI')]
+    assert history.events == []
@@ -1,6 +1,12 @@
+import csv
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
 
+from rotkehlchen.accounting.accountant import Accountant
 from rotkehlchen.constants.assets import A_BTC
+from rotkehlchen.csv_exporter import FILENAME_ALL_CSV, FILENAME_TRADES_CSV
 from rotkehlchen.exchanges.data_structures import MarginPosition
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.accounting import accounting_history_process
@@ -59,6 +65,61 @@ def test_simple_accounting(accountant):
     assert accountant.taxable_trade_pl.is_close("557.5284549025")
 
 
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_csv_export_after_restart(accountant, data_dir, tmpdir_factory):
+    """Test that the CSV files of a report are written in a temporary directory while
+    processing it, that they are deleted on cleanup and that the all events CSV can
+    still be exported by a new accountant, as after a restart"""
+    accounting_history_process(accountant, 1436979735, 1495751688, history1)
+    report_directory = Path(accountant.csvexporter.report_directory.name)
+    assert (report_directory / FILENAME_TRADES_CSV).exists()
+    assert data_dir not in report_directory.parents
+
+    csv_dir = Path(tmpdir_factory.mktemp('test_csv_dir'))
+    assert accountant.csvexporter.create_files(csv_dir) == (True, '')
+    assert accountant.msg_aggregator.consume_warnings() == []
+    with open(csv_dir / FILENAME_TRADES_CSV, newline='') as f:
+        trades = list(csv.DictReader(f))
+    with open(csv_dir / FILENAME_ALL_CSV, newline='') as f:
+        all_events = list(csv.DictReader(f))
+    assert len(trades) == len(all_events) == accountant.csvexporter.events_num
+    for idx, event in enumerate(all_events):
+        if event['type'] == 'sell':
+            row = idx + 2
+            assert event['net_profit_or_loss'] == f'=IF(E{row}=0,0,L{row}-M{row})'
+
+    accountant.csvexporter.cleanup()
+    assert not report_directory.exists()
+
+    new_accountant = Accountant(
+        db=accountant.db,
+        user_directory=data_dir,
+        msg_aggregator=accountant.msg_aggregator,
+        create_csv=True,
+    )
+    restart_csv_dir = Path(tmpdir_factory.mktemp('test_restart_csv_dir'))
+    assert new_accountant.csvexporter.create_files(restart_csv_dir) == (True, '')
+    assert not (restart_csv_dir / FILENAME_TRADES_CSV).exists()
+    warnings = accountant.msg_aggregator.consume_warnings()
+    assert len(warnings) == 1
+    assert 'Only the all events CSV of the last tax report could be exported' in warnings[0]
+    with open(restart_csv_dir / FILENAME_ALL_CSV, newline='') as f:
+        assert list(csv.DictReader(f)) == all_events
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_history_processing_yields_without_sleeping(accountant):
+    """Test that history processing yields to other greenlets after each time slice
+    without actually sleeping"""
+    slice_patch = patch('rotkehlchen.accounting.accountant.HISTORY_PROCESSING_TIME_SLICE', 0)
+    with slice_patch, patch('rotkehlchen.accounting.accountant.gevent.sleep') as sleep_mock:
+        accounting_history_process(accountant, 1436979735, 1495751688, history1)
+
+    assert sleep_mock.call_count == len(history1)
+    assert all(x[0] == (0,) for x in sleep_mock.call_args_list)
+    assert accountant.general_trade_pl.is_close("557.5284549025")
+
+
 @pytest.mark.parametrize('mocked_price_queries', [prices])
 def test_selling_crypto_bought_with_crypto(accountant):
     history = [{
@@ -228,7 +289,7 @@ def test_nocrypto2crypto(accountant):
     accounting_history_process(accountant, 1436979735, 1519693374, history5)
     # Expected = 3 trades + the creation of ETC and BCH after fork times
     msg = 'The crypto to crypto trades should not appear in the list at all'
-    assert len(accountant.csvexporter.all_events) == 5, msg
+    assert accountant.csvexporter.events_num == 5, msg
 
     assert accountant.general_trade_pl.is_close("264693.43364282")
     assert accountant.taxable_trade_pl.is_close("0")
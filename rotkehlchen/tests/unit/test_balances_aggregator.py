@@ -0,0 +1,49 @@
+from rotkehlchen.balances.aggregator import BalancesAggregator
+from rotkehlchen.constants.assets import A_BTC, A_ETH
+from rotkehlchen.fval import FVal
+
+
+def _balance(amount: str, usd_value: str):
+    return {'amount': FVal(amount), 'usd_value': FVal(usd_value)}
+
+
+def test_balances_aggregator_applies_source_deltas():
+    aggregator = BalancesAggregator()
+    aggregator.update_source(
+        'binance',
+        {'binance': {A_BTC: _balance('1', '10000'), A_ETH: _balance('10', '2000')}},
+    )
+    aggregator.update_source(
+        'manual',
+        {'binance': {A_ETH: _balance('5', '1000')}, 'banks': {A_BTC: _balance('1', '10000')}},
+    )
+    result = aggregator.snapshot()
+    assert result['net_usd'] == FVal('23000')
+    assert result[A_BTC]['amount'] == FVal('2')
+    assert result[A_ETH]['amount'] == FVal('15')
+    assert result[A_ETH]['usd_value'] == FVal('3000')
+    assert result['location']['binance']['usd_value'] == FVal('13000')
+    assert result['location']['banks']['usd_value'] == FVal('10000')
+
+    # Only the changed source is applied
+    aggregator.update_source(
+        'binance',
+        {'binance': {A_BTC: _balance('0.5', '5000')}},
+    )
+    result = aggregator.snapshot()
+    assert result['net_usd'] == FVal('16000')
+    assert result[A_BTC]['amount'] == FVal('1.5')
+    assert result[A_ETH]['amount'] == FVal('5')
+    assert result['location']['binance']['usd_value'] == FVal('6000')
+    assert result['location']['binance']['percentage_of_net_value'] == '37.5000%'
+
+    # Snapshots are independent of the aggregator state
+    result[A_BTC]['amount'] = FVal('100')
+    assert aggregator.snapshot()[A_BTC]['amount'] == FVal('1.5')
+
+    aggregator.remove_source('manual')
+    result = aggregator.snapshot()
+    assert A_ETH not in result
+    assert 'banks' not in result['location']
+    assert result['net_usd'] == FVal('5000')
+    assert result['location']['binance']['percentage_of_net_value'] == '100.0000%'
@@ -1,12 +1,18 @@
+from unittest.mock import patch
+
 import pytest
+import requests
 
+from rotkehlchen.chain.bitcoin import _get_url_length_chunks, get_bitcoin_addresses_balances
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
 from rotkehlchen.chain.bitcoin.utils import (
     is_valid_btc_address,
     pubkey_to_base58_address,
     pubkey_to_bech32_address,
 )
-from rotkehlchen.errors import XPUBError
+from rotkehlchen.errors import RemoteError, XPUBError
+from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.blockchain import mock_bitcoin_balances_query
 from rotkehlchen.tests.utils.factories import (
     UNIT_BTC_ADDRESS1,
     UNIT_BTC_ADDRESS2,
@@ -161,3 +167,38 @@ def test_from_bad_xpub():
         HDKey.from_xpub('xpriv68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk')  # noqa: E501
     with pytest.raises(XPUBError):
         HDKey.from_xpub('apfiv68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk')  # noqa: E501
+
+
+def test_get_url_length_chunks():
+    accounts = ['1' * 30, '2' * 30, '3' * 30, '4' * 30]
+    assert _get_url_length_chunks(accounts, '|', 61) == [accounts[:2], accounts[2:]]
+    assert _get_url_length_chunks(accounts, '|', 60) == [[x] for x in accounts]
+    assert _get_url_length_chunks(accounts, '|', 1000) == [accounts]
+    assert _get_url_length_chunks([], '|', 1000) == []
+
+
+def test_get_bitcoin_addresses_balances_partitions_by_address_type():
+    """Test that bech32 addresses go to blockcypher and all others to blockchain.info"""
+    legacy_address = '18ddjB7HWTVxzvTbLp1nWvaBxU3U2oTZF2'
+    bech32_address = 'bc1qhkje0xfvhmgk6mvanxwy09n45df03tj3h3jtnf'
+    btc_map = {legacy_address: '100000000', bech32_address: '250000000'}
+    with mock_bitcoin_balances_query(btc_map, requests.get) as requests_mock:
+        balances = get_bitcoin_addresses_balances([legacy_address, bech32_address])
+
+    assert balances == {legacy_address: FVal('1'), bech32_address: FVal('2.5')}
+    urls = [x[1]['url'] for x in requests_mock.call_args_list]
+    assert any('blockchain.info' in url and legacy_address in url for url in urls)
+    assert any('blockcypher.com' in url and bech32_address in url for url in urls)
+    assert not any('blockchain.info' in url and bech32_address in url for url in urls)
+
+
+def test_get_bitcoin_addresses_balances_missing_address():
+    """Test that an address missing from the blockchain.info response raises RemoteError"""
+    address1 = '18ddjB7HWTVxzvTbLp1nWvaBxU3U2oTZF2'
+    address2 = '1LZypJUwJJRdfdndwvDmtAjrVYaHko136r'
+    response = {'addresses': [{'address': address1, 'final_balance': 100000000, 'n_tx': 1}]}
+    with patch('rotkehlchen.chain.bitcoin.request_get_dict', return_value=response):
+        with pytest.raises(RemoteError) as e:
+            get_bitcoin_addresses_balances([address1, address2])
+
+    assert address2 in str(e.value)
@@ -1,5 +1,7 @@
 import pytest
+from web3 import Web3
 
+from rotkehlchen.chain.ethereum.contracts import ContractRegistry
 from rotkehlchen.chain.ethereum.manager import NodeName
 from rotkehlchen.constants.ethereum import ERC20TOKEN_ABI, YEARN_YCRV_VAULT
 from rotkehlchen.tests.utils.checks import assert_serialized_dicts_equal
@@ -139,3 +141,41 @@ def test_get_logs(ethereum_manager, call_order, ethereum_manager_connect_at_star
             'removed',  # returned from web3
         ],
     )
+
+
+def test_contract_registry_reuses_contracts_and_filter_params():
+    registry = ContractRegistry()
+    address = YEARN_YCRV_VAULT.address
+    contract = registry.contract(None, address, ERC20TOKEN_ABI)
+    assert registry.contract(None, address, ERC20TOKEN_ABI) is contract
+    # The node contract is made again for another web3 and the offline one is kept
+    web3_contract = registry.contract(Web3(), address, ERC20TOKEN_ABI)
+    assert registry.contract(Web3(), address, ERC20TOKEN_ABI) is not web3_contract
+    assert len(registry.contracts) == 2
+    assert registry.contract(None, address, ERC20TOKEN_ABI) is contract
+
+    argument_filters = {'from': '0x7780E86699e941254c8f4D9b7eB08FF7e96BBE10'}
+    params = registry.event_filter_params(
+        address=address,
+        abi=ERC20TOKEN_ABI,
+        event_name='Transfer',
+        argument_filters=argument_filters,
+        from_block=1,
+        to_block=10,
+    )
+    assert params['fromBlock'] == 1 and params['toBlock'] == 10
+    assert params['topics'][0] == '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'  # noqa: E501
+    assert len(registry.filter_params) == 1
+    # Modifying the returned parameters should not affect the remembered ones
+    params['topics'].append('0x00')
+    other_params = registry.event_filter_params(
+        address=address,
+        abi=ERC20TOKEN_ABI,
+        event_name='Transfer',
+        argument_filters=argument_filters,
+        from_block=20,
+        to_block='latest',
+    )
+    assert len(registry.filter_params) == 1
+    assert other_params['topics'] == params['topics'][:-1]
+    assert other_params['fromBlock'] == 20 and other_params['toBlock'] == 'latest'
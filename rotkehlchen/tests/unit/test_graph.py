@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from graphql import GraphQLError
+
+from rotkehlchen.chain.ethereum.graph import GRAPH_QUERY_LIMIT, Graph, GraphSelection
+from rotkehlchen.errors import RemoteError
+
+
+def test_graph_query_selections_combines_and_paginates(tmpdir):
+    graph = Graph('https://api.thegraph.com/subgraphs/name/foo/bar', cache_dir=tmpdir)
+    queries = []
+
+    def mock_query(querystr, param_types, param_values):  # pylint: disable=unused-argument
+        queries.append(querystr)
+        result = {'mints': [], 'burns': [{'id': 'b1'}]}
+        if 'id_gt: ""' in querystr.split('\n')[0]:
+            result['mints'] = [{'id': f'm{i:05d}'} for i in range(GRAPH_QUERY_LIMIT)]
+        else:
+            result = {'mints': [{'id': 'm99999'}]}
+        return result
+
+    selections = {
+        'mints': GraphSelection(
+            entity='mintEvents',
+            where={'to': '0xfoo', 'blockTime_gte': 5},
+            fields='id amount',
+        ),
+        'burns': GraphSelection(entity='burnEvents', where={'active': True}, fields='id'),
+    }
+    with patch.object(graph, 'query', side_effect=mock_query):
+        result = graph.query_selections(selections)
+
+    # Both selections went in the first query and only the full page was requeried
+    assert len(queries) == 2
+    assert (
+        f'mints: mintEvents(first: {GRAPH_QUERY_LIMIT}, orderBy: id, '
+        f'where: {{id_gt: "", to: "0xfoo", blockTime_gte: 5}}) {{ id amount }}'
+    ) in queries[0]
+    assert 'burns: burnEvents' in queries[0] and 'active: true' in queries[0]
+    assert 'burns' not in queries[1]
+    assert f'id_gt: "m{GRAPH_QUERY_LIMIT - 1:05d}"' in queries[1]
+    assert len(result['mints']) == GRAPH_QUERY_LIMIT + 1
+    assert result['burns'] == [{'id': 'b1'}]
+
+
+def test_graph_query_refetches_cached_schema_only_on_validation_errors(tmpdir):
+    """Test that the cached schema is deleted and fetched again only when a query
+    does not validate against it and not when there is a network problem"""
+    graph = Graph('https://api.thegraph.com/subgraphs/name/foo/bar', cache_dir=Path(tmpdir))
+    graph.schema_path.write_text(json.dumps({'__schema': {}}))
+    client = MagicMock()
+
+    with patch('rotkehlchen.chain.ethereum.graph.Client', return_value=client):
+        client.execute.side_effect = requests.exceptions.ConnectionError('Network down')
+        with pytest.raises(RemoteError):
+            graph.query('mints { id }}', param_types=None, param_values=None)
+        assert graph.schema_path.is_file()
+        assert client.execute.call_count == 1
+
+        client.execute.side_effect = [GraphQLError('Unknown field'), {'mints': []}]
+        with patch.object(graph, '_fetch_introspection', return_value={'__schema': {}}) as fetch:
+            result = graph.query('mints { id }}', param_types=None, param_values=None)
+
+    assert result == {'mints': []}
+    assert fetch.call_count == 1
+    # the mocked fetch does not cache the new schema, so the stale one is just deleted
+    assert not graph.schema_path.is_file()
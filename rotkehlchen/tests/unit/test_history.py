@@ -1,7 +1,18 @@
-from rotkehlchen.constants.assets import A_ETH
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR, A_USD
+from rotkehlchen.errors import NoPriceForGivenTimestamp, SystemPermissionError
 from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.fval import FVal
+from rotkehlchen.history import PriceHistorian
+from rotkehlchen.history.offline import OfflinePriceOracle
 from rotkehlchen.history.trades import limit_trade_list_to_period
+from rotkehlchen.inquirer import Inquirer
+from rotkehlchen.tests.fixtures.history import TEST_HISTORY_DATA_START
+from rotkehlchen.tests.utils.history import replace_price_historian_instance
 from rotkehlchen.typing import Location, TradeType
 
 
@@ -57,3 +68,71 @@ def test_limit_trade_list_to_period():
     assert limit_trade_list_to_period(full_list, 1459427707, 1459427707) == [trade1]
     assert limit_trade_list_to_period(full_list, 1469427707, 1469427707) == [trade2]
     assert limit_trade_list_to_period(full_list, 1479427707, 1479427707) == [trade3]
+
+
+def test_offline_price_oracle(data_dir):
+    oracle = OfflinePriceOracle(data_dir / 'prices.db')
+    oracle.add_prices(A_BTC, A_USD, [(1000, FVal(8000)), (2000, FVal(10000))])
+    oracle.add_prices(A_ETH, A_USD, [(1000, FVal(200)), (2000, FVal(250))])
+    oracle.add_prices(A_EUR, A_USD, [(1000, FVal('1.25'))])
+
+    # the last price at or before the timestamp is used
+    assert oracle.query_historical_price(A_BTC, A_USD, 1000) == FVal(8000)
+    assert oracle.query_historical_price(A_BTC, A_USD, 1999) == FVal(8000)
+    assert oracle.query_historical_price(A_BTC, A_USD, 5000) == FVal(10000)
+    # inverse pairs and pairs without their own series are derived
+    assert oracle.query_historical_price(A_USD, A_BTC, 2000) == FVal('0.0001')
+    assert oracle.query_historical_price(A_BTC, A_EUR, 1500) == FVal(6400)
+    assert oracle.query_historical_price(A_ETH, A_BTC, 2000) == FVal('0.025')
+    assert oracle.query_historical_price(A_ETH, A_ETH, 1) == FVal(1)
+    with pytest.raises(NoPriceForGivenTimestamp):
+        oracle.query_historical_price(A_BTC, A_USD, 999)
+
+    # new prices replace the old ones and are persisted in the file
+    oracle.add_prices(A_BTC, A_USD, [(2000, FVal(11000))])
+    oracle.close()
+    oracle = OfflinePriceOracle(data_dir / 'prices.db', read_only=True)
+    assert oracle.query_historical_price(A_BTC, A_USD, 2000) == FVal(11000)
+    with pytest.raises(sqlite3.OperationalError):
+        oracle.add_prices(A_BTC, A_USD, [(3000, FVal(12000))])
+    oracle.close()
+
+
+def test_offline_price_oracle_read_only_needs_price_file(data_dir):
+    with pytest.raises(SystemPermissionError):
+        OfflinePriceOracle(data_dir / 'missing_prices.db', read_only=True)
+    assert not (data_dir / 'missing_prices.db').exists()
+
+    not_a_price_file = data_dir / 'not_prices.db'
+    not_a_price_file.write_text('foo')
+    with pytest.raises(SystemPermissionError):
+        OfflinePriceOracle(not_a_price_file, read_only=True)
+
+
+def test_price_historian_uses_only_offline_oracle(data_dir, cryptocompare):
+    """Test that with an offline oracle no online price source is ever queried"""
+    oracle = OfflinePriceOracle(data_dir / 'prices.db')
+    oracle.add_prices(A_EUR, A_USD, [(1000, FVal('1.1'))])
+    oracle.add_prices(A_ETH, A_EUR, [(1000, FVal(200))])
+    previous_historian = replace_price_historian_instance(None)
+    historian = PriceHistorian(
+        data_directory=data_dir,
+        history_date_start=TEST_HISTORY_DATA_START,
+        cryptocompare=cryptocompare,
+        offline_oracle=oracle,
+    )
+
+    cc_patch = patch.object(cryptocompare, 'query_historical_price', side_effect=AssertionError)
+    fiat_patch = patch.object(
+        Inquirer,
+        'query_historical_fiat_exchange_rates',
+        side_effect=AssertionError,
+    )
+    with cc_patch, fiat_patch:
+        assert historian.query_historical_price(A_EUR, A_USD, 1500) == FVal('1.1')
+        assert historian.query_historical_price(A_ETH, A_EUR, 1500) == FVal(200)
+        with pytest.raises(NoPriceForGivenTimestamp):
+            historian.query_historical_price(A_BTC, A_EUR, 1500)
+
+    replace_price_historian_instance(previous_historian)
+    oracle.close()
@@ -3,7 +3,8 @@ from unittest.mock import patch
 import pytest
 import requests
 
-from rotkehlchen.constants.assets import A_CNY, A_EUR, A_GBP, A_JPY, A_USD
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants.assets import A_BTC, A_CNY, A_ETH, A_EUR, A_GBP, A_JPY, A_USD
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import _query_exchanges_rateapi
 from rotkehlchen.tests.utils.mock import MockResponse
@@ -74,3 +75,48 @@ def test_fallback_to_cached_values_within_a_month(inquirer):  # pylint: disable=
         # The cached response for EUR CNY is too old so we will fail here
         with pytest.raises(ValueError):
             result = inquirer.query_fiat_pair(A_EUR, A_CNY)
+
+
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_find_usd_prices_bulk_and_cached(inquirer):
+    """Test that multiple usd prices are queried in bulk and are then cached"""
+    queried_urls = []
+
+    def mock_cryptocompare(url):
+        queried_urls.append(url)
+        return MockResponse(200, '{"BTC": {"USD": 10500.1}, "ETH": {"USD": 350}}')
+
+    cc_patch = patch.object(inquirer._cryptocompare.session, 'get', side_effect=mock_cryptocompare)
+    unknown_asset = Asset('XMR')  # not in the mocked response
+    with cc_patch:
+        result = inquirer.find_usd_prices([A_BTC, A_ETH, unknown_asset])
+        assert result == {A_BTC: FVal('10500.1'), A_ETH: FVal(350), unknown_asset: FVal(0)}
+        assert len(queried_urls) == 1
+        assert 'pricemulti?fsyms=BTC,ETH,XMR&tsyms=USD' in queried_urls[0]
+
+        # Now the prices should come from the cache. Only the unknown asset is requeried
+        assert inquirer.find_usd_price(A_BTC) == FVal('10500.1')
+        result = inquirer.find_usd_prices([A_ETH, unknown_asset])
+        assert result == {A_ETH: FVal(350), unknown_asset: FVal(0)}
+        assert len(queried_urls) == 2
+        assert 'pricemulti?fsyms=XMR&tsyms=USD' in queried_urls[1]
+
+        # and ignoring the cache queries everything again
+        inquirer.find_usd_prices([A_BTC, A_ETH], ignore_cache=True)
+        assert len(queried_urls) == 3
+
+
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_find_usd_prices_failed_bulk_query(inquirer):
+    """Test that if the bulk query fails the prices are queried one by one
+    and that the assets whose query still fails are left out"""
+    def mock_cryptocompare(url):
+        if 'price?fsym=BTC&' in url:
+            return MockResponse(200, '{"USD": 10500.1}')
+        return MockResponse(200, 'invalid json')
+
+    cc_patch = patch.object(inquirer._cryptocompare.session, 'get', side_effect=mock_cryptocompare)
+    with cc_patch:
+        result = inquirer.find_usd_prices([A_BTC, A_ETH])
+
+    assert result == {A_BTC: FVal('10500.1')}
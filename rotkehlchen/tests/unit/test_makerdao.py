@@ -1,19 +1,33 @@
+from unittest.mock import MagicMock, patch
+
 import pytest
 from web3 import Web3
 
 from rotkehlchen.accounting.structures import Balance
+from rotkehlchen.chain.ethereum.makerdao.common import RAY
+from rotkehlchen.chain.ethereum.makerdao.dsr import (
+    POT_CREATION_CHI_POINT,
+    DSRAccountReport,
+    MakerDAODSR,
+    _chi_at,
+    _rpow,
+)
 from rotkehlchen.chain.ethereum.makerdao.vaults import (
     MakerDAOVault,
     MakerDAOVaults,
     get_vault_normalized_balance,
 )
+from rotkehlchen.chain.ethereum.structures import DSRChiPoint
 from rotkehlchen.constants.assets import A_ETH
 from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.errors import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.premium.premium import Premium
 from rotkehlchen.tests.utils.constants import A_BAT
 from rotkehlchen.tests.utils.factories import make_ethereum_address
 from rotkehlchen.tests.utils.makerdao import VaultTestData, create_web3_mock
+from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.typing import Timestamp
 
 
 def assert_vaults_equal(a: MakerDAOVault, b: MakerDAOVault) -> None:
@@ -140,3 +154,63 @@ def test_get_vault_normalized_balance(
     )
     expected_result = Balance(amount=FVal('89.9'), usd_value=FVal('17980'))
     assert get_vault_normalized_balance(vault) == expected_result
+
+
+def test_dsr_chi_series_calculation():
+    """Test that chi is compounded from the chi series points like the Pot contract does"""
+    assert _rpow(RAY, 12345, RAY) == RAY
+    assert _rpow(0, 0, RAY) == RAY
+    assert _rpow(0, 5, RAY) == 0
+    # 8% DSR per year
+    dsr = 1000000002440418608258400030
+    assert FVal(_rpow(dsr, 31536000, RAY) / RAY).is_close(FVal('1.08'))
+
+    # With a DSR of 0% chi stays the same
+    later = Timestamp(POT_CREATION_CHI_POINT.timestamp + 1000)
+    assert _chi_at(POT_CREATION_CHI_POINT, later) == RAY
+    point = DSRChiPoint(timestamp=later, chi=RAY, dsr=dsr)
+    assert _chi_at(point, later) == RAY
+    year_later_chi = _chi_at(point, Timestamp(later + 31536000))
+    assert FVal(year_later_chi / RAY).is_close(FVal('1.08'))
+
+
+def test_dsr_gains_in_period_failure_only_skips_the_account():
+    """Test that failing to get the DSR gains of one account does not discard the
+    gains of the other accounts"""
+    msg_aggregator = MessagesAggregator()
+    dsr = MakerDAODSR(
+        ethereum_manager=MagicMock(),
+        database=MagicMock(),
+        premium=None,
+        msg_aggregator=msg_aggregator,
+    )
+    address1 = make_ethereum_address()
+    address2 = make_ethereum_address()
+    history = {
+        address1: DSRAccountReport(movements=[], gain_so_far=1, gain_so_far_usd_value=ZERO),
+        address2: DSRAccountReport(movements=[], gain_so_far=2, gain_so_far_usd_value=ZERO),
+    }
+    chi_series_updates = 0
+
+    def mock_update_chi_series():
+        nonlocal chi_series_updates
+        chi_series_updates += 1
+        if chi_series_updates == 1:
+            raise RemoteError('Connection lost')
+
+    history_patch = patch.object(dsr, 'get_historical_dsr', return_value=history)
+    update_patch = patch.object(dsr, '_update_chi_series', side_effect=mock_update_chi_series)
+    gain_patch = patch.object(
+        dsr,
+        '_get_dsr_account_gain_in_period',
+        return_value=(FVal(1), Timestamp(2)),
+    )
+    with history_patch, update_patch, gain_patch:
+        gains = dsr.get_dsr_gains_in_period(from_ts=Timestamp(1), to_ts=Timestamp(2))
+
+    assert gains == [(FVal(1), Timestamp(2))]
+    # The chi series update is tried again for the next account, but only until it works
+    assert chi_series_updates == 2
+    warnings = msg_aggregator.consume_warnings()
+    assert len(warnings) == 1
+    assert f'Failed to get DSR gains for {address1}' in warnings[0]
@@ -0,0 +1,67 @@
+from rotkehlchen.metrics import MetricsRegistry, metrics, timed
+
+
+def test_metrics_registry_render():
+    registry = MetricsRegistry()
+    registry.enabled = True
+    registry.inc('rotki_requests_total', exchange='kraken', status=200)
+    registry.inc('rotki_requests_total', 2, exchange='kraken', status=200)
+    registry.inc('rotki_requests_total', exchange='bin"ance', status=429)
+    registry.observe('rotki_query_seconds', 0.003)
+    registry.observe('rotki_query_seconds', 0.2)
+    registry.observe('rotki_query_seconds', 20)
+
+    assert registry.render() == (
+        '# TYPE rotki_requests_total counter\n'
+        'rotki_requests_total{exchange="bin\\"ance",status="429"} 1\n'
+        'rotki_requests_total{exchange="kraken",status="200"} 3\n'
+        '# TYPE rotki_query_seconds histogram\n'
+        'rotki_query_seconds_bucket{le="0.005"} 1\n'
+        'rotki_query_seconds_bucket{le="0.01"} 1\n'
+        'rotki_query_seconds_bucket{le="0.025"} 1\n'
+        'rotki_query_seconds_bucket{le="0.05"} 1\n'
+        'rotki_query_seconds_bucket{le="0.1"} 1\n'
+        'rotki_query_seconds_bucket{le="0.25"} 2\n'
+        'rotki_query_seconds_bucket{le="0.5"} 2\n'
+        'rotki_query_seconds_bucket{le="1.0"} 2\n'
+        'rotki_query_seconds_bucket{le="2.5"} 2\n'
+        'rotki_query_seconds_bucket{le="5.0"} 2\n'
+        'rotki_query_seconds_bucket{le="10.0"} 2\n'
+        'rotki_query_seconds_bucket{le="+Inf"} 3\n'
+        'rotki_query_seconds_sum 20.203\n'
+        'rotki_query_seconds_count 3\n'
+    )
+
+
+def test_metrics_disabled_records_nothing():
+    registry = MetricsRegistry()
+    registry.inc('rotki_requests_total')
+    registry.observe('rotki_query_seconds', 1)
+    with registry.timer('rotki_query_seconds'):
+        pass
+
+    assert registry.counters == {}
+    assert registry.histograms == {}
+    assert registry.render() == ''
+
+
+def test_timed_decorator():
+    @timed('rotki_function_seconds', method='foo')
+    def foo(a, b):
+        return a + b
+
+    metrics.reset()
+    try:
+        assert foo(1, b=2) == 3
+        assert metrics.histograms == {}
+        metrics.enabled = True
+        assert foo(1, b=2) == 3
+        with metrics.timer('rotki_function_seconds', method='bar'):
+            pass
+    finally:
+        metrics.enabled = False
+
+    histograms = metrics.histograms['rotki_function_seconds']
+    assert histograms[(('method', 'foo'),)].count == 1
+    assert histograms[(('method', 'bar'),)].count == 1
+    metrics.reset()
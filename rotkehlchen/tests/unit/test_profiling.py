@@ -0,0 +1,44 @@
+import time
+
+import gevent
+import greenlet
+
+from rotkehlchen.utils.profiling import SamplingProfiler
+
+
+def test_sampling_profiler_collapsed_stacks():
+    """Test that the profiler samples both the running and the waiting greenlets"""
+
+    def busy_function():
+        end = time.monotonic() + 0.3
+        while time.monotonic() < end:
+            sum(range(1000))
+
+    def waiting_function():
+        gevent.sleep(0.3)
+
+    profiler = SamplingProfiler(interval=0.01)
+    profiler.start()
+    greenlets = [gevent.spawn(waiting_function), gevent.spawn(busy_function)]
+    gevent.joinall(greenlets)
+    result = profiler.stop()
+
+    assert profiler.samples_num > 0
+    assert greenlet.gettrace() is None
+    stacks = {}
+    for line in result.splitlines():
+        stack, count = line.rsplit(' ', 1)
+        stacks[stack] = int(count)
+
+    assert sum(stacks.values()) >= profiler.samples_num
+    assert any(
+        x.startswith('running;') and 'busy_function' in x for x in stacks
+    ), 'the busy greenlet should have been sampled while running'
+    assert any(
+        x.startswith('waiting;') and 'waiting_function' in x for x in stacks
+    ), 'the sleeping greenlet should have been sampled while waiting'
+
+    # Stopping again does not sample any more
+    samples_num = profiler.samples_num
+    time.sleep(0.05)
+    assert profiler.samples_num == samples_num
@@ -15,6 +15,7 @@ from rotkehlchen.utils.serialization import (
     rkl_decode_value,
     rlk_jsondumps,
     rlk_jsonloads,
+    rlk_jsonloads_dict,
 )
 
 
@@ -40,6 +41,28 @@ def test_rlk_jsonloads():
     }
 
 
+def test_rlk_jsonloads_with_numeric_keys():
+    """Test that when numeric keys are given only those get decoded as numbers"""
+    data = (
+        '{"status": "1", "message": "OK", "result": [{"blockNumber": "10", '
+        '"hash": "0xfoo", "nonce": "5", "value": "1.5"}], "price": 1.1, "time": 5}'
+    )
+    result = rlk_jsonloads_dict(data, numeric_keys={'status', 'nonce'})
+    assert result == {
+        'status': 1,
+        'message': 'OK',
+        'result': [{'blockNumber': '10', 'hash': '0xfoo', 'nonce': 5, 'value': '1.5'}],
+        'price': FVal('1.1'),
+        'time': 5,
+    }
+    # with no numeric keys it's plain json but with floats as FVals
+    result = rlk_jsonloads_dict(data, numeric_keys=frozenset())
+    assert result['status'] == '1'
+    assert result['result'][0]['nonce'] == '5'
+    assert result['price'] == FVal('1.1')
+    assert result['time'] == 5
+
+
 data = {
     'a': FVal('5.4'),
     'b': 'foo',
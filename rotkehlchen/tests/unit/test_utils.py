@@ -5,11 +5,15 @@ from unittest.mock import patch
 import pytest
 from hexbytes import HexBytes
 
+from rotkehlchen.accounting.structures import DefiEvent, DefiEventType
+from rotkehlchen.constants.assets import A_DAI
 from rotkehlchen.errors import ConversionError, UnprocessableTradePair
 from rotkehlchen.exchanges.data_structures import invert_pair
 from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.serialize import process_result
 from rotkehlchen.tests.utils.mock import MockResponse
+from rotkehlchen.typing import Timestamp
+from rotkehlchen.utils.accounting import merge_sorted_actions
 from rotkehlchen.utils.interfaces import CacheableObject, cache_response_timewise
 from rotkehlchen.utils.misc import (
     combine_dicts,
@@ -250,3 +254,34 @@ def test_convert_to_int():
     assert convert_to_int(b'5.44', accept_only_exact=False) == 5
     assert convert_to_int(b'5.65', accept_only_exact=False) == 5
     assert convert_to_int(b'4', accept_only_exact=False) == 4
+
+
+def test_merge_sorted_actions():
+    """Test that sorted action sources are merged by timestamp keeping the source order
+    for equal timestamps, and that an unsorted source is sorted first"""
+    def make_event(timestamp, event_type):
+        return DefiEvent(
+            timestamp=Timestamp(timestamp),
+            event_type=event_type,
+            asset=A_DAI,
+            amount=FVal(1),
+        )
+
+    first = [
+        make_event(1, DefiEventType.DSR_LOAN_GAIN),
+        make_event(5, DefiEventType.DSR_LOAN_GAIN),
+    ]
+    second = [
+        make_event(5, DefiEventType.AAVE_LOAN_INTEREST),
+        make_event(2, DefiEventType.AAVE_LOAN_INTEREST),
+    ]
+    third = [make_event(3, DefiEventType.COMPOUND_REWARDS)]
+
+    result = list(merge_sorted_actions([first, second, [], third]))
+    assert [(x.timestamp, x.event_type) for x in result] == [
+        (1, DefiEventType.DSR_LOAN_GAIN),
+        (2, DefiEventType.AAVE_LOAN_INTEREST),
+        (3, DefiEventType.COMPOUND_REWARDS),
+        (5, DefiEventType.DSR_LOAN_GAIN),
+        (5, DefiEventType.AAVE_LOAN_INTEREST),
+    ]
@@ -1,9 +1,13 @@
 import warnings as test_warnings
+from unittest.mock import patch
 
 import pytest
 
 from rotkehlchen.chain.ethereum.zerion import Zerion
 from rotkehlchen.fval import FVal
+from rotkehlchen.inquirer import Inquirer
+from rotkehlchen.tests.utils.factories import make_ethereum_address
+from rotkehlchen.typing import Price
 
 
 @pytest.mark.parametrize('mocked_current_prices', [{
@@ -36,3 +40,43 @@ def test_query_all_protocol_balances_for_account(
     assert len(errors) == 0
     warnings = function_scope_messages_aggregator.consume_warnings()
     assert len(warnings) == 0
+
+
+def test_all_balances_for_accounts_finds_each_price_once(
+        ethereum_manager,
+        function_scope_messages_aggregator,
+):
+    """Test that querying many accounts finds the price of each distinct token only once"""
+    zerion = Zerion(
+        ethereum_manager,
+        function_scope_messages_aggregator,
+        contract_address='0x06FE76B2f432fdfEcAEf1a7d4f6C3d41B5861672',
+    )
+    dai_metadata = ('0x6B175474E89094C44Da98b954EedeAC495271d0F', 'Dai Stablecoin', 'DAI', 18)
+    raw_result = [(
+        ('Compound', 'Decentralized lending', 'compound.finance', 'compound.png', 1),
+        [(('0x0000000000000000000000000000000000000001', 'Asset'), [
+            ((dai_metadata, 10 ** 18), [(dai_metadata, 10 ** 18)]),
+        ])],
+    )]
+    accounts = [make_ethereum_address() for _ in range(3)]
+    empty_account = make_ethereum_address()
+
+    def mock_call_contract(arguments, **kwargs):  # pylint: disable=unused-argument
+        return [] if arguments[0] == empty_account else raw_result
+
+    price_patch = patch.object(Inquirer, 'find_usd_price', return_value=Price(FVal('1.01')))
+    defi_price_patch = patch(
+        'rotkehlchen.chain.ethereum.zerion.handle_defi_price_query',
+        return_value=None,
+    )
+    with patch.object(ethereum_manager, 'call_contract', side_effect=mock_call_contract):
+        with price_patch as price_mock, defi_price_patch as defi_price_mock:
+            result = zerion.all_balances_for_accounts(accounts + [empty_account])
+
+    assert set(result.keys()) == set(accounts)
+    for balances in result.values():
+        assert len(balances) == 1
+        assert balances[0].base_balance.balance.usd_value == FVal('1.01')
+    assert price_mock.call_count == 1
+    assert defi_price_mock.call_count == 1
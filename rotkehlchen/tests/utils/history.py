@@ -8,6 +8,7 @@ from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.exchanges.data_structures import AssetMovement, Loan, MarginPosition, Trade
 from rotkehlchen.externalapis.etherscan import Etherscan
 from rotkehlchen.fval import FVal
+from rotkehlchen.history import PriceHistorian
 from rotkehlchen.rotkehlchen import Rotkehlchen
 from rotkehlchen.serialization.serialize import process_result_list
 from rotkehlchen.tests.utils.constants import (
@@ -1037,6 +1038,18 @@ def assert_poloniex_trades_result(
             raise AssertionError('index out of range')
 
 
+def replace_price_historian_instance(
+        instance: Optional[PriceHistorian],
+) -> Optional[PriceHistorian]:
+    """Sets the PriceHistorian singleton instance and returns the one it replaced
+
+    With None the next PriceHistorian() call creates a new instance.
+    """
+    previous = getattr(PriceHistorian, '_PriceHistorian__instance')
+    setattr(PriceHistorian, '_PriceHistorian__instance', instance)
+    return previous
+
+
 def maybe_mock_historical_price_queries(
         historian,
         should_mock_price_queries: bool,
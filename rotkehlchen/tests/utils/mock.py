@@ -1,6 +1,6 @@
 import json
 from collections import namedtuple
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
 from hexbytes import HexBytes
 
@@ -15,6 +15,13 @@ class MockResponse():
     def json(self) -> Dict[str, Any]:
         return json.loads(self.text)
 
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        for idx in range(0, len(self.content), chunk_size):
+            yield self.content[idx:idx + chunk_size]
+
+    def close(self) -> None:
+        pass
+
 
 class MockEth():
 
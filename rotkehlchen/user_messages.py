@@ -1,22 +1,47 @@
 import logging
 from collections import deque
-from typing import Deque, List
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from rotkehlchen.api.notifier import Notifier
 
 logger = logging.getLogger(__name__)
 
 
+class NotificationType(Enum):
+    TASK_COMPLETED = 1
+    WARNING = 2
+    ERROR = 3
+    BALANCE_UPDATE = 4
+
+    def __str__(self) -> str:
+        return self.name.lower()  # pylint: disable=no-member
+
+
 class MessagesAggregator():
     """
     This class is passed around where needed and aggreggates messages for the user
+
+    If a notifier is set and has subscribers then messages are pushed to them as
+    they happen instead of waiting in the queues to be consumed
     """
 
     def __init__(self) -> None:
         self.warnings: Deque = deque()
         self.errors: Deque = deque()
+        self.notifier: Optional['Notifier'] = None
+
+    def _push(self, notification_type: NotificationType, data: Any) -> bool:
+        if self.notifier is None:
+            return False
+
+        return self.notifier.broadcast(notification_type, data)
 
     def add_warning(self, msg: str) -> None:
         logger.warning(msg)
-        self.warnings.appendleft(msg)
+        if not self._push(NotificationType.WARNING, msg):
+            self.warnings.appendleft(msg)
 
     def consume_warnings(self) -> List[str]:
         result = []
@@ -26,10 +51,18 @@ class MessagesAggregator():
 
     def add_error(self, msg: str) -> None:
         logger.error(msg)
-        self.errors.appendleft(msg)
+        if not self._push(NotificationType.ERROR, msg):
+            self.errors.appendleft(msg)
 
     def consume_errors(self) -> List[str]:
         result = []
         while len(self.errors) != 0:
             result.append(self.errors.pop())
         return result
+
+    def add_balance_update(self, location: str, balances: Dict[str, Any]) -> None:
+        """Pushes the freshly queried balances of a single location to subscribers
+
+        Unlike warnings and errors there is nothing to queue here if nobody listens
+        since the full balances are anyway returned by the balances query"""
+        self._push(NotificationType.BALANCE_UPDATE, {'location': location, 'balances': balances})
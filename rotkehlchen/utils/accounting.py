@@ -1,4 +1,6 @@
-from typing import Optional, Tuple, Union
+import heapq
+from itertools import islice
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 
 from rotkehlchen.accounting.structures import DefiEvent
 from rotkehlchen.assets.asset import Asset
@@ -61,3 +63,23 @@ def action_get_assets(
         return action.currency, None
 
     raise AssertionError(f'TaxableAction of unknown type {type(action)} encountered')
+
+
+def merge_sorted_actions(sources: List[Sequence[TaxableAction]]) -> Iterator[TaxableAction]:
+    """Lazily merges the given sources of actions into one stream ordered by timestamp
+
+    Each source is expected to already be ordered by timestamp, as is the case for
+    most of them. Any source that turns out not to be is sorted first. Actions with
+    the same timestamp come in the order of their sources.
+    """
+    sorted_sources = []
+    for source in sources:
+        is_sorted = all(
+            action_get_timestamp(action) <= action_get_timestamp(next_action)
+            for action, next_action in zip(source, islice(source, 1, None))
+        )
+        sorted_sources.append(
+            source if is_sorted else sorted(source, key=action_get_timestamp),
+        )
+
+    return heapq.merge(*sorted_sources, key=action_get_timestamp)
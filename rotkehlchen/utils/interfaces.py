@@ -1,9 +1,12 @@
+import time
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
+from contextlib import contextmanager
 from functools import wraps
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Iterator
 
-from gevent.lock import Semaphore
+import gevent
+from gevent.lock import BoundedSemaphore, Semaphore
 
 from rotkehlchen.constants import CACHE_RESPONSE_FOR_SECS
 from rotkehlchen.typing import ChecksumEthAddress, ResultCache
@@ -115,6 +118,33 @@ def protect_with_lock(arguments_matter: bool = False) -> Callable:
     return _cache_response_timewise
 
 
+class QueryRateLimiter():
+    """Keeps concurrent queries to an API within its rate limits
+
+    At most `max_concurrent` queries are in flight at any time and consecutive
+    queries start at least 1 / `max_per_second` seconds apart, in the order
+    in which they asked to start.
+    """
+
+    def __init__(self, max_concurrent: int, max_per_second: float) -> None:
+        self.slots = BoundedSemaphore(max_concurrent)
+        self.start_lock = Semaphore()
+        self.interval = 1 / max_per_second
+        self.next_start = 0.0
+
+    @contextmanager
+    def limit(self) -> Iterator[None]:
+        with self.slots:
+            with self.start_lock:
+                now = time.monotonic()
+                if self.next_start > now:
+                    gevent.sleep(self.next_start - now)
+                    now = self.next_start
+                self.next_start = now + self.interval
+
+            yield
+
+
 class EthereumModule(metaclass=ABCMeta):
     """Interface to be followed by all Ethereum modules"""
 
@@ -0,0 +1,115 @@
+import logging
+import os
+import sys
+import weakref
+from collections import defaultdict
+from types import FrameType
+from typing import Any, DefaultDict, List, Optional, Tuple
+
+import gevent
+import greenlet
+from gevent.monkey import get_original
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# The sampler needs a real OS thread so that it runs even while a greenlet hogs
+# the CPU. Get the originals in case gevent has monkey patched the modules.
+_start_new_thread = get_original('_thread', 'start_new_thread')
+_allocate_lock = get_original('_thread', 'allocate_lock')
+_get_ident = get_original('_thread', 'get_ident')
+_sleep = get_original('time', 'sleep')
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class SamplingProfiler():
+    """A sampling profiler over all greenlets of the thread that starts it
+
+    A native thread wakes up every `interval` seconds and records the stack that
+    is currently running and the stacks of all greenlets that are waiting to run,
+    for example for a network response. Stacks are prefixed by `running` or
+    `waiting` respectively. Only greenlets that switched since profiling started
+    are known to the profiler.
+
+    Nothing is installed until start() is called and everything is removed at
+    stop(), so the profiler costs nothing while inactive.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.samples_num = 0
+        self.stacks: DefaultDict[str, int] = defaultdict(int)
+        self.running = False
+        self.lock = _allocate_lock()
+        self.greenlets: 'weakref.WeakSet[greenlet.greenlet]' = weakref.WeakSet()
+        self.hub: Optional[greenlet.greenlet] = None
+        self.thread_id: Optional[int] = None
+        self.previous_tracer: Optional[Any] = None
+
+    def _trace(self, event: str, args: Tuple[greenlet.greenlet, greenlet.greenlet]) -> None:
+        if event in ('switch', 'throw'):
+            self.greenlets.update(args)
+        if self.previous_tracer is not None:
+            self.previous_tracer(event, args)
+
+    def _add_stack(self, prefix: str, frame: Optional[FrameType]) -> None:
+        names: List[str] = []
+        while frame is not None:
+            names.append(_frame_name(frame))
+            frame = frame.f_back
+
+        names.append(prefix)
+        self.stacks[';'.join(reversed(names))] += 1
+
+    def _sample(self) -> None:
+        self._add_stack('running', sys._current_frames().get(self.thread_id))  # type: ignore
+        try:
+            greenlets = list(self.greenlets)
+        except RuntimeError:  # a greenlet was added while copying. Skip them this time
+            greenlets = []
+
+        for waiting in greenlets:
+            # The running greenlet has no gr_frame and the hub's waiting stack is meaningless
+            if waiting is self.hub or waiting.dead or waiting.gr_frame is None:
+                continue
+            self._add_stack('waiting', waiting.gr_frame)
+
+        self.samples_num += 1
+
+    def _sampling_loop(self) -> None:
+        while True:
+            _sleep(self.interval)
+            with self.lock:
+                if not self.running:
+                    return
+                self._sample()
+
+    def start(self) -> None:
+        """Starts sampling all greenlets of the current thread"""
+        self.hub = gevent.get_hub()
+        self.thread_id = _get_ident()
+        self.previous_tracer = greenlet.settrace(self._trace)
+        self.running = True
+        _start_new_thread(self._sampling_loop, ())
+        log.debug('Started sampling profiler', interval=self.interval)
+
+    def stop(self) -> str:
+        """Stops sampling and returns the sampled stacks in the collapsed stacks format
+
+        Each line is a semicolon separated stack, from the root to the leaf frame,
+        followed by a space and the number of samples it was seen in. This is the
+        input format of flamegraph.pl, speedscope and most other flamegraph tools.
+        """
+        with self.lock:
+            self.running = False
+        greenlet.settrace(self.previous_tracer)
+        self.greenlets.clear()
+        log.debug('Stopped sampling profiler', samples_num=self.samples_num)
+
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(self.stacks.items()))
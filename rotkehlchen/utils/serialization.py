@@ -1,5 +1,5 @@
 import json
-from typing import Any, Dict, List, Union
+from typing import AbstractSet, Any, Dict, List, Optional, Union
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.fval import FVal
@@ -18,6 +18,36 @@ class RKLDecoder(json.JSONDecoder):
         return rkl_decode_value(obj)
 
 
+class RKLSchemaDecoder(json.JSONDecoder):
+    """A decoder that only attempts numeric conversion for the given keys
+
+    Floats are always turned into FVals at parse time. String values are left
+    untouched unless they are found under one of the keys in `numeric_keys`, in
+    which case they are decoded the same way rkl_decode_value would decode them.
+    With no numeric keys given this is plain json decoding and no python level
+    object hook runs at all.
+    """
+
+    def __init__(
+            self,
+            *args: Any,
+            numeric_keys: AbstractSet[str] = frozenset(),
+            **kwargs: Any,
+    ) -> None:
+        self.numeric_keys = numeric_keys
+        if len(numeric_keys) != 0:
+            kwargs['object_hook'] = self.object_hook
+        kwargs['parse_float'] = FVal
+        json.JSONDecoder.__init__(self, *args, **kwargs)
+
+    def object_hook(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        for key in self.numeric_keys:
+            value = obj.get(key, None)
+            if isinstance(value, (bytes, str)):
+                obj[key] = rkl_decode_value(value)
+        return obj
+
+
 class RKLEncoder(json.JSONEncoder):
     def default(self, obj: Any) -> Any:
         if isinstance(obj, FVal):
@@ -43,18 +73,38 @@ class RKLEncoder(json.JSONEncoder):
         return super().encode(self._encode(obj))
 
 
-def rlk_jsonloads(data: str) -> Union[Dict, List]:
-    return json.loads(data, cls=RKLDecoder)
+def rlk_jsonloads(
+        data: str,
+        numeric_keys: Optional[AbstractSet[str]] = None,
+) -> Union[Dict, List]:
+    """Loads json data coming from outside the app
+
+    If `numeric_keys` is None then every string in the data is speculatively
+    decoded into an int or an FVal. This is slow for big payloads full of hashes
+    and addresses, so callers who know their schema should provide the set of keys
+    whose values are numeric. Then only those are decoded and everything else is
+    parsed as plain json, with floats still turned into FVals.
+    """
+    if numeric_keys is None:
+        return json.loads(data, cls=RKLDecoder)
+
+    return json.loads(data, cls=RKLSchemaDecoder, numeric_keys=numeric_keys)
 
 
-def rlk_jsonloads_dict(data: str) -> Dict[str, Any]:
-    value = rlk_jsonloads(data)
+def rlk_jsonloads_dict(
+        data: str,
+        numeric_keys: Optional[AbstractSet[str]] = None,
+) -> Dict[str, Any]:
+    value = rlk_jsonloads(data, numeric_keys=numeric_keys)
     assert isinstance(value, dict)
     return value
 
 
-def rlk_jsonloads_list(data: str) -> List:
-    value = rlk_jsonloads(data)
+def rlk_jsonloads_list(
+        data: str,
+        numeric_keys: Optional[AbstractSet[str]] = None,
+) -> List:
+    value = rlk_jsonloads(data, numeric_keys=numeric_keys)
     assert isinstance(value, list)
     return value
 
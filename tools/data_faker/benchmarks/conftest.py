@@ -0,0 +1,41 @@
+from functools import lru_cache
+from typing import List, Tuple
+
+import pytest
+from data_faker.dataset import generate_trades
+
+from rotkehlchen.exchanges.data_structures import Trade
+from rotkehlchen.tests.fixtures import *  # noqa: F401,F403
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--initial-port',
+        type=int,
+        default=29870,
+        help='Base port number used to avoid conflicts while running parallel tests.',
+    )
+    parser.addoption(
+        '--trades-numbers',
+        default='10000',
+        help='Comma separated sizes of the benchmarked trade datasets. e.g. 10000,100000,1000000',
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'trades_number' in metafunc.fixturenames:
+        trades_numbers = [
+            int(x) for x in metafunc.config.getoption('--trades-numbers').split(',')
+        ]
+        metafunc.parametrize('trades_number', trades_numbers, ids=str)
+
+
+@lru_cache(maxsize=None)
+def _cached_trades(trades_number: int) -> Tuple[Trade, ...]:
+    """Generating the big datasets takes a while so each size is generated only once"""
+    return tuple(generate_trades(trades_number))
+
+
+@pytest.fixture
+def trades(trades_number) -> List[Trade]:
+    return list(_cached_trades(trades_number))
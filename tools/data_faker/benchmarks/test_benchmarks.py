@@ -0,0 +1,101 @@
+from contextlib import ExitStack
+
+import pytest
+from data_faker.dataset import BASE_USD_PRICES, FakePriceOracle, write_price_file
+
+from rotkehlchen.history import PriceHistorian
+from rotkehlchen.serialization.serialize import process_result
+from rotkehlchen.tests.fixtures.history import TEST_HISTORY_DATA_START
+from rotkehlchen.tests.utils.factories import UNIT_BTC_ADDRESS1, UNIT_BTC_ADDRESS2
+from rotkehlchen.tests.utils.history import replace_price_historian_instance
+from rotkehlchen.tests.utils.rotkehlchen import setup_balances
+from rotkehlchen.typing import Timestamp
+
+
+def test_add_trades(benchmark, database, trades):
+    def clear_trades():
+        database.conn.cursor().execute('DELETE FROM trades;')
+        database.conn.commit()
+
+    benchmark.pedantic(
+        database.add_trades,
+        args=(trades,),
+        setup=clear_trades,
+        rounds=3,
+        iterations=1,
+    )
+    assert len(database.get_trades()) == len(trades)
+
+
+def test_get_trades(benchmark, database, trades):
+    database.add_trades(trades)
+    result = benchmark.pedantic(database.get_trades, rounds=3, iterations=1)
+    assert len(result) == len(trades)
+
+
+@pytest.fixture
+def offline_price_historian(data_dir, cryptocompare, price_historian, trades):
+    """A PriceHistorian that queries all prices from an offline file of the dataset's prices"""
+    oracle = write_price_file(
+        path=data_dir / 'benchmark_prices.db',
+        query_price=FakePriceOracle().query_historical_price,
+        assets=BASE_USD_PRICES.keys(),
+        timestamps=[trade.timestamp for trade in trades],
+    )
+    previous_historian = replace_price_historian_instance(None)
+    historian = PriceHistorian(
+        data_directory=data_dir,
+        history_date_start=TEST_HISTORY_DATA_START,
+        cryptocompare=cryptocompare,
+        offline_oracle=oracle,
+    )
+    yield historian
+    replace_price_historian_instance(previous_historian)
+    oracle.close()
+
+
+@pytest.mark.parametrize('should_mock_price_queries', [False])
+def test_process_history(benchmark, accountant, offline_price_historian, trades):
+    result = benchmark.pedantic(
+        accountant.process_history,
+        kwargs={
+            'start_ts': Timestamp(0),
+            'end_ts': trades[-1].timestamp,
+            'trade_history': trades,
+            'loan_history': [],
+            'asset_movements': [],
+            'eth_transactions': [],
+            'defi_events': [],
+        },
+        rounds=3,
+        iterations=1,
+    )
+    assert 'overview' in result
+
+
+def test_process_result(benchmark, trades):
+    result = benchmark.pedantic(
+        process_result,
+        args=({'entries': trades, 'entries_found': len(trades)},),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(result['entries']) == len(trades)
+
+
+@pytest.mark.parametrize('number_of_eth_accounts', [2])
+@pytest.mark.parametrize('btc_accounts', [[UNIT_BTC_ADDRESS1, UNIT_BTC_ADDRESS2]])
+@pytest.mark.parametrize('added_exchanges', [('binance', 'poloniex')])
+def test_query_balances(
+        benchmark,
+        rotkehlchen_api_server_with_exchanges,
+        ethereum_accounts,
+        btc_accounts,
+):
+    rotki = rotkehlchen_api_server_with_exchanges.rest_api.rotkehlchen
+    setup = setup_balances(rotki, ethereum_accounts, btc_accounts)
+    with ExitStack() as stack:
+        setup.enter_all_patches(stack)
+        result = benchmark(rotki.query_balances, ignore_cache=True)
+
+    assert 'net_usd' in result
@@ -0,0 +1,157 @@
+import math
+import random
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from data_faker.actions import (
+    ALLOWED_EXCHANGES,
+    KRAKEN_PAIRS,
+    MAX_FEE_USD_VALUE,
+    MAX_TRADE_DIFF_VARIANCE,
+    MAX_TRADE_USD_VALUE,
+    STARTING_FUNDS,
+    STARTING_TIMESTAMP,
+)
+
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR, A_USD
+from rotkehlchen.exchanges.data_structures import Trade, TradeType
+from rotkehlchen.fval import FVal
+from rotkehlchen.history.offline import OfflinePriceOracle
+from rotkehlchen.serialization.deserialize import deserialize_location, pair_get_assets
+from rotkehlchen.typing import AssetAmount, Fee, Price, Timestamp, TradePair
+
+DATASET_PAIRS = KRAKEN_PAIRS + [TradePair('ETH_BTC')]
+
+# Price in USD around which each asset's fake price moves
+BASE_USD_PRICES = {
+    A_BTC: 8000.0,
+    A_ETH: 250.0,
+    A_EUR: 1.1,
+    A_USD: 1.0,
+}
+# Period in seconds of the fake price movement. Roughly 30 days
+PRICE_PERIOD = 2592000
+PRICE_AMPLITUDE = 0.3
+
+
+class FakePriceOracle():
+    """A deterministic local price source that replaces the PriceHistorian queries
+
+    Each asset's USD price moves smoothly around a base price so that trades
+    have both profits and losses, without making any network requests.
+    """
+
+    @staticmethod
+    def usd_price(asset: Asset, timestamp: Timestamp) -> FVal:
+        if asset == A_USD:
+            return FVal(1)
+
+        base_price = BASE_USD_PRICES.get(asset, 1.0)
+        # Derive the phase from the identifier and not hash() since it's salted per process
+        phase = sum(ord(x) for x in asset.identifier)
+        factor = 1 + PRICE_AMPLITUDE * math.sin(2 * math.pi * timestamp / PRICE_PERIOD + phase)
+        return FVal(round(base_price * factor, 8))
+
+    def query_historical_price(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamp: Timestamp,
+    ) -> Price:
+        if from_asset == to_asset:
+            return Price(FVal(1))
+
+        return Price(self.usd_price(from_asset, timestamp) / self.usd_price(to_asset, timestamp))
+
+
+def generate_trades(
+        trades_number: int,
+        seed: int = 0,
+        seconds_between_trades: int = 3600,
+) -> List[Trade]:
+    """Generates a deterministic list of trades, ordered from oldest to newest
+
+    The same arguments always produce the same trades. The funds are tracked so
+    that nothing is ever sold that was not bought before, as it would happen
+    in a real history.
+    """
+    rng = random.Random(seed)
+    oracle = FakePriceOracle()
+    funds: Dict[Asset, FVal] = dict(STARTING_FUNDS)
+    timestamp = STARTING_TIMESTAMP
+    trades: List[Trade] = []
+    while len(trades) < trades_number:
+        timestamp += rng.randint(
+            seconds_between_trades,
+            seconds_between_trades + MAX_TRADE_DIFF_VARIANCE,
+        )
+        ts = Timestamp(timestamp)
+        pair = rng.choice(DATASET_PAIRS)
+        base, quote = pair_get_assets(pair)
+        rate = oracle.query_historical_price(base, quote, ts)
+        usd_value = FVal(round(rng.uniform(1, float(MAX_TRADE_USD_VALUE)), 2))
+        amount = usd_value / oracle.usd_price(base, ts)
+        cost = amount * rate
+
+        can_buy = funds.get(quote, FVal(0)) >= cost
+        can_sell = funds.get(base, FVal(0)) >= amount
+        if can_buy and can_sell:
+            trade_type = rng.choice([TradeType.BUY, TradeType.SELL])
+        elif can_buy:
+            trade_type = TradeType.BUY
+        elif can_sell:
+            trade_type = TradeType.SELL
+        else:
+            continue
+
+        if trade_type == TradeType.BUY:
+            funds[quote] = funds[quote] - cost
+            funds[base] = funds.get(base, FVal(0)) + amount
+        else:
+            funds[base] = funds[base] - amount
+            funds[quote] = funds.get(quote, FVal(0)) + cost
+
+        fee_usd_value = FVal(round(rng.uniform(0, MAX_FEE_USD_VALUE), 2))
+        trades.append(Trade(
+            timestamp=ts,
+            location=deserialize_location(rng.choice(ALLOWED_EXCHANGES)),
+            pair=pair,
+            trade_type=trade_type,
+            amount=AssetAmount(amount),
+            rate=rate,
+            fee=Fee(fee_usd_value / oracle.usd_price(quote, ts)),
+            fee_currency=quote,
+            link=str(len(trades)),
+        ))
+
+    return trades
+
+
+def write_price_file(
+        path: Path,
+        query_price: Callable[[Asset, Asset, Timestamp], Price],
+        assets: Iterable[Asset],
+        timestamps: Iterable[Timestamp],
+) -> OfflinePriceOracle:
+    """Records the USD price of each asset at each timestamp in an offline price file
+
+    The price query can be the one of the FakePriceOracle for synthetic series, or the
+    one of the PriceHistorian to record real prices once and use them offline afterwards.
+    """
+    oracle = OfflinePriceOracle(path)
+    timestamps = sorted(set(timestamps))
+    for asset in assets:
+        if asset == A_USD:
+            continue
+
+        oracle.add_prices(
+            from_asset=asset,
+            to_asset=A_USD,
+            prices=(
+                (ts, query_price(asset, A_USD, ts))
+                for ts in timestamps
+            ),
+        )
+
+    return oracle